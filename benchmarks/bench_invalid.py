@@ -0,0 +1,44 @@
+"""
+Compares the cost of checking a conformed value against INVALID by equality, as spec.impl used to, with checking
+by identity.
+
+    python -m benchmarks.bench_invalid
+"""
+import timeit
+
+from spec.core import coll_of, conform, INVALID
+
+
+class Value:
+    pass
+
+
+class ExpensiveEquality:
+    def __eq__(self, other):
+        return sum(range(50)) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = object.__hash__
+
+
+def per_check(stmt: str, x: object, number: int = 1000000) -> float:
+    return timeit.timeit(stmt, globals={'INVALID': INVALID, 'x': x}, number=number) / number * 1e9
+
+
+def main():
+    for name, x in [("int", 1), ("object", Value()), ("expensive __eq__", ExpensiveEquality())]:
+        equality = per_check("INVALID != x", x)
+        identity = per_check("x is not INVALID", x)
+        print("{:<20} equality: {:7.1f}ns  identity: {:7.1f}ns  saved per node: {:7.1f}ns".format(
+            name, equality, identity, equality - identity))
+
+    s = coll_of(int)
+    xs = list(range(100000))
+    seconds = min(timeit.repeat(lambda: conform(s, xs), number=10, repeat=3)) / 10
+    print("conform(coll_of(int), 100k ints): {:.2f}ms".format(seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
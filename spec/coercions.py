@@ -1,25 +1,273 @@
+import datetime as dt
+import decimal
+import ipaddress
+import re
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import Callable, Type
 from urllib.parse import urlparse, ParseResult
 from uuid import UUID
 
-from spec.core import coerce
+from spec.core import coerce, one_of, INVALID, Spec
+
+# Coercers can signal failure either by raising or by returning INVALID. Raising is much slower when many values
+# are invalid, so the try_ coercers below check for the common ways values can be invalid before parsing them.
 
 
 def coerce_uuid(x):
     return x if isinstance(x, UUID) else UUID(x)
 
 
-Uuid = coerce(coerce_uuid, UUID)
+def try_coerce_uuid(x):
+    """
+    Same as coerce_uuid, but returns INVALID rather than raising
+    """
+    if isinstance(x, UUID):
+        return x
+    if not isinstance(x, str):
+        return INVALID
+
+    # the same normalisation as UUID.__init__
+    hex = x.replace('urn:', '').replace('uuid:', '').strip('{}').replace('-', '')
+    if len(hex) != 32:
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return UUID(x)
+    except Exception:
+        return INVALID
+
+
+Uuid = coerce(try_coerce_uuid, UUID)
 
 
 def coerce_int(x):
     return x if isinstance(x, int) else int(x)
 
 
-Int = coerce(coerce_int, int)
+# Everything int() accepts in base 10 (\d matches any unicode decimal digit, as int() does)
+_INT_STRING = re.compile(r'\s*[+-]?\d+(?:_\d+)*\s*')
+
+
+def try_coerce_int(x):
+    """
+    Same as coerce_int, but returns INVALID rather than raising
+    """
+    if isinstance(x, int):
+        return x
+    if isinstance(x, str) and not _INT_STRING.fullmatch(x):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return int(x)
+    except Exception:
+        return INVALID
+
+
+Int = coerce(try_coerce_int, int)
 
 
 def parse_url(x):
     return urlparse(x)
 
 
-Url = coerce(parse_url, ParseResult)
+def try_parse_url(x):
+    """
+    Same as parse_url, but returns INVALID rather than raising. Anything other than a string is INVALID, as urlparse()
+    would either raise or not return a ParseResult
+    """
+    if not isinstance(x, str):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return urlparse(x)
+    except Exception:
+        return INVALID
+
+
+Url = coerce(try_parse_url, ParseResult)
+
+
+def memoized(coercer: Callable[[object], object], maxsize: int = 1024) -> Callable[[object], object]:
+    """
+    Remembers the results of the maxsize most recently used inputs, for coercers of values which are often repeated,
+    e.g. enum names or timestamps at low resolution. Unhashable values are coerced without being remembered.
+
+    Coerced values are shared between callers, so should be immutable.
+    """
+    cached = lru_cache(maxsize=maxsize)(coercer)
+
+    @wraps(coercer)
+    def coerce_memoized(x):
+        try:
+            return cached(x)
+        except TypeError:
+            if getattr(x, '__hash__', None) is not None:
+                raise
+            return coercer(x)
+
+    return coerce_memoized
+
+
+def _iso_pattern_prefix_ok(x: str) -> bool:
+    # YYYY-MM-DD...
+    return len(x) >= 10 and x[4] == '-' and x[7] == '-'
+
+
+# datetime.fromisoformat() and date.fromisoformat() were added in python 3.7
+_ISO_DATETIME = re.compile(r'(\d{4})-(\d{2})-(\d{2})'
+                           r'(?:.(\d{2})(?::(\d{2})(?::(\d{2})(?:\.(\d{3}|\d{6}))?)?)?'
+                           r'(?:([+-])(\d{2}):(\d{2}))?)?')
+
+
+def _datetime_fromisoformat(x: str) -> dt.datetime:
+    m = _ISO_DATETIME.fullmatch(x)
+    if not m:
+        raise ValueError("Invalid isoformat string: {!r}".format(x))
+    year, month, day, hour, minute, second, fraction, sign, tz_hours, tz_minutes = m.groups()
+    tzinfo = None
+    if sign:
+        offset = dt.timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+        tzinfo = dt.timezone(-offset if sign == '-' else offset)
+    return dt.datetime(int(year), int(month), int(day),
+                       int(hour or 0), int(minute or 0), int(second or 0), int((fraction or '0').ljust(6, '0')),
+                       tzinfo=tzinfo)
+
+
+_fromisoformat = getattr(dt.datetime, 'fromisoformat', _datetime_fromisoformat)
+
+
+def try_coerce_datetime(x):
+    """
+    Parses ISO-8601 strings, as datetime.fromisoformat() does, returning INVALID if x isn't one
+    """
+    if isinstance(x, dt.datetime):
+        return x
+    if not isinstance(x, str) or not _iso_pattern_prefix_ok(x):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return _fromisoformat(x)
+    except Exception:
+        return INVALID
+
+
+Datetime = coerce(try_coerce_datetime, dt.datetime)
+
+
+def try_coerce_date(x):
+    """
+    Parses YYYY-MM-DD strings, returning INVALID if x isn't one
+    """
+    if isinstance(x, dt.datetime):
+        return x.date()
+    if isinstance(x, dt.date):
+        return x
+    if not isinstance(x, str) or len(x) != 10 or not _iso_pattern_prefix_ok(x):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return _fromisoformat(x).date()
+    except Exception:
+        return INVALID
+
+
+Date = coerce(try_coerce_date, dt.date)
+
+
+def try_coerce_decimal(x):
+    """
+    Converts ints and numeric strings to Decimals. Floats aren't accepted, as they often can't be represented exactly.
+    """
+    if isinstance(x, decimal.Decimal):
+        return x
+    if isinstance(x, bool) or not isinstance(x, (int, str)):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return decimal.Decimal(x)
+    except Exception:
+        return INVALID
+
+
+Decimal = coerce(try_coerce_decimal, decimal.Decimal)
+
+
+def try_coerce_float(x):
+    if isinstance(x, float):
+        return x
+    if isinstance(x, bool) or not isinstance(x, (int, str)):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return float(x)
+    except Exception:
+        return INVALID
+
+
+Float = coerce(try_coerce_float, float)
+
+_BOOLS = {"true": True, "t": True, "yes": True, "y": True, "on": True, "1": True,
+          "false": False, "f": False, "no": False, "n": False, "off": False, "0": False}
+
+
+def try_coerce_bool(x):
+    """
+    Accepts bools, the ints 0 and 1, and the usual ways of writing true and false (ignoring case), e.g. "yes", "off"
+    """
+    if isinstance(x, bool):
+        return x
+    if isinstance(x, int):
+        return {0: False, 1: True}.get(x, INVALID)
+    if isinstance(x, str):
+        return _BOOLS.get(x.strip().lower(), INVALID)
+    return INVALID
+
+
+Bool = coerce(try_coerce_bool, bool)
+
+
+def try_coerce_ip_address(x):
+    if isinstance(x, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        return x
+    if isinstance(x, bool) or not isinstance(x, (str, int)):
+        return INVALID
+
+    # noinspection PyBroadException
+    try:
+        return ipaddress.ip_address(x)
+    except Exception:
+        return INVALID
+
+
+IpAddress = coerce(try_coerce_ip_address, one_of(ipaddress.IPv4Address, ipaddress.IPv6Address))
+
+
+def enum_member(enum: Type[Enum]) -> Spec:
+    """
+    Coerces members of enum, their values and their names (in that order of preference) to members of enum
+    """
+    members = {}
+    for name, member in enum.__members__.items():
+        members.setdefault(name, member)
+    for member in enum:
+        members[member.value] = member
+    for member in enum:
+        members[member] = member
+
+    def coerce_enum_member(x):
+        try:
+            return members.get(x, INVALID)
+        except TypeError:
+            # unhashable
+            return INVALID
+
+    coerce_enum_member.__name__ = "coerce_{}".format(enum.__name__)
+    return coerce(coerce_enum_member, enum)
@@ -1,17 +1,23 @@
-from typing import Callable, Optional, Set, Iterable, Dict
+from functools import lru_cache
+from typing import Callable, Optional, Set, Iterable, Iterator, Dict, Tuple
 
 import spec.impl.core as impl
-from spec.impl.core import Spec, SpecResult, SimpleSpec, Explanation, path
-from spec.impl.dicts import DictSpec
-from spec.impl.iterables import CollOf
+from spec.impl.core import Spec, SpecResult, SimpleSpec, Explanation, Problem, path, Path, changes_from_paths
+from spec.impl.dicts import DictSpec, MapOf, conform_lazily
+from spec.impl.iterables import CollOf, TupleOf, SetOf, FixedTupleOf
+from spec.impl import sampling
+from spec.impl.sampling import Sample
 from spec.impl.specs import Any, EqualTo, IsInstance, Even, Odd, IsNone, Coerce, InRange, Gt, Lt, Gte, Lte, IsIn, Never, \
-    OneOf, AllOf
+    OneOf, AllOf, AdaptiveOneOf
+from spec.impl.util.caches import IdentityCache
 from spec.impl.util.strings import a_or_an
 
 Speccable = impl.Speccable
 
 INVALID = impl.INVALID
 
+WILDCARD = impl.WILDCARD
+
 
 # noinspection PyProtectedMember
 def isvalid(x) -> bool:
@@ -73,28 +79,28 @@ def in_range(start, end_exclusive=None) -> InRange:
     return InRange(start, end_exclusive)
 
 
-def gt(value) -> InRange:
+def gt(value) -> Gt:
     """
     Greater than
     """
     return Gt(value)
 
 
-def lt(value) -> InRange:
+def lt(value) -> Lt:
     """
     Less than
     """
     return Lt(value)
 
 
-def gte(value) -> InRange:
+def gte(value) -> Gte:
     """
     Greater than or equal to
     """
     return Gte(value)
 
 
-def lte(value) -> InRange:
+def lte(value) -> Lte:
     """
     Less than or equal to
     """
@@ -112,7 +118,10 @@ def coerce(coercer: Callable[[object], object],
     """
     Returns a spec that runs coercer over the value before passing it to spec for conformance and explanation
 
-    If the coercion fails, you can override the default message by providing explain_coercion_failure
+    coercer can signal failure by raising or by returning INVALID, which is much faster if many values are invalid
+
+    If the coercion fails, you can override the default message by providing explain_coercion_failure, which is
+    called with the value and the exception raised (or None if coercer returned INVALID)
     """
     return Coerce(coercer, specize(s), explain_coercion_failure=explain_coercion_failure)
 
@@ -121,6 +130,21 @@ def decorated(x: Speccable, description: str = None):
     return impl.DecoratedSpec(specize(x), description=description)
 
 
+# Specs for the callables, types and sets most recently passed to specize(), so passing the same
+# predicate to conform() in a loop doesn't rebuild its spec every time
+SPECIZE_CACHE_SIZE = 1024
+_specize_cache = IdentityCache(SPECIZE_CACHE_SIZE)
+
+
+@lru_cache(maxsize=SPECIZE_CACHE_SIZE)
+def _is_in_for_contents(typed_coll: frozenset) -> IsIn:
+    """
+    typed_coll holds (type, value) pairs, so sets whose items are equal but of different types, e.g. {True} and {1},
+    don't share an IsIn
+    """
+    return is_in(v for t, v in typed_coll)
+
+
 def specize(x: Speccable) -> Spec:
     """
     Although this is public and in spec.core, you'll probably never need to use it
@@ -128,11 +152,22 @@ def specize(x: Speccable) -> Spec:
     if isinstance(x, Spec):
         return x
 
-    if isinstance(x, type):
-        return is_instance(x)
+    s = _specize_cache.get(x)
+    if s is not None:
+        return s
 
     if isinstance(x, Set):
-        return is_in(x)
+        # sets are mutable, so are cached on their contents rather than their identity
+        return _is_in_for_contents(frozenset((type(v), v) for v in x))
+
+    s = _specize(x)
+    _specize_cache.put(x, s)
+    return s
+
+
+def _specize(x: Speccable) -> Spec:
+    if isinstance(x, type):
+        return is_instance(x)
 
     if callable(x):
         if hasattr(x, '__name__'):
@@ -147,13 +182,25 @@ def specize(x: Speccable) -> Spec:
     raise ValueError("I don't know how to turn a {} into a spec: {}".format(type(x), x))
 
 
+_default_limits = None  # type: Optional['Limits']
+
+
+def _with_default_limits(s: Speccable) -> Spec:
+    s = specize(s)
+    if _default_limits is None:
+        return s
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.limits import LimitedSpec
+    return LimitedSpec(s, _default_limits)
+
+
 # noinspection PyBroadException
 def conform(s: Speccable, x: object) -> SpecResult:
     """
     Given a spec and a value, returns spec.core::INVALID if value does not match spec,
     else the (possibly destructured) value."
     """
-    return specize(s).conform(x)
+    return _with_default_limits(s).conform(x)
 
 
 def explain_data(s: Speccable, x: object) -> Optional[Explanation]:
@@ -161,46 +208,336 @@ def explain_data(s: Speccable, x: object) -> Optional[Explanation]:
     Given a spec and a value x which ought to conform, returns nil if x
     conforms, else an Explanation, which contains a collection of Problems
     """
-    problems = specize(s).explain(path(), x)
+    problems = _with_default_limits(s).explain(path(), x)
+    if problems is None or len(problems) == 0:
+        return None
+    return Explanation.with_problems(*problems)
+
+
+def iter_problems(s: Speccable, x: object) -> Iterator[Problem]:
+    """
+    Yields the problems explain_data() would return, as they are found, so callers can take the first few or process
+    them without waiting for the whole of x to be explained
+    """
+    return _with_default_limits(s).iter_problems(path(), x)
+
+
+def explain_batch(s: Speccable, xs: Iterable, max_examples: int = 5) -> 'ProblemAggregator':
+    """
+    Explains every value in xs, returning counts of problems grouped by path and spec, with an example reason and
+    up to max_examples example values for each, rather than every problem.
+
+    Problem paths start with the index of the value in xs, and all collection indices are replaced with a wildcard,
+    e.g. [*].items[*].price
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.aggregation import ProblemAggregator
+    s = _with_default_limits(s)
+    aggregator = ProblemAggregator(max_examples=max_examples)
+    for i, x in enumerate(xs):
+        aggregator.explain(s, x, path(i))
+    return aggregator
+
+
+def iterative_conform(s: Speccable, x: object) -> SpecResult:
+    """
+    Same as conform(), but doesn't recurse, so can validate arbitrarily deeply nested values
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl import engine
+    return engine.conform(_with_default_limits(s), x)
+
+
+def iterative_explain_data(s: Speccable, x: object) -> Optional[Explanation]:
+    """
+    Same as explain_data(), but doesn't recurse, so can explain arbitrarily deeply nested values
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl import engine
+    problems = engine.explain(_with_default_limits(s), path(), x)
     if problems is None or len(problems) == 0:
         return None
     return Explanation.with_problems(*problems)
 
 
+def conform_lazy(s: Speccable, x: object) -> SpecResult:
+    """
+    Given a dict spec and a dict-like value x, returns spec.core::INVALID if x is not dict-like, else a read-only
+    Mapping which conforms each value the first time it's read, raising SpecError if it doesn't conform. Call force()
+    on it to conform any values which haven't been read.
+    """
+    s = specize(s)
+    if not isinstance(s, DictSpec):
+        raise TypeError("Expected a dict spec but got {}".format(s))
+    return conform_lazily(s, x)
+
+
+def reconform(s: Speccable, x: object, previous: SpecResult, changed: Iterable[Path]) \
+        -> Tuple[SpecResult, Optional[Explanation]]:
+    """
+    Given a spec, a value x which has been changed since it was last conformed, the previous result of conforming
+    it and the paths within x that have changed, re-validates only the changed parts of x.
+
+    Returns the (possibly destructured) value, or spec.core::INVALID, and an Explanation if x does not conform.
+    """
+    conformed, problems = specize(s).reconform(path(), x, previous, changes_from_paths(changed))
+    if isvalid(conformed):
+        return conformed, None
+    return INVALID, Explanation.with_problems(*problems)
+
+
 def describe(s: Speccable) -> str:
     return specize(s).describe()
 
 
+def optimize(s: Speccable) -> Spec:
+    """
+    Returns an equivalent spec which is cheaper to conform, with the same description and explanations.
+
+    See spec.impl.optimize.optimize for the rewrites made
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.optimize import optimize as optimize_spec
+    return optimize_spec(specize(s))
+
+
+def select(s: Speccable, paths: Iterable[Path]) -> Spec:
+    """
+    Returns a spec which only validates the parts of values at paths, e.g. select(s, [path('items', WILDCARD, 'id')])
+    only validates the id of each item.
+
+    See spec.impl.select.select
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.select import select as select_paths
+    return select_paths(specize(s), paths)
+
+
 def isspec(x: object):
     return isinstance(x, Spec)
 
 
 def assert_spec(s: Speccable, x: object) -> object:
-    return impl.assert_spec(specize(s),x)
+    return impl.assert_spec(_with_default_limits(s), x)
 
 
-def coll_of(s: Speccable):
-    return CollOf(specize(s))
+def coll_of(s: Speccable, persistent: bool = False, sample: Sample = None):
+    """
+    If persistent is True, conforms to a pyrsistent PVector rather than a list or tuple
+
+    If sample is provided, only the sampled items are validated, see spec.core.sample()
+    """
+    if persistent:
+        # imported lazily, so pyrsistent is only loaded if it's used
+        from spec.impl.persistent import PersistentCollOf
+        return PersistentCollOf(specize(s), sample=sample)
+    return CollOf(specize(s), sample=sample)
+
 
+def tuple_of(*ss: Speccable) -> Spec:
+    """
+    tuple_of(s, ...) is a tuple or list of any length whose items conform to s, like Tuple[int, ...].
+
+    Otherwise, a tuple or list with one item for each spec in ss, like Tuple[int, str].
+
+    Both conform to tuples.
+    """
+    if len(ss) == 2 and ss[1] is Ellipsis:
+        return TupleOf(specize(ss[0]))
+    return FixedTupleOf(specize(s) for s in ss)
+
+
+def set_of(s: Speccable) -> SetOf:
+    """
+    A set or frozenset whose items conform to s
+    """
+    return SetOf(specize(s))
 
-def one_of(*ss: Speccable):
+
+def map_of(keyspec: Speccable, valuespec: Speccable) -> MapOf:
+    """
+    A Mapping whose keys conform to keyspec and values conform to valuespec. Conforms to a dict.
+    """
+    return MapOf(specize(keyspec), specize(valuespec))
+
+
+def sample(fraction: float = None, first: int = 0, random: int = 0, seed: int = 0) -> Sample:
+    """
+    For validating very large collections statistically rather than exhaustively.
+
+    Validates the first `first` items, then either `random` items or `fraction` of the remaining items, chosen at
+    random using `seed`, afresh for each collection. Unvalidated items are passed through unconformed.
+
+    The returned Sample's report() says how many items have been seen and checked by conform(). Samples can be shared
+    between threads.
+    """
+    return Sample(fraction=fraction, first=first, random=random, seed=seed)
+
+
+def set_default_sample(s: Optional[Sample]) -> Optional[Sample]:
+    """
+    Sets the sample used by every dict spec and coll_of which doesn't have its own sample.
+
+    None (the default) means validate everything. Returns the previous default sample.
+    """
+    return sampling.set_default_sample(s)
+
+
+def deduplicated(s: Speccable) -> Spec:
+    """
+    Validates values which appear in more than one place (by identity) only once per spec, reusing the conformed
+    result. Values which contain themselves fail with a problem, rather than raising RecursionError.
+
+    Validation doesn't recurse, so values can also be arbitrarily deeply nested.
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.engine import DeduplicatingSpec
+    return DeduplicatingSpec(specize(s))
+
+
+def limits(max_length: int = None,
+           max_size: int = None,
+           max_depth: int = None,
+           max_nodes: int = None,
+           timeout: float = None) -> 'Limits':
+    """
+    Limits on the size of values, to protect against values which would be very expensive to validate.
+
+    max_length: maximum len() of any collection
+    max_size: maximum length of any string or bytes
+    max_depth: maximum nesting of dicts and collections
+    max_nodes: maximum number of values read
+    timeout: maximum seconds spent validating
+
+    Each value is checked as it is read, before anything inside it is. Parts of values which aren't read aren't
+    checked. See limited() and set_default_limits()
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.limits import Limits
+    return Limits(max_length=max_length, max_size=max_size, max_depth=max_depth, max_nodes=max_nodes,
+                  timeout=timeout)
+
+
+def limited(s: Speccable, l: 'Limits') -> 'LimitedSpec':
+    """
+    Fails, with a problem saying which limit was exceeded, if a value exceeds l
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.limits import LimitedSpec
+    return LimitedSpec(specize(s), l)
+
+
+def set_default_limits(l: Optional['Limits']) -> Optional['Limits']:
+    """
+    Sets the limits applied to every value passed to conform(), explain_data() and assert_spec().
+
+    None (the default) means no limits. Returns the previous default limits.
+    """
+    global _default_limits
+    previous = _default_limits
+    _default_limits = l
+    return previous
+
+
+def one_of(*ss: Speccable, adaptive: bool = False):
+    """
+    If adaptive is True, branches which match most often are tried first. Results are the same either way.
+    """
+    if adaptive:
+        return AdaptiveOneOf([specize(s) for s in ss])
     return OneOf([specize(s) for s in ss])
 
 
 def all_of(*ss: Speccable):
-    return AllOf([specize(s) for s in ss])
+    """
+    If every spec is a string spec (matches(), str_len(), starts_with(), ends_with()), they're checked in one go
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.strings import StringSpec, StringAllOf
+    specs = [specize(s) for s in ss]
+    if len(specs) > 1 and all(isinstance(s, StringSpec) for s in specs):
+        return StringAllOf(specs)
+    return AllOf(specs)
+
+
+def matches(pattern: str, flags: int = 0) -> 'Matches':
+    """
+    A string which pattern matches the whole of.
+
+    flags are re flags. Compiled patterns are cached.
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.strings import Matches
+    return Matches(pattern, flags)
+
+
+def str_len(min_length: int = 0, max_length: int = None) -> 'StrLen':
+    """
+    A string at least min_length long, and at most max_length if given
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.strings import StrLen
+    return StrLen(min_length, max_length)
+
+
+def starts_with(prefix: str) -> 'StartsWith':
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.strings import StartsWith
+    return StartsWith(prefix)
+
 
+def ends_with(suffix: str) -> 'EndsWith':
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.strings import EndsWith
+    return EndsWith(suffix)
 
-def dict_spec(d: Dict[object, Speccable]):
+
+def dict_spec(d: Dict[object, Speccable], persistent: bool = False):
+    """
+    If persistent is True, conforms to a pyrsistent PMap (as do any nested dicts in d) rather than a dict
+    """
     def f(x):
         if isinstance(x, dict):
-            return dict_spec(x)
+            return dict_spec(x, persistent=persistent)
         else:
             return specize(x)
 
+    if persistent:
+        # imported lazily, so pyrsistent is only loaded if it's used
+        from spec.impl.persistent import PersistentDictSpec
+        return PersistentDictSpec({k: f(v) for k, v in d.items()})
     return DictSpec({k: f(v) for k, v in d.items()})
 
 
+def object_spec(d: Dict[str, Speccable]) -> 'ObjectSpec':
+    """
+    Validates the attributes of objects named by the keys of d, which can be dotted, e.g. 'address.city'. Nested dicts
+    in d are object_specs too.
+    """
+    def f(x):
+        if isinstance(x, dict):
+            return object_spec(x)
+        else:
+            return specize(x)
+
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.objects import ObjectSpec
+    return ObjectSpec({k: f(v) for k, v in d.items()})
+
+
+def spec_set(*ss: Speccable) -> 'SpecSet':
+    """
+    For finding which of many specs a value conforms to, using SpecSet.matching() or SpecSet.first_match().
+
+    Rather than conforming values to every spec, specs are indexed on keys of dict specs whose values must be
+    equal_to() or is_in() fixed values, and on is_instance() types, so values are only conformed to specs they might
+    match.
+    """
+    # imported lazily to keep `import spec.core` fast
+    from spec.impl.specset import SpecSet
+    return SpecSet(specize(s) for s in ss)
+
+
 def dict_example(d: Dict[object, Speccable]):
     def f(x):
         try:
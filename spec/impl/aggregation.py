@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from spec.impl.core import Spec, Path, Problem, Wildcard, WILDCARD
+
+
+def normalise_path(p: Path) -> Path:
+    """
+    Replaces collection indices (ints) with WILDCARD, so problems with the same item in different rows or
+    collections have the same path
+    """
+    return tuple(WILDCARD if type(e) is int else e for e in p)
+
+
+def format_path(p: Path) -> str:
+    """
+    e.g. items[*].price
+    """
+    parts = []
+    for e in p:
+        if isinstance(e, str):
+            parts.append(".{}".format(e) if parts else e)
+        elif isinstance(e, (int, Wildcard)):
+            parts.append("[{}]".format(e))
+        else:
+            parts.append("[{!r}]".format(e))
+    return "".join(parts)
+
+
+class ProblemGroup(NamedTuple):
+    path: Path
+    spec: Optional[Spec]
+    # the reason given for the first problem in the group. Reasons often include the failing value, so may differ
+    reason: str
+    count: int
+    examples: Tuple[object, ...]
+
+    def __str__(self):
+        return "{} failed {} {} times ({}), examples: {}".format(format_path(self.path) or "<root>",
+                                                                self.spec,
+                                                                self.count,
+                                                                self.reason,
+                                                                list(self.examples))
+
+
+class _Group:
+    __slots__ = ('path', 'spec', 'reason', 'count', 'examples')
+
+    def __init__(self, p: Path, s: Optional[Spec], reason: str):
+        self.path = p
+        # keeps the spec alive, so its id isn't reused by another spec while it's part of a key
+        self.spec = s
+        self.reason = reason
+        self.count = 0
+        self.examples = []  # type: List[object]
+
+
+class ProblemAggregator:
+    """
+    Counts problems, grouped by normalised path and spec, rather than keeping every problem. Reasons aren't part
+    of the grouping, as they often include the failing value; each group keeps the first reason it was given.
+
+    For each group, up to max_examples example values are kept, chosen at random (using seed) from all the values
+    that had that problem. Memory used is constant per group, however many problems are added.
+    """
+
+    def __init__(self, max_examples: int = 5, seed: int = 0):
+        self._max_examples = max_examples
+        self._seed = seed
+        self._random = None
+        # (normalised path, id(spec)), or ((), reason) for plain string problems -> group
+        self._groups = {}  # type: Dict[Tuple[Path, object], _Group]
+        self._values_seen = 0
+        self._invalid_values = 0
+
+    def add(self, problem: Problem):
+        if isinstance(problem, str):
+            # DictSpec reports missing keys as plain strings, which don't include values
+            p, s, reason, value = (), None, problem, None
+            key = (p, reason)
+        else:
+            p, s, reason, value = normalise_path(problem.path), problem.spec, problem.reason, problem.value
+            # specs are compared by identity, as some (e.g. equal_to() of a list) can't be hashed
+            key = (p, id(s))
+
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(p, s, reason)
+            self._groups[key] = group
+
+        group.count += 1
+        if len(group.examples) < self._max_examples:
+            group.examples.append(value)
+        else:
+            # reservoir sampling, so every value with this problem is equally likely to be an example
+            if self._random is None:
+                # imported lazily to keep `import spec.core` fast
+                from random import Random
+                self._random = Random(self._seed)
+            i = self._random.randrange(group.count)
+            if i < self._max_examples:
+                group.examples[i] = value
+
+    def add_all(self, problems: Iterable[Problem]):
+        for problem in problems:
+            self.add(problem)
+
+    def explain(self, s: Spec, x: object, p: Path = ()) -> bool:
+        """
+        Adds any problems with x, returning True if there were none
+        """
+        self._values_seen += 1
+        valid = True
+        for problem in s.iter_problems(p, x):
+            self.add(problem)
+            valid = False
+        if not valid:
+            self._invalid_values += 1
+        return valid
+
+    @property
+    def values_seen(self) -> int:
+        """
+        How many values have been passed to explain()
+        """
+        return self._values_seen
+
+    @property
+    def invalid_values(self) -> int:
+        """
+        How many values passed to explain() had problems
+        """
+        return self._invalid_values
+
+    def groups(self) -> List[ProblemGroup]:
+        """
+        Most frequent first
+        """
+        groups = [ProblemGroup(group.path, group.spec, group.reason, group.count, tuple(group.examples))
+                  for group in self._groups.values()]
+        groups.sort(key=lambda g: g.count, reverse=True)
+        return groups
+
+    def __str__(self):
+        return "\n".join(str(g) for g in self.groups())
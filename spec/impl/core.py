@@ -1,12 +1,31 @@
 from abc import ABCMeta, abstractmethod
-from pprint import pformat
-from typing import Callable, Union, List, Iterable, Set, NamedTuple, Dict
+from functools import wraps
+from typing import Callable, Union, List, Iterable, Iterator, Set, NamedTuple, Dict, Optional, Generator
 from typing import Tuple
 
 from spec.impl.util.callables import can_be_called_with_one_argument
 
 
 class Invalid:
+    """
+    There is only ever one instance of Invalid, INVALID, so results can be checked by identity
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __reduce__(self):
+        return "INVALID"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __str__(self, *args, **kwargs):
         return repr(self)
 
@@ -17,21 +36,21 @@ class Invalid:
         return 42
 
     def __eq__(self, other):
-        return isinstance(other, Invalid)
+        return self is other
 
     def __ne__(self, other):
-        return not self.__eq__(other)
+        return self is not other
 
 
 INVALID = Invalid()
 
 
 def isvalid(x) -> bool:
-    return INVALID != x
+    return x is not INVALID
 
 
 def isinvalid(x) -> bool:
-    return not isvalid(x)
+    return x is INVALID
 
 
 SpecResult = Union[Invalid, object]
@@ -43,13 +62,172 @@ def path(*elements: Iterable[PathElement]) -> Path:
     return tuple(elements)
 
 
-class Problem(NamedTuple):
+class Wildcard:
+    """
+    Stands in for any collection index in a path
+    """
+
+    def __repr__(self):
+        return "*"
+
+
+WILDCARD = Wildcard()
+
+
+class LinkedPath:
+    """
+    A path made of a parent path and one more element.
+
+    Composite specs pass these to their children's explain() rather than copying the whole path into a new tuple for
+    every child (see child_path()), as most children have no problems and their paths are never looked at. Problem
+    converts them back into tuples.
+    """
+    __slots__ = ('_parent', '_element', '_tuple')
+
+    def __init__(self, parent: Path, element: PathElement):
+        self._parent = parent
+        self._element = element
+        self._tuple = None
+
+    def as_tuple(self) -> Tuple[PathElement, ...]:
+        """
+        The tuple is cached, along with the tuples of any parents, as problems are often found in several children of
+        the same parent
+        """
+        if self._tuple is None:
+            uncached = []
+            p = self
+            while type(p) is LinkedPath and p._tuple is None:
+                uncached.append(p)
+                p = p._parent
+            t = p._tuple if type(p) is LinkedPath else tuple(p)
+            for node in reversed(uncached):
+                t = t + (node._element,)
+                node._tuple = t
+        return self._tuple
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __len__(self):
+        return len(self.as_tuple())
+
+    def __getitem__(self, item):
+        return self.as_tuple()[item]
+
+    def __add__(self, other):
+        result = self
+        for element in other:
+            result = LinkedPath(result, element)
+        return result
+
+    def __radd__(self, other):
+        return other + self.as_tuple()
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LinkedPath)):
+            return self.as_tuple() == tuple(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return repr(self.as_tuple())
+
+
+# Below this length, copying a path into a new tuple is cheaper than creating a LinkedPath
+LINKED_PATH_THRESHOLD = 16
+
+
+def child_path(p: Path, element: PathElement) -> Path:
+    """
+    The path of a child of the value at p, as passed by composite specs to their children's explain().
+
+    Copying the whole of a long path for every child makes explaining deeply nested values quadratic, so long paths
+    are linked to their parents instead.
+    """
+    if type(p) is tuple and len(p) < LINKED_PATH_THRESHOLD:
+        return p + (element,)
+    return LinkedPath(p, element)
+
+
+# A trie of changed paths, as used by Spec.reconform().
+# None means "everything under here has changed"
+Changes = Optional[Dict[PathElement, 'Changes']]
+
+
+def changes_from_paths(paths: Iterable[Path]) -> Changes:
+    """
+    Builds a trie of changes from an iterable of paths, where each path has the same form as Problem.path
+
+    A path of path() means the whole value has changed
+    """
+    trie = {}
+    for p in paths:
+        if not p:
+            return None
+        node = trie
+        for element in p[:-1]:
+            child = node.get(element, {})
+            if child is None:
+                break
+            node[element] = child
+            node = child
+        else:
+            node[p[-1]] = None
+    return trie
+
+
+class _Problem(NamedTuple):
     path: Path
     value: object
     spec: 'Spec'
     reason: str
 
 
+class Problem(_Problem):
+    """
+    path is always a tuple, even if explain() was given a LinkedPath
+    """
+    __slots__ = ()
+
+    def __new__(cls, path: Path, value: object, spec: 'Spec', reason: str):
+        if type(path) is LinkedPath:
+            path = path.as_tuple()
+        elif type(path) is not tuple:
+            path = tuple(path)
+        return super().__new__(cls, path, value, spec, reason)
+
+    @classmethod
+    def _make(cls, iterable):
+        # used by _replace()
+        return cls(*iterable)
+
+
+class ConformStep(NamedTuple):
+    """
+    Yielded by the _conform_steps() and _explain_steps() generators of composite specs to ask spec.impl.engine to
+    conform a value to a child spec. The conformed value is sent back.
+    """
+    spec: 'Spec'
+    value: object
+
+
+class ExplainStep(NamedTuple):
+    """
+    Yielded by the _explain_steps() generators of composite specs to ask spec.impl.engine to explain a value using a
+    child spec. The list of problems is sent back.
+    """
+    spec: 'Spec'
+    path: Path
+    value: object
+
+
 class Explanation:
     @classmethod
     def with_problems(cls, *problems: Iterable[Problem]) -> 'Explanation':
@@ -75,6 +253,8 @@ class Explanation:
         return hash(self.problems)
 
     def __str__(self, *args, **kwargs):
+        # imported lazily to keep `import spec.core` fast
+        from pprint import pformat
         return pformat(self._problems)
 
 
@@ -93,7 +273,43 @@ class SpecError(RuntimeError):
         return self._value
 
 
+# Incremented by invalidate_descriptions(), making every cached description stale
+_description_generation = 0
+
+
+def invalidate_descriptions():
+    """
+    Specs are treated as immutable, so composite specs cache their descriptions. Call this after changing a spec in
+    place.
+    """
+    global _description_generation
+    _description_generation += 1
+
+
+def cached_description(describe: Callable[['Spec'], str]) -> Callable[['Spec'], str]:
+    """
+    For describe() methods which build a description from the descriptions of child specs
+    """
+
+    @wraps(describe)
+    def cached(self):
+        cache = getattr(self, '_description_cache', None)
+        if cache is not None and cache[0] == _description_generation:
+            return cache[1]
+        description = describe(self)
+        self._description_cache = (_description_generation, description)
+        return description
+
+    return cached
+
+
 class Spec(metaclass=ABCMeta):
+    """
+    Composite specs (see CompositeSpec) implement _conform_steps(x) and _explain_steps(p, x). These are generators
+    which yield ConformSteps and ExplainSteps instead of calling child specs directly, so that spec.impl.engine can
+    validate arbitrarily deep values without recursion.
+    """
+
     @abstractmethod
     def conform(self, x: object) -> SpecResult:
         raise NotImplementedError()
@@ -106,6 +322,27 @@ class Spec(metaclass=ABCMeta):
     def describe(self) -> str:
         raise NotImplementedError()
 
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        """
+        Yields the same problems as explain(), as they are found, so callers can stop early.
+
+        Composite specs override this to yield their children's problems without collecting them into lists first
+        """
+        return iter(self.explain(p, x))
+
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        """
+        Re-validates x, given the result of conforming an earlier version of x and a trie of paths that have
+        changed since.
+
+        Returns the conformed value and a list of problems. Specs which can't do better than re-validating the
+        whole of x don't need to override this.
+        """
+        conformed = self.conform(x)
+        if conformed is not INVALID:
+            return conformed, []
+        return INVALID, self.explain(p, x)
+
     def __str__(self, *args, **kwargs):
         return self.describe()
 
@@ -113,7 +350,35 @@ class Spec(metaclass=ABCMeta):
         return self.describe()
 
 
-class DelegatingSpec(Spec):
+class CompositeSpec(Spec):
+    """
+    A spec which validates values using child specs. As well as conform() and explain(), subclasses implement
+    _conform_steps() and _explain_steps(), which spec.impl.engine runs instead when validating without recursion.
+
+    Specs on the hot path hand-write conform() and explain(), as running the generators is several times slower.
+    Unless overridden, they run the generators with spec.impl.engine.
+    """
+
+    def conform(self, x: object) -> SpecResult:
+        # imported lazily to keep `import spec.core` fast
+        from spec.impl import engine
+        return engine.conform(self, x)
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        # imported lazily to keep `import spec.core` fast
+        from spec.impl import engine
+        return engine.explain(self, p, x)
+
+    @abstractmethod
+    def _conform_steps(self, x: object) -> Generator:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _explain_steps(self, p: Path, x: object) -> Generator:
+        raise NotImplementedError()
+
+
+class DelegatingSpec(CompositeSpec):
     def __init__(self, delegate: Spec):
         self._delegate = delegate
 
@@ -123,15 +388,27 @@ class DelegatingSpec(Spec):
     def explain(self, p: Path, x: object) -> List[Problem]:
         return self._delegate.explain(p, x)
 
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        return self._delegate.iter_problems(p, x)
+
     def describe(self) -> str:
         return self._delegate.describe()
 
+    def _conform_steps(self, x):
+        return (yield ConformStep(self._delegate, x))
+
+    def _explain_steps(self, p: Path, x: object):
+        return (yield ExplainStep(self._delegate, p, x))
+
 
 class DecoratedSpec(DelegatingSpec):
     def __init__(self, delegate: Spec, description: str = None):
         super().__init__(delegate)
         self._description = description
 
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        return self._delegate.reconform(p, x, previous, changes)
+
     def describe(self) -> str:
         return self._description or super().describe()
 
@@ -183,6 +460,6 @@ Speccable = Union[Spec, PredFn, Set, Dict]
 
 def assert_spec(s: Spec, x: object):
     conformed = s.conform(x)
-    if isvalid(conformed):
+    if conformed is not INVALID:
         return conformed
     raise SpecError(x, Explanation.with_problems(*s.explain(path(), x)))
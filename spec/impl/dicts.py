@@ -1,8 +1,10 @@
-import pprint
-from typing import Dict, List
+from collections.abc import Mapping
+from typing import Dict, List, Tuple, Iterator
 
-from spec.impl.core import Spec, SpecResult, Path, Problem, path, INVALID, isinvalid
-from spec.impl.specs import EqualTo
+from spec.impl.core import Spec, CompositeSpec, SpecResult, Path, Problem, INVALID, Changes, ConformStep, \
+    ExplainStep, child_path, cached_description, Explanation, SpecError, path
+from spec.impl.sampling import Sample, default_sample
+from spec.impl.specs import EqualTo, IsInstance
 
 
 def isspec(x: object):
@@ -22,46 +24,402 @@ def _acceptably_dict_like(x):
     return isinstance(x, dict) or not [a for a in {'__getitem__', '__iter__', '__contains__'} if not hasattr(x, a)]
 
 
-class DictSpec(Spec):
+class DictSpec(CompositeSpec):
     def __init__(self, key_to_spec: Dict[object, Spec]):
         self._key_to_spec = key_to_spec
 
+    @cached_description
     def describe(self) -> str:
-        return "Dict:\n{}".format(pprint.pformat(self._key_to_spec))
+        # imported lazily to keep `import spec.core` fast
+        from pprint import pformat
+        return "Dict:\n{}".format(pformat(self._key_to_spec))
 
     def conform(self, x: Dict) -> SpecResult:
         if not _acceptably_dict_like(x):
             return INVALID
 
+        sample = default_sample()
+        if sample is not None:
+            return self._conform_sample(x, sample)
+
         result = {}
         for k, s in self._key_to_spec.items():
             if not k in x:
                 return INVALID
 
-            value = x[k]
+            conformed = s.conform(x[k])
+            if conformed is INVALID:
+                return INVALID
+            result[k] = conformed
+
+        return self._result(x, result)
+
+    def _conform_sample(self, x: Dict, sample: Sample) -> SpecResult:
+        """
+        Checks all keys are present, but only validates the values of sampled keys
+        """
+        items = list(self._key_to_spec.items())
+        for k, s in items:
+            if not k in x:
+                return INVALID
 
-            conformed = s.conform(value)
-            if isinvalid(conformed):
+        result = {k: x[k] for k, s in items}
+        for i in sample.indices(len(items), id(x)):
+            k, s = items[i]
+            conformed = s.conform(result[k])
+            if conformed is INVALID:
                 return INVALID
             result[k] = conformed
 
+        return self._result(x, result)
+
+    def _conform_steps(self, x: Dict):
+        if not _acceptably_dict_like(x):
+            return INVALID
+
+        sample = default_sample()
+        if sample is not None:
+            return (yield from self._conform_sample_steps(x, sample))
+
+        result = {}
+        for k, s in self._key_to_spec.items():
+            if not k in x:
+                return INVALID
+
+            conformed = yield ConformStep(s, x[k])
+            if conformed is INVALID:
+                return INVALID
+            result[k] = conformed
+
+        return self._result(x, result)
+
+    def _conform_sample_steps(self, x: Dict, sample: Sample):
+        items = list(self._key_to_spec.items())
+        for k, s in items:
+            if not k in x:
+                return INVALID
+
+        result = {k: x[k] for k, s in items}
+        for i in sample.indices(len(items), id(x)):
+            k, s = items[i]
+            conformed = yield ConformStep(s, result[k])
+            if conformed is INVALID:
+                return INVALID
+            result[k] = conformed
+
+        return self._result(x, result)
+
+    def _result(self, x: object, conformed: Dict) -> SpecResult:
+        """
+        Builds the value returned by conform() from a dict of conformed values
+        """
+        return conformed
+
+    def _is_previous_result(self, previous: SpecResult) -> bool:
+        return isinstance(previous, dict)
+
+    def _previous_value(self, previous: SpecResult, k: object) -> SpecResult:
+        """
+        The conformed value of k in a previous result, or INVALID if it has none
+        """
+        return previous.get(k, INVALID)
+
+    def _updated_result(self, x: object, previous: SpecResult, updates: Dict) -> SpecResult:
+        """
+        Builds the value returned by reconform() from a previous result and the conformed values which have changed
+        """
+        result = dict(previous)
+        result.update(updates)
         return result
 
     def explain(self, p: Path, x: object) -> List[Problem]:
         if not _acceptably_dict_like(x):
             return [Problem(p, x, self, "not a dictionary {}".format(type(x)))]
 
+        sample = default_sample()
+        sampled = set(sample.explained_indices(len(self._key_to_spec), id(x))) if sample is not None else None
+
         problems = []
-        for k, s in self._key_to_spec.items():
+        for i, (k, s) in enumerate(self._key_to_spec.items()):
             if k not in x:
                 problems.append("Missing {}".format(k))
                 continue
 
+            if sampled is not None and i not in sampled:
+                continue
+
+            subspec_problems = s.explain(child_path(p, k), x[k])
+            if subspec_problems:
+                problems.extend(subspec_problems)
+
+        return problems
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        if not _acceptably_dict_like(x):
+            yield Problem(p, x, self, "not a dictionary {}".format(type(x)))
+            return
+
+        sample = default_sample()
+        sampled = set(sample.explained_indices(len(self._key_to_spec), id(x))) if sample is not None else None
+
+        for i, (k, s) in enumerate(self._key_to_spec.items()):
+            if k not in x:
+                yield "Missing {}".format(k)
+                continue
+
+            if sampled is not None and i not in sampled:
+                continue
+
             value = x[k]
-            explanation_path = p + path(k)
+            explanation_path = child_path(p, k)
+
+            yield from s.iter_problems(explanation_path, value)
+
+    def _explain_steps(self, p: Path, x: object):
+        if not _acceptably_dict_like(x):
+            return [Problem(p, x, self, "not a dictionary {}".format(type(x)))]
 
-            subspec_problems = s.explain(explanation_path, value)
+        sample = default_sample()
+        sampled = set(sample.explained_indices(len(self._key_to_spec), id(x))) if sample is not None else None
+
+        problems = []
+        for i, (k, s) in enumerate(self._key_to_spec.items()):
+            if k not in x:
+                problems.append("Missing {}".format(k))
+                continue
+
+            if sampled is not None and i not in sampled:
+                continue
+
+            subspec_problems = yield ExplainStep(s, child_path(p, k), x[k])
             if subspec_problems:
                 problems.extend(subspec_problems)
 
         return problems
+
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        if changes is None or not self._is_previous_result(previous) or not _acceptably_dict_like(x):
+            return super().reconform(p, x, previous, changes)
+
+        updates = {}
+        problems = []
+        valid = True
+        for k, subchanges in changes.items():
+            if k not in self._key_to_spec:
+                continue
+
+            if k not in x:
+                return super().reconform(p, x, previous, changes)
+
+            previous_value = self._previous_value(previous, k)
+            if previous_value is INVALID:
+                subchanges = None
+
+            conformed, subspec_problems = self._key_to_spec[k].reconform(child_path(p, k),
+                                                                         x[k],
+                                                                         previous_value,
+                                                                         subchanges)
+            if conformed is INVALID:
+                problems.extend(subspec_problems)
+                valid = False
+            else:
+                updates[k] = conformed
+
+        if not valid:
+            return INVALID, problems
+        return self._updated_result(x, previous, updates), []
+
+
+class LazilyConformedDict(Mapping):
+    """
+    A read-only view of x as conformed by a DictSpec, which conforms each value the first time it's read and keeps
+    the result. Reading a value which doesn't conform (or is missing) raises SpecError.
+
+    Like the dict DictSpec.conform() returns, only contains the keys of the spec.
+    """
+
+    _NOT_CONFORMED = object()
+
+    def __init__(self, spec: DictSpec, x: object):
+        self._spec = spec
+        self._x = x
+        self._conformed = {}
+
+    # noinspection PyProtectedMember
+    def __getitem__(self, k):
+        conformed = self._conformed.get(k, self._NOT_CONFORMED)
+        if conformed is not self._NOT_CONFORMED:
+            return conformed
+
+        s = self._spec._key_to_spec[k]
+        x = self._x
+        if k not in x:
+            raise SpecError(x, Explanation.with_problems("Missing {}".format(k)))
+
+        value = x[k]
+        conformed = s.conform(value)
+        if conformed is INVALID:
+            raise SpecError(value, Explanation.with_problems(*s.explain(path(k), value)))
+        self._conformed[k] = conformed
+        return conformed
+
+    def __contains__(self, k):
+        return k in self._spec._key_to_spec
+
+    def __iter__(self):
+        return iter(self._spec._key_to_spec)
+
+    def __len__(self):
+        return len(self._spec._key_to_spec)
+
+    # noinspection PyProtectedMember
+    def force(self) -> SpecResult:
+        """
+        Conforms every value not yet read, returning what DictSpec.conform() would have. Raises SpecError explaining
+        every problem with x if any value doesn't conform.
+        """
+        try:
+            conformed = {k: self[k] for k in self._spec._key_to_spec}
+        except SpecError:
+            raise SpecError(self._x, Explanation.with_problems(*self._spec.explain(path(), self._x)))
+        return self._spec._result(self._x, conformed)
+
+    def __repr__(self):
+        return "LazilyConformedDict({} of {} conformed)".format(len(self._conformed), len(self))
+
+
+def conform_lazily(s: DictSpec, x: object) -> SpecResult:
+    if not _acceptably_dict_like(x):
+        return INVALID
+    return LazilyConformedDict(s, x)
+
+
+class MapOf(CompositeSpec):
+    """
+    A Mapping whose keys all conform to keyspec and values all conform to valuespec. Conforms to a dict.
+
+    Problems with a key or its value have the key as the last element of their path.
+    """
+
+    def __init__(self, keyspec: Spec, valuespec: Spec):
+        self._keyspec = keyspec
+        self._valuespec = valuespec
+        # is_instance() keys conform to themselves, so are checked inline rather than by calling keyspec
+        # noinspection PyProtectedMember
+        self._key_type = keyspec._cls if type(keyspec) is IsInstance else None
+
+    @cached_description
+    def describe(self) -> str:
+        return "a mapping of {} to {}".format(self._keyspec.describe(), self._valuespec.describe())
+
+    def conform(self, x: object) -> SpecResult:
+        if not isinstance(x, Mapping):
+            return INVALID
+
+        result = {}
+        conform_value = self._valuespec.conform
+        key_type = self._key_type
+        if key_type is not None:
+            for k, v in x.items():
+                if not isinstance(k, key_type):
+                    return INVALID
+                v = conform_value(v)
+                if v is INVALID:
+                    return INVALID
+                result[k] = v
+        else:
+            conform_key = self._keyspec.conform
+            for k, v in x.items():
+                k = conform_key(k)
+                if k is INVALID:
+                    return INVALID
+                v = conform_value(v)
+                if v is INVALID:
+                    return INVALID
+                result[k] = v
+        return result
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        if not isinstance(x, Mapping):
+            return [Problem(p, x, self, "not a Mapping {}".format(type(x)))]
+
+        problems = []
+        for k, v in x.items():
+            item_path = child_path(p, k)
+            problems.extend(self._keyspec.explain(item_path, k))
+            problems.extend(self._valuespec.explain(item_path, v))
+        return problems
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        if not isinstance(x, Mapping):
+            yield Problem(p, x, self, "not a Mapping {}".format(type(x)))
+            return
+
+        for k, v in x.items():
+            item_path = child_path(p, k)
+            yield from self._keyspec.iter_problems(item_path, k)
+            yield from self._valuespec.iter_problems(item_path, v)
+
+    def _conform_steps(self, x: object):
+        if not isinstance(x, Mapping):
+            return INVALID
+
+        result = {}
+        key_type = self._key_type
+        for k, v in x.items():
+            if key_type is not None:
+                if not isinstance(k, key_type):
+                    return INVALID
+            else:
+                k = yield ConformStep(self._keyspec, k)
+                if k is INVALID:
+                    return INVALID
+            v = yield ConformStep(self._valuespec, v)
+            if v is INVALID:
+                return INVALID
+            result[k] = v
+        return result
+
+    def _explain_steps(self, p: Path, x: object):
+        if not isinstance(x, Mapping):
+            return [Problem(p, x, self, "not a Mapping {}".format(type(x)))]
+
+        problems = []
+        for k, v in x.items():
+            item_path = child_path(p, k)
+            problems.extend((yield ExplainStep(self._keyspec, item_path, k)) or ())
+            problems.extend((yield ExplainStep(self._valuespec, item_path, v)) or ())
+        return problems
+
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        # only keys which conform to themselves (is_instance() keys) can be matched up with the previous result
+        if changes is None or self._key_type is None or not isinstance(previous, dict) or not isinstance(x, Mapping):
+            return super().reconform(p, x, previous, changes)
+
+        result = dict(previous)
+        problems = []
+        for k, subchanges in changes.items():
+            if k not in x:
+                result.pop(k, None)
+                continue
+
+            item_path = child_path(p, k)
+            if not isinstance(k, self._key_type):
+                problems.extend(self._keyspec.explain(item_path, k))
+                continue
+
+            conformed, value_problems = self._valuespec.reconform(item_path,
+                                                                  x[k],
+                                                                  previous.get(k, INVALID),
+                                                                  subchanges if k in previous else None)
+            if conformed is INVALID:
+                problems.extend(value_problems)
+            else:
+                result[k] = conformed
+
+        if problems:
+            return INVALID, problems
+        if len(result) != len(x):
+            # keys were added or removed without being in changes
+            return super().reconform(p, x, previous, changes)
+        return result, []
@@ -0,0 +1,188 @@
+"""
+Validates values using an explicit stack instead of recursive calls, so there is no limit on how deeply values can be
+nested.
+
+Composite specs (see spec.impl.core.CompositeSpec) are evaluated one step at a time by running their _conform_steps()
+and _explain_steps() generators. Any other spec is treated as a leaf and has its conform() or explain() called directly.
+
+Results are identical to calling conform() and explain() on the spec.
+"""
+from typing import List, Dict, Tuple, Optional, Callable
+
+from spec.impl.core import Spec, SpecResult, Path, Problem, ConformStep, ExplainStep, INVALID
+
+# (type, method name) -> steps function, or None if steps can't be used in place of the method
+_STEPS = {}  # type: Dict[Tuple[type, str], Optional[Callable]]
+
+
+# values of these types are never worth deduplicating
+_UNSHARED = (str, bytes, int, float, bool, type(None))
+
+
+class Memo:
+    """
+    Results of conforming or explaining values with specs, keyed on the identity of both, so values which appear many
+    times within one larger value are only validated once by each spec.
+
+    A value which is reached again while it's still being validated by the same spec must contain itself. It is
+    invalid, with a problem saying so, rather than being validated forever.
+
+    Values are held by the memo, so their ids can't be reused for other values while it is alive.
+    """
+
+    def __init__(self):
+        # key -> (value, path, result)
+        self._results = {}  # type: Dict[Tuple[type, int, int], Tuple[object, Optional[Path], object]]
+        self._in_progress = {}  # type: Dict[Tuple[type, int, int], object]
+
+    @staticmethod
+    def _key(step):
+        if type(step.value) in _UNSHARED:
+            return None
+        return type(step), id(step.spec), id(step.value)
+
+    def contains(self, step) -> bool:
+        key = self._key(step)
+        return key is not None and (key in self._results or key in self._in_progress)
+
+    def get(self, step):
+        key = self._key(step)
+        if key in self._in_progress:
+            if type(step) is ConformStep:
+                return INVALID
+            return [Problem(step.path, step.value, step.spec, "contains itself")]
+
+        value, p, result = self._results[key]
+        if type(step) is ConformStep or p == step.path:
+            return result
+        # problems were found at a different path the first time the value was explained. Problems which are plain
+        # strings (e.g. DictSpec's missing keys) have no path to change
+        return [problem._replace(path=step.path + problem.path[len(p):]) if isinstance(problem, Problem) else problem
+                for problem in result]
+
+    def begin(self, step):
+        key = self._key(step)
+        if key is not None:
+            self._in_progress[key] = step.value
+
+    def put(self, step, result):
+        key = self._key(step)
+        if key is not None:
+            self._in_progress.pop(key, None)
+            self._results[key] = (step.value, getattr(step, 'path', None), result)
+
+
+def _defining_class(t: type, attribute: str) -> Optional[type]:
+    for klass in t.__mro__:
+        if attribute in vars(klass):
+            return klass
+    return None
+
+
+def _steps_function(t: type, method: str, steps: str) -> Optional[Callable]:
+    """
+    A subclass which overrides conform() or explain() without overriding the matching steps function can't be
+    evaluated using its superclass's steps, so is treated as a leaf
+    """
+    key = (t, method)
+    if key not in _STEPS:
+        method_class = _defining_class(t, method)
+        steps_class = _defining_class(t, steps)
+        if steps_class is not None and issubclass(steps_class, method_class):
+            _STEPS[key] = getattr(t, steps)
+        else:
+            _STEPS[key] = None
+    return _STEPS[key]
+
+
+def _start(step):
+    """
+    Returns a generator for composite specs, or None for leaves
+    """
+    spec = step.spec
+    if type(step) is ConformStep:
+        steps = _steps_function(type(spec), 'conform', '_conform_steps')
+        return steps(spec, step.value) if steps else None
+    else:
+        steps = _steps_function(type(spec), 'explain', '_explain_steps')
+        return steps(spec, step.path, step.value) if steps else None
+
+
+def _leaf(step):
+    if type(step) is ConformStep:
+        return step.spec.conform(step.value)
+    else:
+        return step.spec.explain(step.path, step.value)
+
+
+def _run(step, memo: 'Memo' = None):
+    stack = []
+    generator = None
+    current = None
+    while True:
+        if memo is not None and memo.contains(step):
+            result = memo.get(step)
+        else:
+            child = _start(step)
+            if child is None:
+                result = _leaf(step)
+                if memo is not None:
+                    memo.put(step, result)
+            else:
+                if generator is not None:
+                    stack.append((generator, current))
+                if memo is not None:
+                    memo.begin(step)
+                generator = child
+                current = step
+                result = None
+
+        if generator is None:
+            return result
+
+        while True:
+            try:
+                step = generator.send(result)
+                break
+            except StopIteration as stop:
+                result = stop.value
+                if memo is not None:
+                    memo.put(current, result)
+                if not stack:
+                    return result
+                generator, current = stack.pop()
+
+
+def conform(s: Spec, x: object, memo: Memo = None) -> SpecResult:
+    """
+    If memo is given, values which appear more than once in x are only conformed once by each spec
+    """
+    return _run(ConformStep(s, x), memo)
+
+
+def explain(s: Spec, p: Path, x: object, memo: Memo = None) -> List[Problem]:
+    """
+    If memo is given, values which appear more than once in x are only explained once by each spec
+    """
+    return _run(ExplainStep(s, p, x), memo)
+
+
+class DeduplicatingSpec(Spec):
+    """
+    Validates values which are shared between several places in x once per spec, and values which contain
+    themselves as invalid rather than recursing forever.
+
+    Each call to conform() or explain() has its own Memo.
+    """
+
+    def __init__(self, delegate: Spec):
+        self._delegate = delegate
+
+    def conform(self, x: object) -> SpecResult:
+        return conform(self._delegate, x, memo=Memo())
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        return explain(self._delegate, p, x, memo=Memo())
+
+    def describe(self) -> str:
+        return self._delegate.describe()
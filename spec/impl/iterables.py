@@ -1,38 +1,357 @@
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Tuple, Dict, Optional
 
-from spec.impl.core import Spec, SpecResult, Problem, Path, isinvalid, INVALID
+from spec.impl.core import Spec, CompositeSpec, SpecResult, Problem, Path, INVALID, Changes, ConformStep, \
+    ExplainStep, child_path, cached_description
+from spec.impl.util.strings import a_or_an
+from spec.impl.sampling import Sample, default_sample
 
 
-class CollOf(Spec):
-    def __init__(self, itemspec: Spec):
+class CollOf(CompositeSpec):
+    def __init__(self, itemspec: Spec, sample: Sample = None):
+        """
+        If sample is provided (or there is a default sample) only the sampled items are validated. Other items are
+        passed through unconformed.
+        """
         super().__init__()
         self._itemspec = itemspec
+        self._sample = sample
 
     def conform(self, xs: Iterable) -> SpecResult:
-        if not hasattr(xs, '__iter__'):
+        if not self._accepts(xs):
             return INVALID
 
+        sample = self._sample or default_sample()
+        if sample is not None:
+            return self._conform_sample(xs, sample)
+
         result = []
         for x in xs:
             v = self._itemspec.conform(x)
-            if isinvalid(v):
+            if v is INVALID:
                 return INVALID
             result.append(v)
 
+        return self._result(xs, result)
+
+    def _conform_sample(self, xs: Iterable, sample: Sample) -> SpecResult:
+        result = list(xs)
+        for i in sample.indices(len(result), id(xs)):
+            v = self._itemspec.conform(result[i])
+            if v is INVALID:
+                return INVALID
+            result[i] = v
+
+        return self._result(xs, result)
+
+    @staticmethod
+    def _accepts(xs: object) -> bool:
+        return hasattr(xs, '__iter__')
+
+    @staticmethod
+    def _not_accepted_reason(xs: object) -> str:
+        return "not iterable"
+
+    def _result(self, xs: Iterable, conformed: List) -> SpecResult:
+        """
+        Builds the value returned by conform() from a list of conformed items
+        """
         if isinstance(xs, tuple):
-            return tuple(result)
+            return tuple(conformed)
         else:
-            return result
+            return conformed
 
+    def _is_previous_result(self, previous: SpecResult) -> bool:
+        return isinstance(previous, (list, tuple))
+
+    def _updated_result(self, xs: Iterable, previous: SpecResult, updates: Dict[int, object]) -> SpecResult:
+        """
+        Builds the value returned by reconform() from a previous result and the conformed items which have changed
+        """
+        result = list(previous)
+        for i, v in updates.items():
+            result[i] = v
+        return self._result(xs, result)
+
+    @cached_description
     def describe(self) -> str:
         return "a collection where items are {}".format(self._itemspec.describe())
 
     def explain(self, p: Path, xs: Iterable) -> List[Problem]:
-        if not hasattr(xs, '__iter__'):
-            return [Problem(p, xs, self, "not iterable")]
+        if not self._accepts(xs):
+            return [Problem(p, xs, self, self._not_accepted_reason(xs))]
+
+        sample = self._sample or default_sample()
+        if sample is not None:
+            items = list(xs)
+            indexed_items = ((i, items[i]) for i in sample.explained_indices(len(items), id(xs)))
+        else:
+            indexed_items = enumerate(xs)
+
+        result = []
+        for i, x in indexed_items:
+            problems = self._itemspec.explain(child_path(p, i), x)
+            if problems:
+                result.extend(problems)
+        return result
+
+    def iter_problems(self, p: Path, xs: Iterable) -> Iterator[Problem]:
+        if not self._accepts(xs):
+            yield Problem(p, xs, self, self._not_accepted_reason(xs))
+            return
+
+        sample = self._sample or default_sample()
+        if sample is not None:
+            items = list(xs)
+            indexed_items = ((i, items[i]) for i in sample.explained_indices(len(items), id(xs)))
+        else:
+            indexed_items = enumerate(xs)
+
+        itemspec = self._itemspec
+        for i, x in indexed_items:
+            yield from itemspec.iter_problems(child_path(p, i), x)
+
+    def _conform_steps(self, xs: Iterable):
+        if not self._accepts(xs):
+            return INVALID
+
+        sample = self._sample or default_sample()
+        if sample is not None:
+            return (yield from self._conform_sample_steps(xs, sample))
+
+        result = []
+        for x in xs:
+            v = yield ConformStep(self._itemspec, x)
+            if v is INVALID:
+                return INVALID
+            result.append(v)
+
+        return self._result(xs, result)
+
+    def _conform_sample_steps(self, xs: Iterable, sample: Sample):
+        result = list(xs)
+        for i in sample.indices(len(result), id(xs)):
+            v = yield ConformStep(self._itemspec, result[i])
+            if v is INVALID:
+                return INVALID
+            result[i] = v
+
+        return self._result(xs, result)
+
+    def _explain_steps(self, p: Path, xs: Iterable):
+        if not self._accepts(xs):
+            return [Problem(p, xs, self, self._not_accepted_reason(xs))]
+
+        sample = self._sample or default_sample()
+        if sample is not None:
+            items = list(xs)
+            indexed_items = ((i, items[i]) for i in sample.explained_indices(len(items), id(xs)))
+        else:
+            indexed_items = enumerate(xs)
+
+        result = []
+        for i, x in indexed_items:
+            problems = yield ExplainStep(self._itemspec, child_path(p, i), x)
+            if problems:
+                result.extend(problems)
+        return result
+
+    def reconform(self, p: Path, xs: Iterable, previous: SpecResult, changes: Changes) \
+            -> Tuple[SpecResult, List[Problem]]:
+        """
+        Items can only be revalidated individually if xs is a sequence of the same length as previous. Otherwise
+        the whole collection is revalidated.
+        """
+        if changes is None \
+                or not self._is_previous_result(previous) \
+                or not (hasattr(xs, '__len__') and hasattr(xs, '__getitem__')) \
+                or len(xs) != len(previous):
+            return super().reconform(p, xs, previous, changes)
+
+        updates = {}
+        problems = []
+        valid = True
+        for i, subchanges in changes.items():
+            if not isinstance(i, int) or not 0 <= i < len(previous):
+                continue
+
+            conformed, item_problems = self._itemspec.reconform(child_path(p, i), xs[i], previous[i], subchanges)
+            if conformed is INVALID:
+                problems.extend(item_problems)
+                valid = False
+            else:
+                updates[i] = conformed
+
+        if not valid:
+            return INVALID, problems
+        return self._updated_result(xs, previous, updates), []
+
+
+class TupleOf(CollOf):
+    """
+    A tuple or list of any length whose items all conform to itemspec. Conforms to a tuple.
+    """
+
+    @staticmethod
+    def _accepts(xs: object) -> bool:
+        return isinstance(xs, (tuple, list))
+
+    @staticmethod
+    def _not_accepted_reason(xs: object) -> str:
+        return "expected a tuple or list but got {}".format(a_or_an(type(xs).__name__))
+
+    def _result(self, xs: Iterable, conformed: List) -> SpecResult:
+        return tuple(conformed)
+
+    @cached_description
+    def describe(self) -> str:
+        return "a tuple where items are {}".format(self._itemspec.describe())
+
+
+def _hashable(x: object) -> bool:
+    try:
+        hash(x)
+        return True
+    except TypeError:
+        return False
+
+
+class SetOf(CollOf):
+    """
+    A set or frozenset whose items all conform to itemspec. Conforms to a set, or a frozenset if given one.
+
+    Sets have no order, so the indices in paths of problems are the positions items happened to be iterated in.
+    Items which conform to unhashable values are invalid.
+    """
+
+    @staticmethod
+    def _accepts(xs: object) -> bool:
+        return isinstance(xs, (set, frozenset))
+
+    @staticmethod
+    def _not_accepted_reason(xs: object) -> str:
+        return "expected a set but got {}".format(a_or_an(type(xs).__name__))
+
+    def _result(self, xs: Iterable, conformed: List) -> SpecResult:
+        try:
+            return frozenset(conformed) if isinstance(xs, frozenset) else set(conformed)
+        except TypeError:
+            # items which conform to unhashable values (e.g. with coerce(list, ...)) can't be put in a set
+            return INVALID
+
+    def iter_problems(self, p: Path, xs: Iterable) -> Iterator[Problem]:
+        found = False
+        for problem in super().iter_problems(p, xs):
+            found = True
+            yield problem
+        if not found and not all(_hashable(self._itemspec.conform(x)) for x in self._explained_items(xs)):
+            yield self._unhashable_problem(p, xs)
+
+    def explain(self, p: Path, xs: Iterable) -> List[Problem]:
+        problems = super().explain(p, xs)
+        if problems or all(_hashable(self._itemspec.conform(x)) for x in self._explained_items(xs)):
+            return problems
+        return [self._unhashable_problem(p, xs)]
+
+    def _explain_steps(self, p: Path, xs: Iterable):
+        problems = yield from super()._explain_steps(p, xs)
+        if problems:
+            return problems
+        for x in self._explained_items(xs):
+            if not _hashable((yield ConformStep(self._itemspec, x))):
+                return [self._unhashable_problem(p, xs)]
+        return problems
+
+    def _explained_items(self, xs: Iterable) -> Iterable:
+        """
+        The items explain() checks, i.e. the ones conform() checked, without counting them in the sample's report again
+        """
+        sample = self._sample or default_sample()
+        if sample is None:
+            return xs
+        items = list(xs)
+        return [items[i] for i in sample.explained_indices(len(items), id(xs))]
+
+    def _unhashable_problem(self, p: Path, xs: Iterable) -> Problem:
+        return Problem(p, xs, self, "items conform to values which can't be put in a set")
+
+    @cached_description
+    def describe(self) -> str:
+        return "a set where items are {}".format(self._itemspec.describe())
+
+
+class FixedTupleOf(CompositeSpec):
+    """
+    A tuple or list with exactly one item for each of specs, each conforming to the corresponding spec. Conforms to a
+    tuple.
+    """
+
+    def __init__(self, specs: Iterable[Spec]):
+        self._specs = tuple(specs)
+
+    @cached_description
+    def describe(self) -> str:
+        return "a tuple of ({})".format(", ".join(s.describe() for s in self._specs))
+
+    def _problem(self, p: Path, xs: object) -> Optional[Problem]:
+        if not isinstance(xs, (tuple, list)):
+            return Problem(p, xs, self, "expected a tuple or list but got {}".format(a_or_an(type(xs).__name__)))
+        if len(xs) != len(self._specs):
+            return Problem(p, xs, self, "expected {} items but got {}".format(len(self._specs), len(xs)))
+        return None
+
+    def conform(self, xs: Iterable) -> SpecResult:
+        if not isinstance(xs, (tuple, list)) or len(xs) != len(self._specs):
+            return INVALID
+
+        result = []
+        for s, x in zip(self._specs, xs):
+            v = s.conform(x)
+            if v is INVALID:
+                return INVALID
+            result.append(v)
+        return tuple(result)
+
+    def explain(self, p: Path, xs: Iterable) -> List[Problem]:
+        problem = self._problem(p, xs)
+        if problem is not None:
+            return [problem]
+
+        result = []
+        for i, (s, x) in enumerate(zip(self._specs, xs)):
+            problems = s.explain(child_path(p, i), x)
+            if problems:
+                result.extend(problems)
+        return result
+
+    def iter_problems(self, p: Path, xs: Iterable) -> Iterator[Problem]:
+        problem = self._problem(p, xs)
+        if problem is not None:
+            yield problem
+            return
+
+        for i, (s, x) in enumerate(zip(self._specs, xs)):
+            yield from s.iter_problems(child_path(p, i), x)
+
+    def _conform_steps(self, xs: Iterable):
+        if not isinstance(xs, (tuple, list)) or len(xs) != len(self._specs):
+            return INVALID
+
+        result = []
+        for s, x in zip(self._specs, xs):
+            v = yield ConformStep(s, x)
+            if v is INVALID:
+                return INVALID
+            result.append(v)
+        return tuple(result)
+
+    def _explain_steps(self, p: Path, xs: Iterable):
+        problem = self._problem(p, xs)
+        if problem is not None:
+            return [problem]
+
         result = []
-        for i, x in enumerate(xs):
-            problems = self._itemspec.explain(p + (i,), x)
+        for i, (s, x) in enumerate(zip(self._specs, xs)):
+            problems = yield ExplainStep(s, child_path(p, i), x)
             if problems:
                 result.extend(problems)
         return result
@@ -0,0 +1,230 @@
+from collections.abc import Mapping, Sized
+from time import monotonic
+from typing import Iterator, Optional
+
+from spec.impl.core import Spec, CompositeSpec, Path, Problem, INVALID, ConformStep, ExplainStep
+
+_STRINGS = (str, bytes, bytearray)
+_CONTAINERS = (Mapping, list, tuple, set, frozenset)
+# values of these types are never too big
+_SCALARS = {int, float, bool, type(None)}
+
+
+class Limits:
+    """
+    Limits on the size of values, checked as a spec reads each value and before it reads any further into it, so
+    that huge or deeply nested values are rejected cheaply rather than being validated. Parts of a value which the
+    spec never reads aren't checked.
+
+    max_length: maximum len() of any dict, list, tuple, set or other sized value
+    max_size: maximum length of any str, bytes or bytearray, including dict keys read by map_of()
+    max_depth: maximum nesting of dicts, lists, tuples and sets. The value itself is at depth 0.
+    max_nodes: maximum number of values read, counting containers and everything in them
+    timeout: maximum seconds spent validating
+
+    None means unlimited
+    """
+
+    def __init__(self,
+                 max_length: int = None,
+                 max_size: int = None,
+                 max_depth: int = None,
+                 max_nodes: int = None,
+                 timeout: float = None):
+        self.max_length = max_length
+        self.max_size = max_size
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+
+    def deadline(self) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        return monotonic() + self.timeout
+
+    def __repr__(self):
+        return "Limits(max_length={}, max_size={}, max_depth={}, max_nodes={}, timeout={})".format(
+            self.max_length, self.max_size, self.max_depth, self.max_nodes, self.timeout)
+
+
+class _Walk:
+    """
+    One pass of a LimitedSpec's delegate over a value: how many values it has read so far, and the first limit
+    exceeded
+    """
+
+    def __init__(self, spec: 'LimitedSpec', limits: Limits, deadline: Optional[float]):
+        # imported lazily to keep `import spec.core` fast
+        from spec.impl import engine
+        # noinspection PyProtectedMember
+        self.steps_function = engine._steps_function
+        self.spec = spec
+        self.limits = limits
+        self.deadline = deadline
+        self.nodes = 0
+        self.violation = None  # type: Optional[Problem]
+
+    def visit(self, p: Path, x: object, depth: int) -> bool:
+        """
+        Counts x as read, returning False and recording a violation if it exceeds the limits
+        """
+        reason = self._reason(x, depth)
+        if reason is None:
+            return True
+        self.violation = Problem(p, x, self.spec, reason)
+        return False
+
+    def _reason(self, x: object, depth: int) -> Optional[str]:
+        limits = self.limits
+
+        self.nodes += 1
+        if limits.max_nodes is not None and self.nodes > limits.max_nodes:
+            return "more than {} values".format(limits.max_nodes)
+        if self.deadline is not None and monotonic() > self.deadline:
+            return "took longer than {}s to validate".format(limits.timeout)
+
+        if type(x) in _SCALARS:
+            return None
+
+        if isinstance(x, _STRINGS):
+            if limits.max_size is not None and len(x) > limits.max_size:
+                return "length {} is greater than maximum of {}".format(len(x), limits.max_size)
+            return None
+
+        if not isinstance(x, Sized):
+            return None
+
+        n = len(x)
+        if limits.max_length is not None and n > limits.max_length:
+            return "length {} is greater than maximum of {}".format(n, limits.max_length)
+        if limits.max_depth is not None and n and depth >= limits.max_depth and isinstance(x, _CONTAINERS):
+            return "nested more than {} deep".format(limits.max_depth)
+        return None
+
+    def checked(self, s: Spec, p: Path, depth: int, explaining: bool) -> Spec:
+        """
+        s, wrapped so that the values it reads are checked too, unless it's a leaf which reads no further
+        """
+        if explaining:
+            steps = self.steps_function(type(s), 'explain', '_explain_steps')
+        else:
+            steps = self.steps_function(type(s), 'conform', '_conform_steps')
+        return s if steps is None else _Checked(s, self, p, depth)
+
+
+class _Checked(CompositeSpec):
+    """
+    Runs the steps of delegate, checking each value it passes to a child spec before the child reads it.
+
+    Values passed on unchanged (e.g. by all_of()) aren't counted again or nested any deeper. p is the path of the
+    values delegate is given, or the nearest known path when conforming, where paths aren't tracked.
+    """
+
+    def __init__(self, delegate: Spec, walk: _Walk, p: Path, depth: int):
+        self._delegate = delegate
+        self._walk = walk
+        self._path = p
+        self._depth = depth
+
+    def describe(self) -> str:
+        return self._delegate.describe()
+
+    # these return _checked_steps() generators rather than being generators themselves, to save a layer of generators
+    # per value
+
+    def _conform_steps(self, x: object):
+        steps = self._walk.steps_function(type(self._delegate), 'conform', '_conform_steps')
+        return self._checked_steps(steps(self._delegate, x), self._path, x, INVALID)
+
+    def _explain_steps(self, p: Path, x: object):
+        steps = self._walk.steps_function(type(self._delegate), 'explain', '_explain_steps')
+        return self._checked_steps(steps(self._delegate, p, x), p, x, [])
+
+    def _checked_steps(self, steps, p: Path, x: object, stopped: object):
+        """
+        Returns stopped, without running any more of steps, once any limit has been exceeded
+        """
+        walk = self._walk
+        result = None
+        while True:
+            try:
+                step = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+
+            if type(step) is ConformStep:
+                s, value = step
+                child_path = p
+            else:
+                s, child_path, value = step
+
+            depth = self._depth
+            if value is not x:
+                depth += 1
+                if not walk.visit(child_path, value, depth):
+                    return stopped
+
+            explaining = type(step) is not ConformStep
+            checked = walk.checked(s, child_path, depth, explaining)
+            if checked is s:
+                result = yield step
+            elif explaining:
+                result = yield ExplainStep(checked, child_path, value)
+            else:
+                result = yield ConformStep(checked, value)
+
+            if walk.violation is not None:
+                return stopped
+
+
+class LimitedSpec(CompositeSpec):
+    """
+    Checks each value delegate reads against limits as it is read, so that delegate never reads past the first
+    limit x exceeds.
+
+    Only conforming can be stopped part way through a value: explain() conforms x first, and only explains it if
+    it's invalid.
+    """
+
+    def __init__(self, delegate: Spec, limits: Limits):
+        self._delegate = delegate
+        self._limits = limits
+
+    def describe(self) -> str:
+        return self._delegate.describe()
+
+    def _conform_steps(self, x: object):
+        conformed, walk = yield from self._checked_conform_steps(x, self._limits.deadline())
+        return INVALID if walk.violation is not None else conformed
+
+    def _checked_conform_steps(self, x: object, deadline: Optional[float], p: Path = ()):
+        walk = _Walk(self, self._limits, deadline)
+        if not walk.visit(p, x, 0):
+            return INVALID, walk
+        conformed = yield ConformStep(walk.checked(self._delegate, p, 0, False), x)
+        return conformed, walk
+
+    def _explain_steps(self, p: Path, x: object):
+        deadline = self._limits.deadline()
+        conformed, walk = yield from self._checked_conform_steps(x, deadline, p)
+        if walk.violation is None and conformed is not INVALID:
+            return []
+
+        # explaining reads everything conforming did, so finds the same violation, but knows where it is
+        explain_walk = _Walk(self, self._limits, deadline)
+        if not explain_walk.visit(p, x, 0):
+            return [explain_walk.violation]
+        problems = yield ExplainStep(explain_walk.checked(self._delegate, p, 0, True), p, x)
+        if explain_walk.violation is not None:
+            return [explain_walk.violation]
+        if walk.violation is not None:
+            return [walk.violation]
+        return problems
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        """
+        Yields the problems found by explain(). The delegate's iter_problems() would read x without the limits being
+        checked, so isn't used.
+        """
+        return iter(self.explain(p, x))
+
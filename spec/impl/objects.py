@@ -0,0 +1,261 @@
+from operator import attrgetter
+from typing import Dict, Iterator, List, Tuple
+
+from spec.impl.core import Spec, CompositeSpec, SpecResult, Path, Problem, INVALID, Changes, ConformStep, \
+    ExplainStep, child_path, cached_description
+
+_MISSING = object()
+
+
+def _getter(name: str):
+    get = attrgetter(name)
+
+    def get_or_missing(x):
+        try:
+            return get(x)
+        except AttributeError:
+            return _MISSING
+
+    return get_or_missing
+
+
+def _replaced(x: object, changed: Dict[str, object]) -> object:
+    if isinstance(x, tuple) and hasattr(x, '_replace'):
+        # namedtuples can't have their attributes set
+        return x._replace(**changed)
+
+    try:
+        # imported lazily to keep `import spec.core` fast
+        import dataclasses
+    except ImportError:
+        # dataclasses were added in python 3.7
+        dataclasses = None
+    if dataclasses is not None and dataclasses.is_dataclass(x) and not isinstance(x, type):
+        # so that __post_init__() runs again
+        return dataclasses.replace(x, **changed)
+
+    # imported lazily to keep `import spec.core` fast
+    import copy
+    result = copy.copy(x)
+    for name, value in changed.items():
+        # object.__setattr__ so that objects which prevent setting attributes can be copied too
+        object.__setattr__(result, name, value)
+    return result
+
+
+def copy_with(x: object, changed: Dict[str, object]) -> object:
+    """
+    A shallow copy of x with the attributes in changed replaced. Dotted names replace attributes of copies of the
+    objects they are on.
+
+    Raises whatever copying or setting attributes raises, e.g. AttributeError for read-only properties.
+    """
+    direct = {}
+    nested = {}
+    for name, value in changed.items():
+        head, dot, rest = name.partition('.')
+        if dot:
+            nested.setdefault(head, {})[rest] = value
+        else:
+            direct[name] = value
+
+    for head, changed_within in nested.items():
+        direct[head] = copy_with(direct[head] if head in direct else getattr(x, head), changed_within)
+    return _replaced(x, direct)
+
+
+def copied(x: object, changed: Dict[str, object]) -> SpecResult:
+    """
+    copy_with(), or INVALID if x can't be copied with the changed attributes
+    """
+    # noinspection PyBroadException
+    try:
+        return copy_with(x, changed)
+    except Exception:
+        return INVALID
+
+
+def copy_problems(p: Path, x: object, s: Spec, changed: Dict[str, object]) -> List[Problem]:
+    """
+    The problem with an object whose attributes all conform, but which can't be copied with the conformed values
+    """
+    try:
+        copy_with(x, changed)
+    except Exception as e:
+        return [Problem(p, x, s, "could not copy with conformed {}: {}".format(", ".join(sorted(changed)), e))]
+    return []
+
+
+def _attribute_changes(changes: Changes, name: str) -> Tuple[bool, Changes]:
+    """
+    Whether a trie of changed paths includes the attribute name, which may be dotted, and the changes within it
+    """
+    if name in changes:
+        return True, changes[name]
+    for part in name.split('.'):
+        if changes is None:
+            return True, None
+        if part not in changes:
+            return False, None
+        changes = changes[part]
+    return True, changes
+
+
+class ObjectSpec(CompositeSpec):
+    """
+    Like DictSpec, but for the attributes of objects (e.g. Record instances or dataclasses) rather than the values of
+    dicts, so objects can be validated without converting them to dicts.
+
+    Conforms to x itself if conforming leaves every attribute's value as the same object, otherwise to a shallow copy
+    of x with the conformed values (see copy_with()). coll_of() always conforms to a new collection, so objects with
+    collections are copied. Objects which can't be copied are invalid.
+    """
+
+    def __init__(self, attr_to_spec: Dict[str, Spec]):
+        self._attr_to_spec = attr_to_spec
+        self._fields = tuple((name, _getter(name), s) for name, s in attr_to_spec.items())
+
+    @cached_description
+    def describe(self) -> str:
+        # imported lazily to keep `import spec.core` fast
+        from pprint import pformat
+        return "Object with attributes:\n{}".format(pformat(self._attr_to_spec))
+
+    def conform(self, x: object) -> SpecResult:
+        changed = None
+        for name, get, s in self._fields:
+            value = get(x)
+            if value is _MISSING:
+                return INVALID
+
+            conformed = s.conform(value)
+            if conformed is INVALID:
+                return INVALID
+            if conformed is not value:
+                if changed is None:
+                    changed = {}
+                changed[name] = conformed
+
+        return x if changed is None else copied(x, changed)
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        problems = []
+        for name, get, s in self._fields:
+            value = get(x)
+            if value is _MISSING:
+                problems.append(Problem(p, x, self, "missing attribute {}".format(name)))
+                continue
+
+            problems.extend(s.explain(child_path(p, name), value))
+
+        if problems:
+            return problems
+
+        changed = self._changed(x)
+        return copy_problems(p, x, self, changed) if changed else []
+
+    def _changed(self, x: object) -> Dict[str, object]:
+        """
+        The conformed values of attributes of x which conform to different objects. Only called once every attribute
+        is known to conform.
+        """
+        changed = {}
+        for name, get, s in self._fields:
+            value = get(x)
+            conformed = s.conform(value)
+            if conformed is not value:
+                changed[name] = conformed
+        return changed
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        found = False
+        for name, get, s in self._fields:
+            value = get(x)
+            if value is _MISSING:
+                found = True
+                yield Problem(p, x, self, "missing attribute {}".format(name))
+                continue
+
+            for problem in s.iter_problems(child_path(p, name), value):
+                found = True
+                yield problem
+
+        if not found:
+            changed = self._changed(x)
+            if changed:
+                yield from copy_problems(p, x, self, changed)
+
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        if changes is None or previous is INVALID:
+            return super().reconform(p, x, previous, changes)
+
+        changed = None
+        problems = []
+        for name, get, s in self._fields:
+            value = get(x)
+            previous_value = get(previous)
+            if value is _MISSING or previous_value is _MISSING:
+                return super().reconform(p, x, previous, changes)
+
+            has_changed, subchanges = _attribute_changes(changes, name)
+            if has_changed:
+                conformed, subspec_problems = s.reconform(child_path(p, name), value, previous_value, subchanges)
+                if conformed is INVALID:
+                    problems.extend(subspec_problems)
+                    continue
+            else:
+                conformed = previous_value
+
+            if conformed is not value:
+                if changed is None:
+                    changed = {}
+                changed[name] = conformed
+
+        if problems:
+            return INVALID, problems
+        if changed is None:
+            return x, []
+        result = copied(x, changed)
+        if result is INVALID:
+            return INVALID, copy_problems(p, x, self, changed)
+        return result, []
+
+    def _conform_steps(self, x: object):
+        changed = None
+        for name, get, s in self._fields:
+            value = get(x)
+            if value is _MISSING:
+                return INVALID
+
+            conformed = yield ConformStep(s, value)
+            if conformed is INVALID:
+                return INVALID
+            if conformed is not value:
+                if changed is None:
+                    changed = {}
+                changed[name] = conformed
+
+        return x if changed is None else copied(x, changed)
+
+    def _explain_steps(self, p: Path, x: object):
+        problems = []
+        for name, get, s in self._fields:
+            value = get(x)
+            if value is _MISSING:
+                problems.append(Problem(p, x, self, "missing attribute {}".format(name)))
+                continue
+
+            subspec_problems = yield ExplainStep(s, child_path(p, name), value)
+            if subspec_problems:
+                problems.extend(subspec_problems)
+
+        if problems:
+            return problems
+
+        changed = {}
+        for name, get, s in self._fields:
+            value = get(x)
+            conformed = yield ConformStep(s, value)
+            if conformed is not value:
+                changed[name] = conformed
+        return copy_problems(p, x, self, changed) if changed else []
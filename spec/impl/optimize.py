@@ -0,0 +1,326 @@
+import copy
+import operator
+from itertools import groupby
+from numbers import Real
+from typing import List, Iterable
+
+from spec.impl.core import Spec, SpecResult, SimpleSpec, DecoratedSpec, INVALID, ConformStep
+from spec.impl.dicts import DictSpec
+from spec.impl.iterables import CollOf
+from spec.impl.specs import Any, Never, EqualTo, IsInstance, IsNone, IsIn, Bounded, Even, Odd, Coerce, OneOf, AllOf
+from spec.impl.strings import StringSpec, StrLen, StartsWith, EndsWith, StringChecks, StringAllOf
+
+
+class DescribedAs(DecoratedSpec):
+    """
+    Describes itself the same way as the spec it replaced
+    """
+
+    def __init__(self, delegate: Spec, original: Spec):
+        super().__init__(delegate)
+        self._original = original
+
+    def describe(self) -> str:
+        return self._original.describe()
+
+
+class OptimizedAllOf(AllOf):
+    """
+    Conforms members in order of cost, but explains them in declared order, so explanations are the same as the
+    original spec's
+    """
+
+    def __init__(self, specs: Iterable[Spec], conform_order: Iterable[Spec], original: Spec):
+        super().__init__(specs)
+        self._conform_order = tuple(conform_order)
+        self._original = original
+
+    def conform(self, x) -> SpecResult:
+        for s in self._conform_order:
+            x = s.conform(x)
+            if x is INVALID:
+                return x
+        return x
+
+    def _conform_steps(self, x):
+        for s in self._conform_order:
+            x = yield ConformStep(s, x)
+            if x is INVALID:
+                return x
+        return x
+
+    def describe(self) -> str:
+        return self._original.describe()
+
+
+class OptimizedOneOf(OneOf):
+    def __init__(self, specs: Iterable[Spec], original: Spec):
+        super().__init__(specs)
+        self._original = original
+
+    def describe(self) -> str:
+        return self._original.describe()
+
+
+class BoundsCheck(Bounded):
+    """
+    The combination of several Bounded specs, checked in one go
+    """
+
+    def __init__(self, lower, lower_inclusive: bool, upper, upper_inclusive: bool):
+        lower_op = operator.ge if lower_inclusive else operator.gt
+        upper_op = operator.le if upper_inclusive else operator.lt
+
+        if lower is None:
+            check = lambda x: upper_op(x, upper)
+        elif upper is None:
+            check = lambda x: lower_op(x, lower)
+        else:
+            check = lambda x: lower_op(x, lower) and upper_op(x, upper)
+
+        bounds = []
+        if lower is not None:
+            bounds.append("{} {}".format(">=" if lower_inclusive else ">", lower))
+        if upper is not None:
+            bounds.append("{} {}".format("<=" if upper_inclusive else "<", upper))
+
+        super().__init__(" and ".join(bounds),
+                         check,
+                         lower=lower, lower_inclusive=lower_inclusive,
+                         upper=upper, upper_inclusive=upper_inclusive)
+
+
+_ALL_OFS = (AllOf, OptimizedAllOf, StringAllOf)
+_ONE_OFS = (OneOf, OptimizedOneOf)
+_DECORATED = (DecoratedSpec, DescribedAs)
+
+
+def _is_pure(s: Spec) -> bool:
+    """
+    Pure specs conform values to themselves, so can be checked in any order
+    """
+    t = type(s)
+    if isinstance(s, SimpleSpec):
+        return t.conform is SimpleSpec.conform
+    if t in (Any, Never, IsIn):
+        return True
+    if t in _DECORATED:
+        # noinspection PyProtectedMember
+        return _is_pure(s._delegate)
+    if t in _ALL_OFS or t in _ONE_OFS:
+        # noinspection PyProtectedMember
+        return all(_is_pure(m) for m in s._specs)
+    return False
+
+
+def _cost(s: Spec) -> int:
+    if isinstance(s, (IsInstance, IsNone, Never)):
+        return 0
+    if isinstance(s, (EqualTo, IsIn, Bounded, Even, Odd, StrLen, StartsWith, EndsWith)):
+        return 1
+    if type(s) in _DECORATED:
+        # noinspection PyProtectedMember
+        return _cost(s._delegate)
+    if type(s) in _ALL_OFS or type(s) in _ONE_OFS or isinstance(s, StringChecks):
+        return 2
+    return 3
+
+
+def _mergeable(s: Spec) -> bool:
+    return isinstance(s, Bounded) \
+           and (s.lower is None or isinstance(s.lower, Real)) \
+           and (s.upper is None or isinstance(s.upper, Real))
+
+
+def _merge_bounds(specs: List[Bounded]) -> BoundsCheck:
+    lower, lower_inclusive, upper, upper_inclusive = None, True, None, False
+    for s in specs:
+        if s.lower is not None:
+            if lower is None or s.lower > lower or (s.lower == lower and not s.lower_inclusive):
+                lower, lower_inclusive = s.lower, s.lower_inclusive
+        if s.upper is not None:
+            if upper is None or s.upper < upper or (s.upper == upper and not s.upper_inclusive):
+                upper, upper_inclusive = s.upper, s.upper_inclusive
+    return BoundsCheck(lower, lower_inclusive, upper, upper_inclusive)
+
+
+def _cannot_raise(s: Spec) -> bool:
+    """
+    Specs which can't raise, whatever they are given, so can be checked before the members of an all_of which
+    were declared before them. Anything else (e.g. gt(), which can't compare strings to numbers) may rely on
+    earlier members to guard it.
+    """
+    t = type(s)
+    if isinstance(s, (IsInstance, IsNone, Never, Any, Even, Odd, StringSpec, StringChecks)):
+        return True
+    if t in _DECORATED:
+        # noinspection PyProtectedMember
+        return _cannot_raise(s._delegate)
+    if t in _ALL_OFS or t in _ONE_OFS:
+        # noinspection PyProtectedMember
+        return all(_cannot_raise(m) for m in s._specs)
+    return False
+
+
+def _merge_adjacent_bounds(specs: List[Spec]) -> List[Spec]:
+    merged = []
+    for mergeable, group in groupby(specs, key=_mergeable):
+        group = list(group)
+        if mergeable and len(group) > 1:
+            merged.append(_merge_bounds(group))
+        else:
+            merged.extend(group)
+    return merged
+
+
+def _cheapest_first(run: List[Spec]) -> List[Spec]:
+    """
+    Orders a run of pure specs so that cheap checks are made first, removing duplicates and merging bounds.
+
+    Only specs which can't raise are moved ahead of others. The rest keep their declared order, as earlier members
+    may be guarding them (e.g. all_of(lambda x: isinstance(x, int), gt(0))), so only adjacent bounds are merged.
+    """
+    unique = []
+    for s in run:
+        if not any(s == u for u in unique):
+            unique.append(s)
+
+    safe = [s for s in unique if _cannot_raise(s)]
+    guarded = [s for s in unique if not _cannot_raise(s)]
+
+    strings = [s for s in safe if isinstance(s, StringSpec)]
+    if len(strings) > 1:
+        safe = [s for s in safe if not any(s is b for b in strings)] + [StringChecks(strings)]
+
+    return sorted(safe, key=_cost) + _merge_adjacent_bounds(guarded)
+
+
+def _conform_order(members: List[Spec]) -> List[Spec]:
+    """
+    Specs which transform values stay where they are. Runs of pure specs between them are reordered.
+    """
+    order = []
+    run = []
+    for s in members:
+        if _is_pure(s):
+            run.append(s)
+        else:
+            order.extend(_cheapest_first(run))
+            run = []
+            order.append(s)
+    order.extend(_cheapest_first(run))
+    return order
+
+
+class _Optimizer:
+    def __init__(self):
+        # id(spec) -> (spec, optimized spec), so shared subtrees stay shared
+        self._optimized = {}
+
+    def optimize(self, s: Spec) -> Spec:
+        entry = self._optimized.get(id(s))
+        if entry is not None:
+            return entry[1]
+        optimized = self._optimize(s)
+        self._optimized[id(s)] = (s, optimized)
+        return optimized
+
+    # noinspection PyProtectedMember
+    def _optimize(self, s: Spec) -> Spec:
+        t = type(s)
+
+        if t in _DECORATED:
+            delegate = self.optimize(s._delegate)
+            if t is DescribedAs:
+                return DescribedAs(delegate, s._original)
+            if not s._description:
+                return delegate
+            if type(delegate) in _DECORATED:
+                delegate = delegate._delegate
+            return DecoratedSpec(delegate, s._description)
+
+        if t in _ALL_OFS:
+            return self._all_of(s)
+
+        if t in _ONE_OFS:
+            return self._one_of(s)
+
+        # Specs are only copied if their children have changed, so problems refer to the original specs wherever
+        # possible
+        if isinstance(s, DictSpec):
+            key_to_spec = {k: self.optimize(v) for k, v in s._key_to_spec.items()}
+            if all(key_to_spec[k] is v for k, v in s._key_to_spec.items()):
+                return s
+            optimized = copy.copy(s)
+            optimized._key_to_spec = key_to_spec
+            return optimized
+
+        if isinstance(s, CollOf):
+            itemspec = self.optimize(s._itemspec)
+            if itemspec is s._itemspec:
+                return s
+            optimized = copy.copy(s)
+            optimized._itemspec = itemspec
+            return optimized
+
+        if isinstance(s, Coerce):
+            delegate = self.optimize(s._delegate)
+            if delegate is s._delegate:
+                return s
+            optimized = copy.copy(s)
+            optimized._delegate = delegate
+            return optimized
+
+        return s
+
+    # noinspection PyProtectedMember
+    def _all_of(self, s: AllOf) -> Spec:
+        members = []
+        for m in s._specs:
+            m = self.optimize(m)
+            if type(m) in _ALL_OFS:
+                members.extend(m._specs)
+            elif type(m) is not Any:
+                members.append(m)
+
+        if not members:
+            return DescribedAs(Any(), s)
+        if len(members) == 1:
+            return DescribedAs(members[0], s)
+        return OptimizedAllOf(members, _conform_order(members), s)
+
+    # noinspection PyProtectedMember
+    def _one_of(self, s: OneOf) -> Spec:
+        branches = []
+        for b in s._specs:
+            b = self.optimize(b)
+            if type(b) in _ONE_OFS:
+                branches.extend(b._specs)
+            else:
+                branches.append(b)
+
+        # Any always matches, so later branches will never be tried
+        for i, b in enumerate(branches):
+            if type(b) is Any:
+                branches = branches[:i + 1]
+                break
+
+        if len(branches) == 1:
+            return DescribedAs(branches[0], s)
+        return OptimizedOneOf(branches, s)
+
+
+def optimize(s: Spec) -> Spec:
+    """
+    Rewrites s into an equivalent spec which is cheaper to conform:
+
+    * nested all_of and one_of are flattened
+    * branches of one_of after any_() are removed, as are any_() members of all_of
+    * DecoratedSpecs that don't change the description are removed
+    * members of all_of that don't change the value are checked cheapest first, with duplicates removed, adjacent
+      numeric bounds (gt, lt, in_range etc.) merged into a single check and string specs (matches, str_len etc.)
+      checked in one go. Members which might raise (e.g. gt() given a string) are never moved ahead of others
+
+    Descriptions and explanations are the same as the original spec's
+    """
+    return _Optimizer().optimize(s)
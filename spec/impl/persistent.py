@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, List
+
+from pyrsistent import pmap, pvector, PMap, PVector
+
+from spec.impl.core import SpecResult
+from spec.impl.dicts import DictSpec
+from spec.impl.iterables import CollOf
+
+
+class PersistentDictSpec(DictSpec):
+    """
+    Conforms to a pyrsistent PMap
+
+    If x is already a PMap containing exactly the conformed values, x itself is returned, so conforming the output
+    of a previous conform is free in memory terms. reconform() shares structure with the previous result.
+    """
+
+    def _result(self, x: object, conformed: Dict) -> SpecResult:
+        if isinstance(x, PMap) \
+                and len(x) == len(conformed) \
+                and all(k in x and x[k] is v for k, v in conformed.items()):
+            return x
+        return pmap(conformed)
+
+    def _is_previous_result(self, previous: SpecResult) -> bool:
+        return isinstance(previous, PMap)
+
+    def _updated_result(self, x: object, previous: PMap, updates: Dict) -> SpecResult:
+        return previous.update(updates)
+
+
+class PersistentCollOf(CollOf):
+    """
+    Conforms to a pyrsistent PVector
+
+    If xs is already a PVector containing exactly the conformed items, xs itself is returned, so conforming the
+    output of a previous conform is free in memory terms. reconform() shares structure with the previous result.
+    """
+
+    def _result(self, xs: Iterable, conformed: List) -> SpecResult:
+        if isinstance(xs, PVector) \
+                and len(xs) == len(conformed) \
+                and all(a is b for a, b in zip(xs, conformed)):
+            return xs
+        return pvector(conformed)
+
+    def _is_previous_result(self, previous: SpecResult) -> bool:
+        return isinstance(previous, PVector)
+
+    def _updated_result(self, xs: Iterable, previous: PVector, updates: Dict[int, object]) -> SpecResult:
+        evolver = previous.evolver()
+        for i, v in updates.items():
+            evolver[i] = v
+        return evolver.persistent()
@@ -1,10 +1,14 @@
-from typing import TypeVar, Union, List, _ForwardRef, Any
+from functools import partial
+from typing import TypeVar, Union, List, _ForwardRef, Any, Mapping, Callable, Dict, Tuple, Set, FrozenSet, Optional
 
-from spec.core import is_instance, all_of, one_of, coll_of, any_
+from spec.core import is_instance, all_of, one_of, coll_of, any_, map_of, tuple_of, set_of
 from spec.impl.dicts import DictSpec
 from spec.impl.records.annotations import AnnotationContext, extract_annotations
 from spec.impl.records.forwardrefs import resolve_forward_ref, DeferredSpecFromForwardReference
-from spec.impl.records.typevars import UnboundTypeVar, UnboundTypeVarSpec, UnboundTypeVarDictSpec, _typevar_key
+from spec.impl.objects import ObjectSpec
+from spec.impl.records.instances import slotted_class, instance_from_dict, RecordInstanceSpec
+from spec.impl.records.typevars import UnboundTypeVar, UnboundTypeVarSpec, UnboundTypeVarDictSpec, \
+    UnboundTypeVarObjectSpec, _typevar_key
 
 
 def resolve_typevar(a: AnnotationContext) -> Union[AnnotationContext, UnboundTypeVar]:
@@ -20,22 +24,105 @@ def resolve_typevar(a: AnnotationContext) -> Union[AnnotationContext, UnboundTyp
         return AnnotationContext(bound_to, a.class_annotation_was_on, a.typevars_from_class)
 
 
-def spec_from(x: Union[AnnotationContext, type]):
+# List[int].__origin__ is List in python 3.6, but list from python 3.7
+_BUILTIN_GENERICS = {List: list, Dict: dict, Tuple: tuple, Set: set, FrozenSet: frozenset}
+_GENERIC_ORIGINS = frozenset(_BUILTIN_GENERICS.values())
+
+
+def generic_origin(hint: object) -> Optional[type]:
+    """
+    list for List or List[int], dict for Dict or Dict[str, int] etc., otherwise None
+    """
+    origin = getattr(hint, '__origin__', None)
+    if origin is None:
+        # unparameterised, in python 3.6
+        origin = hint
+    try:
+        origin = _BUILTIN_GENERICS.get(origin, origin)
+        return origin if origin in _GENERIC_ORIGINS and origin is not hint else None
+    except TypeError:
+        # unhashable
+        return None
+
+
+def generic_args(hint: object) -> tuple:
+    """
+    The parameters of a generic, e.g. (str, int) for Dict[str, int], or () if it isn't parameterised
+    """
+    if getattr(hint, '_special', False):
+        # unparameterised, in python 3.7 and 3.8
+        return ()
+    return getattr(hint, '__args__', None) or ()
+
+
+def _is_empty_tuple(hint: object) -> bool:
+    """
+    Tuple[()], whose __args__ are ((),) before python 3.11 and () from 3.11
+    """
+    return not getattr(hint, '_special', False) and getattr(hint, '__args__', None) in (((),), ())
+
+
+def _spec_from_generic(x: AnnotationContext, origin: type, recurse: Callable):
+    args = [recurse(x.for_hint(a)) if a is not Ellipsis else a
+            for a in generic_args(x.annotation) if a != ()]
+
+    if origin is list:
+        return coll_of(args[0] if args else any_())
+
+    if origin is dict:
+        return map_of(*args) if args else map_of(any_(), any_())
+
+    if origin in (set, frozenset):
+        return set_of(args[0] if args else any_())
+
+    if _is_empty_tuple(x.annotation):
+        return tuple_of()
+    if not args:
+        return tuple_of(any_(), ...)
+    return tuple_of(*args)
+
+
+def spec_from(x: Union[AnnotationContext, type], instances: bool = False, attributes: bool = False):
+    """
+    If instances is True, Records (including nested ones) are conformed into instances of Record.slotted() rather than
+    into dicts.
+
+    If attributes is True, Records (including nested ones) are validated by reading the attributes of objects, e.g.
+    Record instances, rather than the values of dicts.
+    """
+    if instances and attributes:
+        raise ValueError("Records can't be conformed from objects into instances")
+
     if x is None:
         return is_instance(type(None))
 
+    recurse = partial(spec_from, instances=instances, attributes=attributes) if instances or attributes else spec_from
+
     if isinstance(x, type):
         if issubclass(x, Record):
             annotations = extract_annotations(x)
             specs = {}
 
             for attr, annotation in annotations.items():
-                specs[attr] = spec_from(annotation)
+                specs[attr] = recurse(annotation)
 
             unbound_typevars = {k: v.typevar for k, v in specs.items() if isinstance(v, UnboundTypeVarSpec)}
 
+            if attributes:
+                object_spec = ObjectSpec(specs)
+                if unbound_typevars:
+                    return all_of(object_spec, UnboundTypeVarObjectSpec(unbound_typevars, recurse))
+                return object_spec
+
+            if instances:
+                dict_spec = RecordInstanceSpec(specs, slotted_class(x, annotations))
+                if unbound_typevars:
+                    # UnboundTypeVarDictSpec needs a Mapping, so checks the dict before it's conformed to an instance
+                    return all_of(UnboundTypeVarDictSpec(unbound_typevars, recurse), dict_spec)
+                return dict_spec
+
             if unbound_typevars:
-                return all_of(DictSpec(specs), UnboundTypeVarDictSpec(unbound_typevars, spec_from))
+                return all_of(DictSpec(specs), UnboundTypeVarDictSpec(unbound_typevars, recurse))
             else:
                 return DictSpec(specs)
         else:
@@ -46,26 +133,46 @@ def spec_from(x: Union[AnnotationContext, type]):
 
     if isinstance(x, AnnotationContext):
         if type(x.annotation) == type(Union):
-            return one_of(*[spec_from(x.for_hint(a))
+            return one_of(*[recurse(x.for_hint(a))
                             for a in x.annotation.__args__])
 
         elif type(x.annotation) == type(Any):
             return any_()
 
         elif isinstance(x.annotation, _ForwardRef) or isinstance(x.annotation, str):
-            return DeferredSpecFromForwardReference(spec_from, lambda: resolve_forward_ref(x))
+            return DeferredSpecFromForwardReference(recurse, lambda: resolve_forward_ref(x))
 
         elif isinstance(x.annotation, TypeVar):
-            return spec_from(resolve_typevar(x))
+            return recurse(resolve_typevar(x))
 
-        elif issubclass(x.annotation, List):
-            return coll_of(spec_from(x.for_hint(x.annotation.__args__[0])))
+        elif generic_origin(x.annotation) is not None:
+            return _spec_from_generic(x, generic_origin(x.annotation), recurse)
 
         else:
-            return spec_from(x.annotation)
+            return recurse(x.annotation)
 
     raise NotImplementedError("Can't produce a spec from {}".format(x))
 
 
 class Record:
-    pass
+    """
+    Subclasses declare fields as annotations. spec_from() conforms dicts with those fields, either into dicts or
+    into instances of slotted().
+
+    Declare __slots__ = () on subclasses too, so that instances of slotted() have no __dict__.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def slotted(cls) -> type:
+        """
+        A subclass of cls with __slots__ for its fields, in the order extract_annotations() finds them
+        """
+        return slotted_class(cls, extract_annotations(cls))
+
+    @classmethod
+    def from_dict(cls, d: Mapping) -> 'Record':
+        """
+        Builds an instance of slotted() from d, which must have every field, without validating it
+        """
+        return instance_from_dict(cls.slotted(), d)
@@ -1,7 +1,7 @@
 import sys
-from typing import _ForwardRef, Callable, List, Union
+from typing import _ForwardRef, Callable, Iterator, List, Union, Tuple
 
-from spec.impl.core import Spec, Path, Problem, SpecResult
+from spec.impl.core import Spec, CompositeSpec, Path, Problem, SpecResult, Changes, ConformStep, ExplainStep
 from spec.impl.records.annotations import AnnotationContext
 
 
@@ -27,7 +27,7 @@ def resolve_forward_ref(ac: AnnotationContext):
         return typeref
 
 
-class DeferredSpecFromForwardReference(Spec):
+class DeferredSpecFromForwardReference(CompositeSpec):
     def __init__(self, spec_factory: Callable[[type], Spec], forward_reference_resolver: Callable[[], type]):
         super().__init__()
         self._spec_factory = spec_factory
@@ -46,5 +46,17 @@ class DeferredSpecFromForwardReference(Spec):
     def explain(self, p: Path, x: object) -> List[Problem]:
         return self._resolve_spec().explain(p, x)
 
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        return self._resolve_spec().iter_problems(p, x)
+
     def conform(self, x: object) -> SpecResult:
         return self._resolve_spec().conform(x)
+
+    def _conform_steps(self, x: object):
+        return (yield ConformStep(self._resolve_spec(), x))
+
+    def _explain_steps(self, p: Path, x: object):
+        return (yield ExplainStep(self._resolve_spec(), p, x))
+
+    def reconform(self, p: Path, x: object, previous: SpecResult, changes: Changes) -> Tuple[SpecResult, List[Problem]]:
+        return self._resolve_spec().reconform(p, x, previous, changes)
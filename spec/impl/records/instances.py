@@ -0,0 +1,148 @@
+from typing import Callable, Dict, Iterable, Mapping, Tuple
+
+from spec.impl.core import Spec, SpecResult, INVALID, ConformStep
+from spec.impl.dicts import DictSpec, _acceptably_dict_like
+from spec.impl.sampling import default_sample
+
+# record class -> class with __slots__ for its fields
+_slotted_classes = {}  # type: Dict[type, type]
+
+
+def _slots(cls: type) -> set:
+    return {name for klass in cls.mro() for name in getattr(klass, '__slots__', ())}
+
+
+def _record_eq(self, other):
+    if type(other) is not type(self):
+        return NotImplemented
+    return all(getattr(self, name) == getattr(other, name) for name in self._record_fields)
+
+
+def _record_repr(self):
+    return "{}({})".format(type(self).__name__,
+                           ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self._record_fields))
+
+
+def _record_reduce(self):
+    # the slotted class has the same name as the record, so can't be pickled by reference
+    return _unpickle_record, (self._record_parent,
+                              self._record_fields,
+                              tuple(getattr(self, name) for name in self._record_fields))
+
+
+def _unpickle_record(cls: type, fields: Tuple[str, ...], values: Tuple) -> object:
+    return instance_from_dict(slotted_class(cls, fields), dict(zip(fields, values)))
+
+
+def slotted_class(cls: type, fields: Iterable[str]) -> type:
+    """
+    A subclass of cls with a slot for each of fields, unless cls already has one, and equality, repr and pickling
+    based on them.
+
+    Instances only have no __dict__ if cls and all its bases declare __slots__ (Record declares __slots__ = ()).
+    """
+    slotted = _slotted_classes.get(cls)
+    if slotted is not None:
+        return slotted
+
+    fields = tuple(fields)
+    existing = _slots(cls)
+    namespace = {'__slots__': tuple(name for name in fields if name not in existing),
+                 '__module__': cls.__module__,
+                 '__qualname__': cls.__qualname__,
+                 '__eq__': _record_eq,
+                 '__hash__': None,
+                 '__repr__': _record_repr,
+                 '__reduce__': _record_reduce,
+                 '_record_fields': fields,
+                 '_record_parent': cls}
+    # type(cls) rather than type, so metaclasses like typing.GenericMeta are kept
+    slotted = type(cls)(cls.__name__, (cls,), namespace)
+    slotted._record_setters = tuple((name, getattr(slotted, name).__set__) for name in fields)
+
+    _slotted_classes[cls] = slotted
+    _slotted_classes[slotted] = slotted
+    return slotted
+
+
+def instance_from_dict(slotted: type, d: Mapping) -> object:
+    """
+    Builds an instance of a class returned by slotted_class() without calling __init__. d must have every field.
+    """
+    instance = object.__new__(slotted)
+    for name, set_field in slotted._record_setters:
+        set_field(instance, d[name])
+    return instance
+
+
+class RecordInstanceSpec(DictSpec):
+    """
+    Conforms dicts straight into instances of a class returned by slotted_class(), rather than into dicts
+    """
+
+    def __init__(self, key_to_spec: Dict[str, Spec], slotted: type):
+        super().__init__(key_to_spec)
+        self._slotted = slotted
+        self._setters = dict(slotted._record_setters)  # type: Dict[str, Callable[[object, object], None]]
+
+    def conform(self, x: object) -> SpecResult:
+        if not _acceptably_dict_like(x):
+            return INVALID
+
+        sample = default_sample()
+        if sample is not None:
+            return self._conform_sample(x, sample)
+
+        instance = object.__new__(self._slotted)
+        setters = self._setters
+        for k, s in self._key_to_spec.items():
+            if not k in x:
+                return INVALID
+
+            conformed = s.conform(x[k])
+            if conformed is INVALID:
+                return INVALID
+            setters[k](instance, conformed)
+
+        return instance
+
+    def _conform_steps(self, x: object):
+        if not _acceptably_dict_like(x):
+            return INVALID
+
+        sample = default_sample()
+        if sample is not None:
+            return (yield from self._conform_sample_steps(x, sample))
+
+        instance = object.__new__(self._slotted)
+        setters = self._setters
+        for k, s in self._key_to_spec.items():
+            if not k in x:
+                return INVALID
+
+            conformed = yield ConformStep(s, x[k])
+            if conformed is INVALID:
+                return INVALID
+            setters[k](instance, conformed)
+
+        return instance
+
+    def _result(self, x: object, conformed: Dict) -> SpecResult:
+        instance = object.__new__(self._slotted)
+        setters = self._setters
+        for k, v in conformed.items():
+            setters[k](instance, v)
+        return instance
+
+    def _is_previous_result(self, previous: SpecResult) -> bool:
+        return isinstance(previous, self._slotted)
+
+    def _previous_value(self, previous: SpecResult, k: object) -> SpecResult:
+        return getattr(previous, k, INVALID)
+
+    def _updated_result(self, x: object, previous: SpecResult, updates: Dict) -> SpecResult:
+        instance = object.__new__(self._slotted)
+        setters = self._setters
+        for k, set_field in setters.items():
+            set_field(instance, updates[k] if k in updates else getattr(previous, k))
+        return instance
@@ -1,9 +1,12 @@
+from functools import lru_cache
 from pprint import pformat
 
-from typing import TypeVar, List, Mapping
+from typing import TypeVar, Iterator, List, Mapping
 
 from spec.impl import specs as sis
-from spec.impl.core import Spec, Path, Problem, SpecResult, INVALID, isinvalid
+from spec.impl.core import CompositeSpec, Path, Problem, SpecResult, INVALID, ConformStep, ExplainStep, \
+    cached_description
+from spec.impl.objects import copied, copy_problems
 
 
 def generic_class_typevars(cls: type):
@@ -50,9 +53,12 @@ def _typevar_key(t: TypeVar):
     return tuple(getattr(t, s) for s in t.__slots__)
 
 
-class UnboundTypeVarDictSpec(Spec):
+class UnboundTypeVarDictSpec(CompositeSpec):
     _NOT_FOUND = object()
 
+    # Number of types to cache generated specs for
+    SPEC_CACHE_SIZE = 128
+
     def __init__(self, unbound_typevar_keys, spec_generator):
         super().__init__()
 
@@ -64,38 +70,153 @@ class UnboundTypeVarDictSpec(Spec):
             typevar_to_attr_names[tvk].append(attr_name)
 
         self._typevar_to_attr_names = typevar_to_attr_names
+        self._attr_name_groups = tuple(tuple(names) for names in typevar_to_attr_names.values())
         self._spec_generator = spec_generator
+        self._spec_for_type = lru_cache(maxsize=self.SPEC_CACHE_SIZE)(spec_generator)
 
+    @cached_description
     def describe(self) -> str:
         return "all typevars should be the same: {}".format(pformat(self._typevar_to_attr_names))
 
+    @staticmethod
+    def _implied_type(x: Mapping, names):
+        for name in names:
+            if name in x:
+                return type(x[name])
+        return None
+
+    _NOT_ACCEPTED = "not a Mapping"
+
+    @staticmethod
+    def _accepts(x: object) -> bool:
+        return isinstance(x, Mapping)
+
+    @staticmethod
+    def _value(x: Mapping, name: str) -> object:
+        return x[name]
+
+    @staticmethod
+    def _result(x: Mapping, conformed: dict) -> SpecResult:
+        result = dict(x)
+        result.update(conformed)
+        return result
+
     def explain(self, p: Path, x: object) -> List[Problem]:
-        if not isinstance(x, Mapping):
-            return [Problem(p, x, self, "not a Mapping")]
+        if not self._accepts(x):
+            return [Problem(p, x, self, self._NOT_ACCEPTED)]
 
         problems = []
-        for typevar, names in self._typevar_to_attr_names.items():
-            first_name_found = next((name for name in names if name in x), None)
-            implied_type = type(x[first_name_found]) if first_name_found else None
-            s = self._spec_generator(implied_type)
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
             for name in names:
-                value = x[name]
-                ps = s.explain(p, value)
+                ps = s.explain(p, self._value(x, name))
                 problems.extend(ps)
         return problems
 
+    def _explain_steps(self, p: Path, x: object):
+        if not self._accepts(x):
+            return [Problem(p, x, self, self._NOT_ACCEPTED)]
+
+        problems = []
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
+            for name in names:
+                ps = yield ExplainStep(s, p, self._value(x, name))
+                problems.extend(ps)
+        return problems
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        if not self._accepts(x):
+            yield Problem(p, x, self, self._NOT_ACCEPTED)
+            return
+
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
+            for name in names:
+                value = self._value(x, name)
+                yield from s.iter_problems(p, value)
+
     def conform(self, x: object) -> SpecResult:
-        if not isinstance(x, Mapping):
+        if not self._accepts(x):
             return INVALID
 
-        result = dict(x)
-        for typevar, names in self._typevar_to_attr_names.items():
-            first_name_found = next((name for name in names if name in x), None)
-            implied_type = type(x[first_name_found]) if first_name_found else None
-            s = self._spec_generator(implied_type)
+        conformed = {}
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
             for name in names:
-                value = s.conform(x[name])
-                if isinvalid(value):
+                value = s.conform(self._value(x, name))
+                if value is INVALID:
                     return INVALID
-                result[name] = value
-        return result
\ No newline at end of file
+                conformed[name] = value
+        return self._result(x, conformed)
+
+    def _conform_steps(self, x: object):
+        if not self._accepts(x):
+            return INVALID
+
+        conformed = {}
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
+            for name in names:
+                value = yield ConformStep(s, self._value(x, name))
+                if value is INVALID:
+                    return INVALID
+                conformed[name] = value
+        return self._result(x, conformed)
+
+
+class UnboundTypeVarObjectSpec(UnboundTypeVarDictSpec):
+    """
+    UnboundTypeVarDictSpec for the attributes of objects, rather than the values of Mappings
+    """
+
+    _NOT_ACCEPTED = "missing attributes"
+
+    @staticmethod
+    def _implied_type(x: object, names):
+        for name in names:
+            if hasattr(x, name):
+                return type(getattr(x, name))
+        return None
+
+    def _accepts(self, x: object) -> bool:
+        return all(hasattr(x, name) for names in self._attr_name_groups for name in names)
+
+    @staticmethod
+    def _value(x: object, name: str) -> object:
+        return getattr(x, name)
+
+    @staticmethod
+    def _result(x: object, conformed: dict) -> SpecResult:
+        if all(getattr(x, name) is value for name, value in conformed.items()):
+            return x
+        return copied(x, conformed)
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        return super().explain(p, x) or self._copy_problems(p, x)
+
+    def _explain_steps(self, p: Path, x: object):
+        problems = yield from super()._explain_steps(p, x)
+        return problems or self._copy_problems(p, x)
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        found = False
+        for problem in super().iter_problems(p, x):
+            found = True
+            yield problem
+        if not found:
+            yield from self._copy_problems(p, x)
+
+    def _copy_problems(self, p: Path, x: object) -> List[Problem]:
+        """
+        Only called once every attribute is known to conform
+        """
+        conformed = {}
+        for names in self._attr_name_groups:
+            s = self._spec_for_type(self._implied_type(x, names))
+            for name in names:
+                value = getattr(x, name)
+                conformed_value = s.conform(value)
+                if conformed_value is not value:
+                    conformed[name] = conformed_value
+        return copy_problems(p, x, self, conformed) if conformed else []
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+# how many collections' choices of items are remembered for explain()
+_REMEMBERED_CHOICES = 1024
+
+
+class SamplingReport(NamedTuple):
+    items_seen: int
+    items_checked: int
+
+
+class Sample:
+    """
+    Decides which items of a collection (or values of a dict) are validated, when validating every item is too slow
+
+    The first `first` items are always checked. Of the rest, either `random` items or `fraction` of them are chosen
+    at random, by a generator seeded once with `seed`, so each collection gets its own choice.
+
+    The choice made when conforming a collection is remembered, so explain() checks the same items of it.
+
+    Counts of how many items have been seen and checked by conform() are kept, see report()
+    """
+
+    def __init__(self, fraction: float = None, first: int = 0, random: int = 0, seed: int = 0):
+        if fraction is not None and random:
+            raise ValueError("Specify a fraction or a number of random items to check, but not both")
+        if fraction is not None and not 0 <= fraction <= 1:
+            raise ValueError("Fraction should be between 0 and 1 but was {}".format(fraction))
+        if fraction is None and not first and not random:
+            raise ValueError("Sample would never check anything")
+
+        self._fraction = fraction
+        self._first = first
+        self._random = random
+        self._seed = seed
+
+        # imported lazily to keep `import spec.core` fast
+        from random import Random
+        from threading import Lock
+        self._generator = Random(seed)
+        # key -> (n, indices) of the collections conformed most recently
+        self._chosen = OrderedDict()
+        # the generator, choices and counts are shared by every thread validating with this sample
+        self._lock = Lock()
+
+        self._items_seen = 0
+        self._items_checked = 0
+
+    def _choose(self, n: int) -> List[int]:
+        head = min(self._first, n)
+        rest = n - head
+
+        if self._fraction is not None:
+            k = int(round(rest * self._fraction))
+        else:
+            k = min(self._random, rest)
+
+        if k == rest:
+            return list(range(n))
+        return list(range(head)) + sorted(self._generator.sample(range(head, n), k))
+
+    def indices(self, n: int, key: int = None) -> List[int]:
+        """
+        Ascending indices of the items to check when conforming a collection of n items, which are counted in
+        report().
+
+        key identifies the collection (e.g. its id()), so explained_indices() can make the same choice
+        """
+        with self._lock:
+            indices = self._choose(n)
+            if key is not None:
+                self._chosen[key] = (n, indices)
+                if len(self._chosen) > _REMEMBERED_CHOICES:
+                    self._chosen.popitem(last=False)
+
+            self._items_seen += n
+            self._items_checked += len(indices)
+        return indices
+
+    def explained_indices(self, n: int, key: int = None) -> List[int]:
+        """
+        Ascending indices of the items to check when explaining a collection of n items: the ones checked when it was
+        last conformed, if it has been. These aren't counted in report()
+        """
+        with self._lock:
+            chosen = self._chosen.get(key)
+            if chosen is not None and chosen[0] == n:
+                return chosen[1]
+            return self._choose(n)
+
+    def report(self) -> SamplingReport:
+        with self._lock:
+            return SamplingReport(self._items_seen, self._items_checked)
+
+    def reset(self):
+        with self._lock:
+            self._items_seen = 0
+            self._items_checked = 0
+
+    def __repr__(self):
+        return "Sample(fraction={}, first={}, random={}, seed={})".format(self._fraction, self._first, self._random,
+                                                                         self._seed)
+
+
+_default_sample = None  # type: Optional[Sample]
+
+
+def default_sample() -> Optional[Sample]:
+    return _default_sample
+
+
+def set_default_sample(sample: Optional[Sample]) -> Optional[Sample]:
+    """
+    Sets the sample used by every DictSpec and CollOf which wasn't given a sample of its own.
+
+    None means validate everything. Returns the previous default.
+    """
+    global _default_sample
+    previous = _default_sample
+    _default_sample = sample
+    return previous
@@ -0,0 +1,212 @@
+import copy
+from typing import Dict, Iterable, Tuple
+
+from spec.impl.core import Spec, DelegatingSpec, Path, Changes, WILDCARD, changes_from_paths
+from spec.impl.dicts import DictSpec, MapOf
+from spec.impl.iterables import CollOf, FixedTupleOf
+from spec.impl.objects import ObjectSpec, _attribute_changes
+from spec.impl.limits import LimitedSpec
+from spec.impl.engine import DeduplicatingSpec
+from spec.impl.records.instances import RecordInstanceSpec
+from spec.impl.records.typevars import UnboundTypeVarDictSpec
+from spec.impl.specs import Any, Coerce, OneOf, AllOf
+
+try:
+    from spec.impl.records.forwardrefs import DeferredSpecFromForwardReference
+except ImportError:
+    # records use typing._ForwardRef, which was renamed in python 3.7, so there can't be any deferred specs
+    DeferredSpecFromForwardReference = ()
+
+_WRAPPERS = (DelegatingSpec, LimitedSpec, DeduplicatingSpec)
+
+
+def _merge(a: Changes, b: Changes) -> Changes:
+    if a is None or b is None:
+        return None
+    merged = dict(a)
+    for k, v in b.items():
+        merged[k] = _merge(merged[k], v) if k in merged else v
+    return merged
+
+
+def _item_trie(trie: Dict) -> Changes:
+    # items can't be validated by position, so selecting an index selects that part of every item
+    item_trie = {}
+    for k, child in trie.items():
+        if k is WILDCARD or type(k) is int:
+            item_trie = _merge(item_trie, child)
+    return item_trie
+
+
+def _value_trie(trie: Dict) -> Changes:
+    # values can't be validated by key, so selecting a key selects that part of every value
+    value_trie = {}
+    for child in trie.values():
+        value_trie = _merge(value_trie, child)
+    return value_trie
+
+
+def _fixed_tuple_item_trie(trie: Dict, i: int) -> Changes:
+    return _merge(trie.get(WILDCARD, {}), trie.get(i, {}))
+
+
+def _copy(s: Spec, **attributes) -> Spec:
+    pruned = copy.copy(s)
+    pruned.__dict__.update(attributes)
+    # the description of the pruned spec is different
+    pruned.__dict__.pop('_description_cache', None)
+    return pruned
+
+
+# noinspection PyProtectedMember
+def _only_reads(s: Spec, trie: Changes) -> bool:
+    """
+    Whether s, once pruned to trie, only reads the parts of values in trie. Specs which can't be taken apart might
+    read anything.
+    """
+    if trie is None or isinstance(s, Any):
+        return True
+
+    if isinstance(s, RecordInstanceSpec):
+        # requires every field, selected or not
+        return False
+
+    if isinstance(s, DictSpec):
+        return all(_only_reads(v, trie[k]) for k, v in s._key_to_spec.items() if k in trie)
+
+    if isinstance(s, ObjectSpec):
+        for name, get, attribute_spec in s._fields:
+            selected, subtrie = _attribute_changes(trie, name)
+            if selected and not _only_reads(attribute_spec, subtrie):
+                return False
+        return True
+
+    if isinstance(s, CollOf):
+        return _only_reads(s._itemspec, _item_trie(trie))
+
+    if isinstance(s, MapOf):
+        return _only_reads(s._valuespec, _value_trie(trie))
+
+    if isinstance(s, FixedTupleOf):
+        return all(_only_reads(m, _fixed_tuple_item_trie(trie, i)) for i, m in enumerate(s._specs)
+                   if i in trie or WILDCARD in trie)
+
+    if isinstance(s, UnboundTypeVarDictSpec):
+        # values are checked whole
+        return all(trie[name] is None for names in s._attr_name_groups for name in names if name in trie)
+
+    if isinstance(s, DeferredSpecFromForwardReference):
+        return _only_reads(s._resolve_spec(), trie)
+
+    if isinstance(s, _WRAPPERS) and not isinstance(s, Coerce):
+        return _only_reads(s._delegate, trie)
+
+    if isinstance(s, (OneOf, AllOf)):
+        return all(_only_reads(m, trie) for m in s._specs)
+
+    return False
+
+
+class _Selector:
+    def __init__(self):
+        # (id(spec), id(trie)) -> (spec, trie, pruned spec), so shared subtrees stay shared
+        self._pruned = {}  # type: Dict[Tuple[int, int], Tuple[Spec, Changes, Spec]]
+
+    def prune(self, s: Spec, trie: Changes) -> Spec:
+        if trie is None:
+            return s
+        key = (id(s), id(trie))
+        entry = self._pruned.get(key)
+        if entry is not None:
+            return entry[2]
+        pruned = self._prune(s, trie)
+        self._pruned[key] = (s, trie, pruned)
+        return pruned
+
+    # noinspection PyProtectedMember
+    def _prune(self, s: Spec, trie: Dict) -> Spec:
+        if isinstance(s, RecordInstanceSpec):
+            # instances need a value for every field, so, like items of fixed tuples, fields which aren't selected
+            # aren't validated rather than being dropped
+            return _copy(s, _key_to_spec={k: self.prune(v, trie[k]) if k in trie else Any()
+                                          for k, v in s._key_to_spec.items()})
+
+        if isinstance(s, DictSpec):
+            return _copy(s, _key_to_spec={k: self.prune(v, trie[k])
+                                          for k, v in s._key_to_spec.items()
+                                          if k in trie})
+
+        if isinstance(s, ObjectSpec):
+            fields = []
+            for name, get, attribute_spec in s._fields:
+                selected, subtrie = _attribute_changes(trie, name)
+                if selected:
+                    fields.append((name, get, self.prune(attribute_spec, subtrie)))
+            return _copy(s, _attr_to_spec={name: attribute_spec for name, get, attribute_spec in fields},
+                         _fields=tuple(fields))
+
+        if isinstance(s, CollOf):
+            itemspec = self.prune(s._itemspec, _item_trie(trie))
+            return s if itemspec is s._itemspec else _copy(s, _itemspec=itemspec)
+
+        if isinstance(s, MapOf):
+            valuespec = self.prune(s._valuespec, _value_trie(trie))
+            return s if valuespec is s._valuespec else _copy(s, _valuespec=valuespec)
+
+        if isinstance(s, FixedTupleOf):
+            # like keys of dict specs, items which aren't selected aren't validated
+            specs = tuple(self.prune(m, _fixed_tuple_item_trie(trie, i)) if i in trie or WILDCARD in trie else Any()
+                          for i, m in enumerate(s._specs))
+            return s if all(m is o for m, o in zip(specs, s._specs)) else _copy(s, _specs=specs)
+
+        if isinstance(s, UnboundTypeVarDictSpec):
+            groups = tuple(g for g in (tuple(n for n in names if n in trie) for names in s._attr_name_groups) if g)
+            if not groups:
+                return Any()
+            return _copy(s,
+                         _attr_name_groups=groups,
+                         _typevar_to_attr_names={tvk: [n for n in names if n in trie]
+                                                 for tvk, names in s._typevar_to_attr_names.items()
+                                                 if any(n in trie for n in names)})
+
+        if isinstance(s, DeferredSpecFromForwardReference):
+            return self.prune(s._resolve_spec(), trie)
+
+        if isinstance(s, _WRAPPERS):
+            delegate = self.prune(s._delegate, trie)
+            return s if delegate is s._delegate else _copy(s, _delegate=delegate)
+
+        if isinstance(s, AllOf):
+            # each member is given what the one before conformed to, so a member is only pruned if no later member
+            # reads the parts of its result which pruning would drop
+            specs = list(s._specs)
+            members = [self.prune(m, trie) if all(_only_reads(later, trie) for later in specs[i + 1:]) else m
+                       for i, m in enumerate(specs)]
+            if all(m is o for m, o in zip(members, specs)):
+                return s
+            # subclasses (e.g. from optimize()) keep state derived from their original members, so aren't copied
+            return AllOf(members)
+
+        if isinstance(s, OneOf):
+            members = [self.prune(m, trie) for m in s._specs]
+            if all(m is o for m, o in zip(members, s._specs)):
+                return s
+            return OneOf(members)
+
+        # anything else can't be taken apart, so is kept whole
+        return s
+
+
+def select(s: Spec, paths: Iterable[Path]) -> Spec:
+    """
+    Prunes s down to the parts needed to validate the values at paths, so validating a value costs in proportion to
+    how much of it is read rather than how much of it is declared.
+
+    Paths have the same form as Problem.path. WILDCARD (or any index) selects that part of every item of a coll_of,
+    and any key selects that part of every value of a map_of.
+
+    Keys of dict specs which aren't on any path are dropped, and so are missing from conformed values. Specs other
+    than dicts, objects, collections and the specs combining or wrapping them can't be taken apart, so are kept whole,
+    as are all but the last member of an all_of, whose later members may read anything.
+    """
+    return _Selector().prune(s, changes_from_paths(paths))
@@ -1,7 +1,7 @@
-from typing import Callable, List, Iterable
+from typing import Callable, List, Iterable, Iterator, NamedTuple, Optional, Tuple
 
-from spec.impl.core import Spec, SpecResult, SimpleSpec, DelegatingSpec, Problem, Path, INVALID, isvalid, \
-    isinvalid
+from spec.impl.core import Spec, CompositeSpec, SpecResult, SimpleSpec, DelegatingSpec, Problem, Path, INVALID, \
+    ConformStep, ExplainStep, cached_description
 from spec.impl.util.strings import a_or_an
 
 
@@ -71,44 +71,79 @@ class IsInstance(SimpleSpec):
         return hash(self._cls)
 
 
-def Even() -> Spec:
-    return SimpleSpec("an even number",
-                      lambda x: isinstance(x, int) and not bool(x & 1))
+class Even(SimpleSpec):
+    def __init__(self):
+        super().__init__("an even number",
+                         lambda x: isinstance(x, int) and not bool(x & 1))
 
 
-def Odd() -> Spec:
-    return SimpleSpec("an odd number",
-                      lambda x: isinstance(x, int) and bool(x & 1))
+class Odd(SimpleSpec):
+    def __init__(self):
+        super().__init__("an odd number",
+                         lambda x: isinstance(x, int) and bool(x & 1))
 
 
-def IsNone() -> Spec:
-    return SimpleSpec("None",
-                      lambda x: x is None)
+class IsNone(SimpleSpec):
+    def __init__(self):
+        super().__init__("None",
+                         lambda x: x is None)
 
 
-def InRange(start, end_exclusive=None) -> Spec:
-    return SimpleSpec("between {} {}".format(start, "and {}".format(end_exclusive) if end_exclusive else None),
-                      lambda x: x >= start and (end_exclusive is None or x < end_exclusive))
+class Bounded(SimpleSpec):
+    """
+    Checks that values are within an optional lower and upper bound
 
+    Bounds are exposed so that specs can be combined by spec.impl.optimize
+    """
 
-def Gt(value) -> Spec:
-    return SimpleSpec("greater than {}".format(value),
-                      lambda x: x > value)
+    def __init__(self,
+                 description: str,
+                 check: Callable[[object], bool],
+                 lower=None,
+                 lower_inclusive: bool = True,
+                 upper=None,
+                 upper_inclusive: bool = False):
+        super().__init__(description, check)
+        self.lower = lower
+        self.lower_inclusive = lower_inclusive
+        self.upper = upper
+        self.upper_inclusive = upper_inclusive
+
+
+class InRange(Bounded):
+    def __init__(self, start, end_exclusive=None):
+        super().__init__("between {} {}".format(start, "and {}".format(end_exclusive) if end_exclusive else None),
+                         lambda x: x >= start and (end_exclusive is None or x < end_exclusive),
+                         lower=start, lower_inclusive=True,
+                         upper=end_exclusive, upper_inclusive=False)
+
+
+class Gt(Bounded):
+    def __init__(self, value):
+        super().__init__("greater than {}".format(value),
+                         lambda x: x > value,
+                         lower=value, lower_inclusive=False)
 
 
-def Lt(value) -> Spec:
-    return SimpleSpec("less than {}".format(value),
-                      lambda x: x < value)
+class Lt(Bounded):
+    def __init__(self, value):
+        super().__init__("less than {}".format(value),
+                         lambda x: x < value,
+                         upper=value, upper_inclusive=False)
 
 
-def Gte(value) -> Spec:
-    return SimpleSpec("greater than or equal to {}".format(value),
-                      lambda x: x >= value)
+class Gte(Bounded):
+    def __init__(self, value):
+        super().__init__("greater than or equal to {}".format(value),
+                         lambda x: x >= value,
+                         lower=value, lower_inclusive=True)
 
 
-def Lte(value) -> Spec:
-    return SimpleSpec("less than or equal to {}".format(value),
-                      lambda x: x <= value)
+class Lte(Bounded):
+    def __init__(self, value):
+        super().__init__("less than or equal to {}".format(value),
+                         lambda x: x <= value,
+                         upper=value, upper_inclusive=True)
 
 
 class IsIn(Spec):
@@ -118,6 +153,7 @@ class IsIn(Spec):
         self._coll = coll
         self._coll_for_explain = list(sorted(coll))
 
+    @cached_description
     def describe(self) -> str:
         return "in {}".format(self._coll_for_explain)
 
@@ -160,8 +196,13 @@ def name_of(x):
 
 
 def _default_coercion_explainer(coercer: Coercer):
-    return lambda x, e: "could not coerce '{}' ({}) using coercer: {} because:\n{}" \
-        .format(x, type(x).__name__, name_of(coercer), e)
+    def explain(x, e):
+        if e is None:
+            return "could not coerce '{}' ({}) using coercer: {}".format(x, type(x).__name__, name_of(coercer))
+        return "could not coerce '{}' ({}) using coercer: {} because:\n{}" \
+            .format(x, type(x).__name__, name_of(coercer), e)
+
+    return explain
 
 
 class Coerce(DelegatingSpec):
@@ -179,58 +220,250 @@ class Coerce(DelegatingSpec):
             c = self._coercer(x)
         except:
             return INVALID
-        else:
-            return super().conform(c)
+        if c is INVALID:
+            return INVALID
+        return super().conform(c)
 
-    def explain(self, p: Path, x: object) -> List[Problem]:
+    def _coercion_problems(self, p: Path, x: object) -> Tuple[object, List[Problem]]:
+        """
+        Returns the coerced value, or INVALID and a problem if coercion failed
+        """
         # noinspection PyBroadException
         try:
             c = self._coercer(x)
         except Exception as e:
-            return [Problem(p, x, self, self._explain_coercion_failure(x, e))]
-        else:
-            return super().explain(p, c)
+            return INVALID, [Problem(p, x, self, self._explain_coercion_failure(x, e))]
+        if c is INVALID:
+            return INVALID, [Problem(p, x, self, self._explain_coercion_failure(x, None))]
+        return c, []
+
+    def explain(self, p: Path, x: object) -> List[Problem]:
+        c, problems = self._coercion_problems(p, x)
+        if c is INVALID:
+            return problems
+        return super().explain(p, c)
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        c, problems = self._coercion_problems(p, x)
+        if c is INVALID:
+            return iter(problems)
+        return super().iter_problems(p, c)
+
+    def _conform_steps(self, x):
+        # noinspection PyBroadException
+        try:
+            c = self._coercer(x)
+        except:
+            return INVALID
+        if c is INVALID:
+            return INVALID
+        return (yield ConformStep(self._delegate, c))
+
+    def _explain_steps(self, p: Path, x: object):
+        c, problems = self._coercion_problems(p, x)
+        if c is INVALID:
+            return problems
+        return (yield ExplainStep(self._delegate, p, c))
 
 
-class OneOf(Spec):
+class OneOf(CompositeSpec):
     def __init__(self, specs: Iterable[Spec]):
         self._specs = specs
 
     def conform(self, x) -> SpecResult:
         for s in self._specs:
             r = s.conform(x)
-            if isvalid(r):
+            if r is not INVALID:
                 return r
         return INVALID
 
+    @cached_description
     def describe(self) -> str:
         return "one of {}".format([s.describe() for s in self._specs])
 
     def explain(self, p: Path, x: object) -> List[Problem]:
         problems = []
         for s in self._specs:
+            if s.conform(x) is not INVALID:
+                return []
             ps = s.explain(p, x)
             problems.extend(ps)
         return problems
 
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        # problems can't be yielded until it's known that no later branch conforms
+        for s in self._specs:
+            if s.conform(x) is not INVALID:
+                return
+        for s in self._specs:
+            yield from s.iter_problems(p, x)
+
+    def _conform_steps(self, x):
+        for s in self._specs:
+            r = yield ConformStep(s, x)
+            if r is not INVALID:
+                return r
+        return INVALID
 
-class AllOf(Spec):
+    def _explain_steps(self, p: Path, x: object):
+        problems = []
+        for s in self._specs:
+            if (yield ConformStep(s, x)) is not INVALID:
+                return []
+            ps = yield ExplainStep(s, p, x)
+            problems.extend(ps)
+        return problems
+
+
+def _guard_type(s: Spec) -> Optional[type]:
+    """
+    A type which values must be an instance of to conform to s, if there is one
+    """
+    if isinstance(s, IsInstance):
+        # noinspection PyProtectedMember
+        return s._cls
+    if isinstance(s, IsNone):
+        return type(None)
+    if isinstance(s, DelegatingSpec) and not isinstance(s, Coerce):
+        # noinspection PyProtectedMember
+        return _guard_type(s._delegate)
+    if isinstance(s, AllOf) and s._specs:
+        # noinspection PyProtectedMember
+        return _guard_type(s._specs[0])
+    return None
+
+
+class BranchStatistics(NamedTuple):
+    spec: Spec
+    declared_position: int
+    trial_position: int
+    hits: int
+
+
+class AdaptiveOneOf(OneOf):
+    """
+    Periodically reorders the branches it tries first by how often they've matched
+
+    Results are the same as OneOf: if a value would conform to more than one branch, the result is from the first
+    declared branch. To preserve this, once a branch has matched, any earlier-declared branches which haven't been
+    tried yet are tried too, unless they can be ruled out by a cheap type check.
+    """
+
+    def __init__(self, specs: Iterable[Spec], reorder_every: int = 1000):
+        specs = tuple(specs)
+        super().__init__(specs)
+        self._reorder_every = reorder_every
+        self._guard_types = tuple(_guard_type(s) for s in specs)
+        self._hits = [0] * len(specs)
+        self._trial_order = tuple(range(len(specs)))
+        self._calls = 0
+
+    def conform(self, x) -> SpecResult:
+        self._calls += 1
+        if self._calls >= self._reorder_every:
+            self._reorder()
+
+        trial_order = self._trial_order
+        for position, i in enumerate(trial_order):
+            r = self._specs[i].conform(x)
+            if r is not INVALID:
+                if i:
+                    for j in self._untried_earlier_branches(x, i, trial_order[:position]):
+                        rj = self._specs[j].conform(x)
+                        if rj is not INVALID:
+                            i, r = j, rj
+                            break
+                self._hits[i] += 1
+                return r
+        return INVALID
+
+    def _conform_steps(self, x):
+        self._calls += 1
+        if self._calls >= self._reorder_every:
+            self._reorder()
+
+        trial_order = self._trial_order
+        for position, i in enumerate(trial_order):
+            r = yield ConformStep(self._specs[i], x)
+            if r is not INVALID:
+                if i:
+                    for j in self._untried_earlier_branches(x, i, trial_order[:position]):
+                        rj = yield ConformStep(self._specs[j], x)
+                        if rj is not INVALID:
+                            i, r = j, rj
+                            break
+                self._hits[i] += 1
+                return r
+        return INVALID
+
+    def _untried_earlier_branches(self, x, i: int, already_tried: Tuple[int, ...]) -> Iterator[int]:
+        """
+        Branches declared before i which x might conform to, and so which must be tried before i's result is used
+        """
+        for j in range(i):
+            if j in already_tried:
+                continue
+            guard = self._guard_types[j]
+            if guard is not None and not isinstance(x, guard):
+                continue
+            yield j
+
+    def _reorder(self):
+        self._calls = 0
+        hits = self._hits
+        self._trial_order = tuple(sorted(range(len(hits)), key=lambda i: (-hits[i], i)))
+
+    def statistics(self) -> List[BranchStatistics]:
+        """
+        Statistics for each branch, in declared order
+        """
+        trial_order = self._trial_order
+        return [BranchStatistics(s, i, trial_order.index(i), self._hits[i])
+                for i, s in enumerate(self._specs)]
+
+
+class AllOf(CompositeSpec):
     def __init__(self, specs: Iterable[Spec]):
         self._specs = specs
 
     def conform(self, x) -> SpecResult:
         for s in self._specs:
             x = s.conform(x)
-            if isinvalid(x):
+            if x is INVALID:
                 return x
         return x
 
+    @cached_description
     def describe(self) -> str:
         return "all of {}".format([s.describe() for s in self._specs])
 
     def explain(self, p: Path, x: object) -> List[Problem]:
         for s in self._specs:
-            x = s.conform(x)
-            if isinvalid(x):
+            conformed = s.conform(x)
+            if conformed is INVALID:
                 return s.explain(p, x)
+            x = conformed
+        return []
+
+    def iter_problems(self, p: Path, x: object) -> Iterator[Problem]:
+        for s in self._specs:
+            conformed = s.conform(x)
+            if conformed is INVALID:
+                return s.iter_problems(p, x)
+            x = conformed
+        return iter(())
+
+    def _conform_steps(self, x):
+        for s in self._specs:
+            x = yield ConformStep(s, x)
+            if x is INVALID:
+                return x
+        return x
+
+    def _explain_steps(self, p: Path, x: object):
+        for s in self._specs:
+            conformed = yield ConformStep(s, x)
+            if conformed is INVALID:
+                return (yield ExplainStep(s, p, x))
+            x = conformed
         return []
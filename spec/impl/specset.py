@@ -0,0 +1,158 @@
+from abc import ABCMeta
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from spec.impl.core import Spec, DecoratedSpec, INVALID
+from spec.impl.dicts import DictSpec, _acceptably_dict_like
+from spec.impl.sampling import default_sample
+from spec.impl.specs import EqualTo, IsIn, IsInstance, AllOf
+
+# A constraint a value must meet to possibly conform to a spec, which can be looked up in an index:
+# ('key', k, values) - x[k] must be one of values
+# ('type', t) - type(x) must be t or a subclass of it
+Discriminator = Tuple
+
+
+def _hashable(values: Iterable) -> bool:
+    try:
+        for v in values:
+            hash(v)
+        return True
+    except TypeError:
+        return False
+
+
+def _values(s: Spec) -> Optional[Iterable]:
+    """
+    The values s accepts, if it only accepts a fixed set of them
+    """
+    if type(s) is EqualTo:
+        # noinspection PyProtectedMember
+        values = (s._value,)
+    elif type(s) is IsIn:
+        # noinspection PyProtectedMember
+        values = s._coll
+    else:
+        return None
+    return values if _hashable(values) else None
+
+
+def _discriminator(s: Spec) -> Optional[Discriminator]:
+    if isinstance(s, DecoratedSpec):
+        # noinspection PyProtectedMember
+        return _discriminator(s._delegate)
+
+    if isinstance(s, AllOf):
+        # later members see the value as conformed by earlier ones, which might be different
+        # noinspection PyProtectedMember
+        return _discriminator(s._specs[0]) if s._specs else None
+
+    if isinstance(s, DictSpec):
+        # noinspection PyProtectedMember
+        for k, value_spec in s._key_to_spec.items():
+            values = _values(value_spec)
+            if values is not None and _hashable([k]):
+                return 'key', k, values
+        return None
+
+    if type(s) is IsInstance:
+        # noinspection PyProtectedMember
+        t = s._cls
+        # isinstance() of abstract base classes can't be found by looking through type(x).__mro__
+        if isinstance(t, type) and not isinstance(t, ABCMeta):
+            return 'type', t
+
+    return None
+
+
+class SpecSet:
+    """
+    Finds which of many specs a value conforms to, without conforming it to every spec.
+
+    Specs are indexed on a constraint which values must meet to conform to them: a key of a DictSpec whose value must
+    be equal_to() or is_in() fixed values, or the type checked by is_instance(). Only the specs whose constraints a
+    value meets are then conformed, along with any specs that couldn't be indexed.
+    """
+
+    def __init__(self, specs: Iterable[Spec] = ()):
+        self._specs = []  # type: List[Spec]
+        self._unindexed = []  # type: List[int]
+        # key -> value -> positions of specs
+        self._by_key = {}  # type: Dict[object, Dict[object, List[int]]]
+        # type -> positions of specs
+        self._by_type = {}  # type: Dict[type, List[int]]
+        for s in specs:
+            self.add(s)
+
+    def add(self, s: Spec):
+        position = len(self._specs)
+        self._specs.append(s)
+
+        d = _discriminator(s)
+        if d is None:
+            self._unindexed.append(position)
+        elif d[0] == 'key':
+            _, k, values = d
+            by_value = self._by_key.setdefault(k, {})
+            for v in values:
+                by_value.setdefault(v, []).append(position)
+        else:
+            self._by_type.setdefault(d[1], []).append(position)
+
+    def _candidates(self, x: object) -> List[int]:
+        if default_sample() is not None:
+            # sampled DictSpecs might not check the indexed key
+            return list(range(len(self._specs)))
+
+        candidates = list(self._unindexed)
+
+        for t in type(x).__mro__:
+            candidates.extend(self._by_type.get(t, ()))
+
+        if self._by_key:
+            self._add_candidates_by_key(x, candidates)
+
+        return sorted(set(candidates))
+
+    def _add_candidates_by_key(self, x: object, candidates: List[int]):
+        if not isinstance(x, Mapping):
+            if _acceptably_dict_like(x):
+                # DictSpec accepts other things with __getitem__, but looking keys up in them might fail
+                for by_value in self._by_key.values():
+                    for positions in by_value.values():
+                        candidates.extend(positions)
+            return
+
+        for k, by_value in self._by_key.items():
+            if k not in x:
+                continue
+            v = x[k]
+            try:
+                candidates.extend(by_value.get(v, ()))
+            except TypeError:
+                # unhashable, so can't be looked up
+                for positions in by_value.values():
+                    candidates.extend(positions)
+
+    def matching(self, x: object) -> List[Spec]:
+        """
+        Specs x conforms to, in the order they were added
+        """
+        specs = self._specs
+        return [specs[i] for i in self._candidates(x) if specs[i].conform(x) is not INVALID]
+
+    def first_match(self, x: object) -> Optional[Spec]:
+        """
+        The first spec added which x conforms to, or None
+        """
+        specs = self._specs
+        for i in self._candidates(x):
+            if specs[i].conform(x) is not INVALID:
+                return specs[i]
+        return None
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __iter__(self) -> Iterator[Spec]:
+        return iter(self._specs)
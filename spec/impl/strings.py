@@ -0,0 +1,166 @@
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, List
+
+from spec.impl.core import SpecResult, SimpleSpec, INVALID
+from spec.impl.specs import AllOf
+from spec.impl.util.strings import a_or_an
+
+# Number of compiled patterns kept, shared by every Matches spec
+PATTERN_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str, flags: int = 0):
+    """
+    Compiles pattern using re. The regex module isn't used even if it's installed, as its flags have different values
+    (e.g. re.ASCII is regex.VERSION1), so the same spec would behave differently depending on what is installed.
+    """
+    return re.compile(pattern, flags)
+
+
+def _not_a_string(x) -> str:
+    return "expected a str but got {}".format(a_or_an(type(x).__name__))
+
+
+class StringSpec(SimpleSpec):
+    """
+    A check of a string which doesn't change it. Several StringSpecs in the same all_of are checked in one go, see
+    StringChecks
+    """
+
+    def __init__(self, description: str, check: Callable[[str], bool], explain: Callable[[str], str]):
+        super().__init__(description,
+                         lambda x: isinstance(x, str) and check(x),
+                         lambda x: explain(x) if isinstance(x, str) else _not_a_string(x))
+
+
+class Matches(StringSpec):
+    """
+    The whole string must match pattern
+    """
+
+    def __init__(self, pattern: str, flags: int = 0):
+        compiled = compile_pattern(pattern, flags)
+        super().__init__("a string matching {!r}".format(pattern),
+                         lambda x: compiled.fullmatch(x) is not None,
+                         lambda x: "{!r} does not match {!r}".format(x, pattern))
+        self.pattern = pattern
+        self.flags = flags
+        self.compiled = compiled
+
+
+class StrLen(StringSpec):
+    def __init__(self, min_length: int = 0, max_length: int = None):
+        if max_length is None:
+            description = "a string at least {} long".format(min_length)
+        else:
+            description = "a string between {} and {} long".format(min_length, max_length)
+        super().__init__(description,
+                         lambda x: len(x) >= min_length and (max_length is None or len(x) <= max_length),
+                         lambda x: "{!r} is not {}".format(x, description))
+        self.min_length = min_length
+        self.max_length = max_length
+
+
+class StartsWith(StringSpec):
+    def __init__(self, prefix: str):
+        super().__init__("a string starting with {!r}".format(prefix),
+                         lambda x: x.startswith(prefix),
+                         lambda x: "{!r} does not start with {!r}".format(x, prefix))
+        self.prefix = prefix
+
+
+class EndsWith(StringSpec):
+    def __init__(self, suffix: str):
+        super().__init__("a string ending with {!r}".format(suffix),
+                         lambda x: x.endswith(suffix),
+                         lambda x: "{!r} does not end with {!r}".format(x, suffix))
+        self.suffix = suffix
+
+
+def _combinable(m: Matches) -> bool:
+    """
+    Patterns without groups (so without backreferences) or inline global flags like (?i) can be combined into one
+    pattern of lookaheads
+    """
+    return m.compiled.groups == 0 and m.compiled.flags == compile_pattern('', m.flags).flags
+
+
+def _combined_patterns(matches: List[Matches]) -> list:
+    """
+    Combines patterns with the same flags into one, so each value is passed to the regex engine as few times as
+    possible
+    """
+    by_flags = {}
+    separate = []
+    for m in matches:
+        if _combinable(m):
+            by_flags.setdefault(m.flags, []).append(m.pattern)
+        else:
+            separate.append(m.compiled)
+
+    combined = []
+    for flags, patterns in by_flags.items():
+        if len(patterns) == 1:
+            combined.append(compile_pattern(patterns[0], flags))
+        else:
+            # a newline ends any comment at the end of a verbose pattern, which would otherwise swallow what follows
+            end = "\n" if flags & re.VERBOSE else ""
+            lookaheads = "".join(r"(?=(?:{}{})\Z)".format(p, end) for p in patterns[:-1])
+            combined.append(compile_pattern("{}(?:{}{})".format(lookaheads, patterns[-1], end), flags))
+    return combined + separate
+
+
+class StringChecks(SimpleSpec):
+    """
+    Several StringSpecs checked in one go: lengths are combined into one range, and patterns into as few as possible
+    """
+
+    def __init__(self, specs: Iterable[StringSpec]):
+        specs = list(specs)
+        lengths = [s for s in specs if isinstance(s, StrLen)]
+        prefixes = tuple(s.prefix for s in specs if isinstance(s, StartsWith))
+        suffixes = tuple(s.suffix for s in specs if isinstance(s, EndsWith))
+        patterns = tuple(_combined_patterns([s for s in specs if isinstance(s, Matches)]))
+        others = tuple(s for s in specs if not isinstance(s, (StrLen, StartsWith, EndsWith, Matches)))
+
+        min_length = max([s.min_length for s in lengths], default=0)
+        max_lengths = [s.max_length for s in lengths if s.max_length is not None]
+        max_length = min(max_lengths) if max_lengths else None
+
+        def check(x):
+            if not isinstance(x, str):
+                return False
+            n = len(x)
+            if n < min_length or (max_length is not None and n > max_length):
+                return False
+            for prefix in prefixes:
+                if not x.startswith(prefix):
+                    return False
+            for suffix in suffixes:
+                if not x.endswith(suffix):
+                    return False
+            for pattern in patterns:
+                if pattern.fullmatch(x) is None:
+                    return False
+            for s in others:
+                if s.conform(x) is INVALID:
+                    return False
+            return True
+
+        super().__init__(" and ".join(s.describe() for s in specs), check)
+
+
+class StringAllOf(AllOf):
+    """
+    all_of() of StringSpecs, conformed in one go by StringChecks. Explained like AllOf, member by member.
+    """
+
+    def __init__(self, specs: Iterable[StringSpec]):
+        specs = list(specs)
+        super().__init__(specs)
+        self._checks = StringChecks(specs)
+
+    def conform(self, x) -> SpecResult:
+        return self._checks.conform(x)
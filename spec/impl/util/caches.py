@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+
+class IdentityCache:
+    """
+    Bounded least-recently-used cache, keyed on the identity of objects rather than their equality
+
+    Holds a strong reference to each key, so an id can't be reused by another object while its entry is cached.
+
+    Safe to share between threads without locking: a lookup racing with an eviction just misses.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key: object, default: object = None) -> object:
+        entry = self._entries.get(id(key))
+        if entry is None:
+            return default
+        try:
+            self._entries.move_to_end(id(key))
+        except KeyError:
+            pass
+        return entry[1]
+
+    def put(self, key: object, value: object):
+        self._entries[id(key)] = (key, value)
+        while len(self._entries) > self._maxsize:
+            try:
+                self._entries.popitem(last=False)
+            except KeyError:
+                break
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,8 +1,10 @@
-import inspect
 from typing import Callable
 
 
 def can_be_called_with_one_argument(c: Callable) -> bool:
+    # imported lazily to keep `import spec.core` fast
+    import inspect
+
     argspec = inspect.getfullargspec(c)
     default_arg_count = len(argspec.defaults) if argspec.defaults else 0
     non_default_arg_count = len(argspec.args) - default_arg_count
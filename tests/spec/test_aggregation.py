@@ -0,0 +1,75 @@
+import spec.coercions as sc
+from spec.core import explain_batch, dict_spec, coll_of, gt, specize, matches, equal_to
+from spec.impl.aggregation import ProblemAggregator, WILDCARD, format_path, normalise_path
+from spec.impl.core import Problem, path
+
+
+def test_problems_are_grouped_by_normalised_path_and_spec():
+    positive = gt(0)
+    s = dict_spec({'items': coll_of(dict_spec({'price': positive}))})
+
+    rows = [{'items': [{'price': -i}, {'price': 1}, {'price': 0}]} for i in range(1000)]
+
+    aggregator = explain_batch(s, rows, max_examples=3)
+
+    groups = aggregator.groups()
+    assert len(groups) == 1
+
+    group = groups[0]
+    assert group.path == (WILDCARD, 'items', WILDCARD, 'price')
+    assert group.spec is positive
+    assert group.count == 2000
+    assert len(group.examples) == 3
+    assert all(e <= 0 for e in group.examples)
+
+    assert aggregator.values_seen == 1000
+    assert aggregator.invalid_values == 1000
+    assert str(group).startswith("[*].items[*].price failed greater than 0 2000 times")
+
+
+def test_reasons_which_include_values_are_grouped_together():
+    s = dict_spec({'n': sc.Int, 's': matches(r"[a-z]+")})
+
+    aggregator = explain_batch(s, [{'n': "x{}".format(i), 's': "{}".format(i)} for i in range(1000)])
+
+    groups = aggregator.groups()
+    assert [(g.path, g.count) for g in groups] == [((WILDCARD, 'n'), 1000), ((WILDCARD, 's'), 1000)]
+    assert groups[1].reason == "'0' does not match '[a-z]+'"
+
+
+def test_specs_which_cannot_be_hashed_are_grouped():
+    s = coll_of(equal_to([1]))
+
+    aggregator = explain_batch(s, [[[2]], [[3], [1]]])
+
+    [group] = aggregator.groups()
+    assert (group.path, group.count, group.examples) == ((WILDCARD, WILDCARD), 2, ([2], [3]))
+
+
+def test_groups_are_ordered_by_count():
+    is_int = specize(int)
+    s = dict_spec({'a': is_int, 'b': is_int})
+
+    aggregator = ProblemAggregator()
+    aggregator.explain(s, {'a': "x", 'b': "y"})
+    aggregator.explain(s, {'a': 1, 'b': "y"})
+    assert aggregator.explain(s, {'a': 1, 'b': 2})
+
+    assert [(g.path, g.count, g.examples) for g in aggregator.groups()] == [(('b',), 2, ("y", "y")),
+                                                                            (('a',), 1, ("x",))]
+
+
+def test_examples_are_a_random_sample():
+    aggregator = ProblemAggregator(max_examples=10)
+    s = specize(int)
+
+    aggregator.add_all(Problem(path(i), i, s, "not an int") for i in range(10000))
+
+    examples = aggregator.groups()[0].examples
+    assert len(examples) == 10
+    assert max(examples) > 10
+
+
+def test_format_path():
+    assert format_path(normalise_path(path('a', 1, 'b', 2, ('x', 'y')))) == "a[*].b[*][('x', 'y')]"
+    assert format_path(path()) == ""
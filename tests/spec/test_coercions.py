@@ -1,8 +1,136 @@
+import decimal
+from datetime import datetime, date, timezone, timedelta
+from enum import Enum
+from ipaddress import IPv4Address, IPv6Address
 from urllib.parse import ParseResult
+from uuid import uuid4
 
-from spec.coercions import Url
+from spec.coercions import Url, Int, Uuid, Datetime, Date, Decimal, Float, Bool, IpAddress, enum_member, memoized
+from spec.core import isinvalid, explain_data, coerce, any_, INVALID
 
 
 def test_url():
     parsed = Url.conform("http://google.com") # type:ParseResult
     assert parsed.scheme == "http"
+
+
+def test_int():
+    for x, expected in [(1, 1), ("1", 1), (" -12 ", -12), ("1_000", 1000), ("٣", 3), (1.5, 1), (b"7", 7)]:
+        assert Int.conform(x) == expected
+
+    for x in ["", "one", "1.5", "1__0", None, [1]]:
+        assert isinvalid(Int.conform(x)), x
+        assert explain_data(Int, x) is not None
+
+
+def test_uuid():
+    u = uuid4()
+    for x in [u, str(u), "{" + str(u) + "}", "urn:uuid:" + str(u), u.hex]:
+        assert Uuid.conform(x) == u
+
+    for x in ["", str(u)[:-1], "z" * 32, 1, None]:
+        assert isinvalid(Uuid.conform(x)), x
+
+
+def test_invalid_urls():
+    assert isinvalid(Url.conform("http://[::1"))
+    assert isinvalid(Url.conform(None))
+
+
+def test_coercers_can_return_invalid_instead_of_raising():
+    s = coerce(lambda x: x.upper() if isinstance(x, str) else INVALID, any_())
+
+    assert s.conform("a") == "A"
+    assert isinvalid(s.conform(1))
+    assert explain_data(s, 1).problems[0].reason == "could not coerce '1' (int) using coercer: <lambda>"
+
+    custom = coerce(lambda x: INVALID, any_(), explain_coercion_failure=lambda x, e: "failed with {}".format(e))
+    assert explain_data(custom, 1).problems[0].reason == "failed with None"
+
+
+def test_datetime():
+    assert Datetime.conform("2020-01-02T03:04:05") == datetime(2020, 1, 2, 3, 4, 5)
+    assert Datetime.conform("2020-01-02 03:04:05.123456+01:00") == \
+           datetime(2020, 1, 2, 3, 4, 5, 123456, tzinfo=timezone(timedelta(hours=1)))
+    assert Datetime.conform("2020-01-02") == datetime(2020, 1, 2)
+
+    for x in ["", "yesterday", "2020-13-01", "2020-01-02T25:00", 1577934245]:
+        assert isinvalid(Datetime.conform(x)), x
+
+
+def test_date():
+    assert Date.conform("2020-01-02") == date(2020, 1, 2)
+    assert Date.conform(datetime(2020, 1, 2, 3)) == date(2020, 1, 2)
+
+    for x in ["2020-01-02T03:04:05", "2020-02-30", None]:
+        assert isinvalid(Date.conform(x)), x
+
+
+def test_decimal():
+    assert Decimal.conform("1.10") == decimal.Decimal("1.10")
+    assert Decimal.conform(3) == decimal.Decimal(3)
+
+    for x in ["one", 1.1, True, None]:
+        assert isinvalid(Decimal.conform(x)), x
+
+
+def test_float():
+    assert Float.conform("1.5") == 1.5
+    assert Float.conform(2) == 2.0
+    assert isinstance(Float.conform(2), float)
+
+    for x in ["one", True, None]:
+        assert isinvalid(Float.conform(x)), x
+
+
+def test_bool():
+    for x in [True, 1, "true", "Yes", " on ", "1", "T"]:
+        assert Bool.conform(x) is True, x
+    for x in [False, 0, "false", "No", "off", "0", "f"]:
+        assert Bool.conform(x) is False, x
+    for x in [2, "maybe", "", None, 1.0]:
+        assert isinvalid(Bool.conform(x)), x
+
+
+def test_ip_address():
+    assert IpAddress.conform("127.0.0.1") == IPv4Address("127.0.0.1")
+    assert IpAddress.conform("::1") == IPv6Address("::1")
+
+    for x in ["localhost", "256.0.0.1", None]:
+        assert isinvalid(IpAddress.conform(x)), x
+
+
+class Colour(Enum):
+    RED = "red"
+    GREEN = "RED"
+    BLUE = 3
+
+
+def test_enum_member():
+    s = enum_member(Colour)
+
+    assert s.conform(Colour.RED) is Colour.RED
+    assert s.conform("red") is Colour.RED
+    # values are preferred to names
+    assert s.conform("RED") is Colour.GREEN
+    assert s.conform("BLUE") is Colour.BLUE
+    assert s.conform(3) is Colour.BLUE
+
+    for x in ["purple", [], None]:
+        assert isinvalid(s.conform(x)), x
+
+
+def test_memoized_coercers():
+    calls = []
+
+    def parse(x):
+        calls.append(x)
+        return int(x)
+
+    s = coerce(memoized(parse, maxsize=2), int)
+
+    assert [s.conform(x) for x in ["1", "1", "2", "1"]] == [1, 1, 2, 1]
+    assert calls == ["1", "2"]
+
+    assert isinvalid(s.conform("one"))
+    assert isinvalid(s.conform(["unhashable"]))
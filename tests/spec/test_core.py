@@ -1,8 +1,10 @@
 from typing import Callable
 
 from spec.core import conform, explain_data, equal_to, any_, is_instance, even, odd, is_none, specize, coerce, \
-    in_range, gt, lt, lte, gte, describe, is_in, assert_spec, isinvalid, isvalid, coll_of
-from spec.impl.core import path, Problem, Explanation, SpecError
+    in_range, gt, lt, lte, gte, describe, is_in, assert_spec, isinvalid, isvalid, coll_of, one_of, all_of, dict_spec, \
+    iter_problems, tuple_of, set_of, map_of
+from spec.impl.core import path, Problem, Explanation, SpecError, LinkedPath, child_path, LINKED_PATH_THRESHOLD, \
+    SimpleSpec, invalidate_descriptions
 from tests.spec.support import check_spec
 
 
@@ -331,3 +333,263 @@ def test_coll_of():
     except SpecError as e:
         error = e
         assert error.explanation == Explanation.with_problems(Problem(path(), 1, s, "not iterable"))
+
+
+def test_tuple_of():
+    item_spec = specize(int)
+    s = tuple_of(item_spec, ...)
+
+    check_spec(s, (1, 2))
+    check_spec(s, ())
+    check_spec(s, [1, 2], expected_conform=(1, 2))
+    check_spec(s, (1, "two"), [Problem(path(1), "two", item_spec, "expected an int but got a str")])
+    check_spec(s, {1, 2}, [Problem(path(), {1, 2}, s, "expected a tuple or list but got a set")])
+
+
+def test_fixed_tuple_of():
+    s = tuple_of(int, str)
+    int_spec, str_spec = s._specs
+
+    check_spec(s, (1, "one"))
+    check_spec(s, [1, "one"], expected_conform=(1, "one"))
+    check_spec(s, ("one", 1), [Problem(path(0), "one", int_spec, "expected an int but got a str"),
+                               Problem(path(1), 1, str_spec, "expected a str but got an int")])
+    check_spec(s, (1,), [Problem(path(), (1,), s, "expected 2 items but got 1")])
+    check_spec(s, "ab", [Problem(path(), "ab", s, "expected a tuple or list but got a str")])
+
+    check_spec(tuple_of(), ())
+
+
+def test_set_of():
+    item_spec = specize(int)
+    s = set_of(item_spec)
+
+    check_spec(s, {1, 2})
+    check_spec(s, frozenset({1, 2}))
+    assert isinstance(conform(s, frozenset({1})), frozenset)
+    check_spec(s, {"one"}, [Problem(path(0), "one", item_spec, "expected an int but got a str")])
+    check_spec(s, [1, 2], [Problem(path(), [1, 2], s, "expected a set but got a list")])
+
+
+def test_set_of_items_which_conform_to_unhashable_values():
+    s = set_of(coerce(list, list))
+
+    check_spec(s, {(1,)}, [Problem(path(), {(1,)}, s, "items conform to values which can't be put in a set")])
+
+
+def test_map_of():
+    key_spec, value_spec = specize(str), specize(int)
+    s = map_of(key_spec, value_spec)
+
+    check_spec(s, {'a': 1, 'b': 2})
+    check_spec(s, {})
+    check_spec(s, {'a': "one"}, [Problem(path('a'), "one", value_spec, "expected an int but got a str")])
+    check_spec(s, {1: 1}, [Problem(path(1), 1, key_spec, "expected a str but got an int")])
+    check_spec(s, [('a', 1)], [Problem(path(), [('a', 1)], s, "not a Mapping <class 'list'>")])
+
+
+def test_map_of_conforms_keys_and_values():
+    s = map_of(coerce(str.upper, str), coerce(int, int))
+
+    assert conform(s, {'a': "1", 'b': 2}) == {'A': 1, 'B': 2}
+    assert isinvalid(conform(s, {1: 1}))
+    assert isinvalid(conform(s, {'a': "one"}))
+
+
+def test_invalid_is_a_singleton():
+    import copy
+    import pickle
+    from spec.impl.core import Invalid
+    from spec.core import INVALID
+
+    assert Invalid() is INVALID
+    assert copy.copy(INVALID) is INVALID
+    assert copy.deepcopy(INVALID) is INVALID
+    assert pickle.loads(pickle.dumps(INVALID)) is INVALID
+
+    assert isinvalid(INVALID)
+    assert isvalid(None)
+    assert isvalid(0)
+
+
+class RaisesOnComparison:
+    def __eq__(self, other):
+        raise ValueError("comparison is ambiguous")
+
+    def __ne__(self, other):
+        raise ValueError("comparison is ambiguous")
+
+    __hash__ = object.__hash__
+
+
+def test_values_are_never_compared_to_invalid():
+    x = RaisesOnComparison()
+
+    assert isvalid(x)
+    assert conform(coll_of(RaisesOnComparison), [x])[0] is x
+    assert conform(dict_spec({'k': RaisesOnComparison}), {'k': x})['k'] is x
+    assert conform(one_of(is_none(), RaisesOnComparison), x) is x
+    assert conform(all_of(RaisesOnComparison, any_()), x) is x
+
+
+def test_specize_reuses_specs_for_the_same_callable():
+    def f(x):
+        return True
+
+    assert specize(f) is specize(f)
+    assert specize(int) is specize(int)
+    assert specize(lambda x: True) is not specize(lambda x: True)
+
+
+def test_specize_reuses_specs_for_sets_with_the_same_contents():
+    s = {"a", "b"}
+
+    assert specize(s) is specize({"b", "a"})
+
+    s.add("c")
+    check_spec(s, "c")
+
+
+def test_specize_does_not_reuse_specs_for_sets_with_equal_contents_of_different_types():
+    assert specize({1}).describe() == "in [1]"
+    assert specize({True}).describe() == "in [True]"
+    assert specize({1.0}).describe() == "in [1.0]"
+    assert specize({1}).describe() == "in [1]"
+
+
+def test_identity_cache_is_bounded():
+    from spec.impl.util.caches import IdentityCache
+
+    cache = IdentityCache(2)
+    a, b, c = object(), object(), object()
+
+    cache.put(a, 1)
+    cache.put(b, 2)
+    assert cache.get(a) == 1
+    cache.put(c, 3)
+
+    assert len(cache) == 2
+    assert cache.get(a) == 1
+    assert cache.get(b) is None
+    assert cache.get(c) == 3
+
+
+def test_all_of_explains_the_value_which_failed():
+    greater_than_one = gt(1)
+    s = all_of(int, greater_than_one, lt(5))
+
+    check_spec(s, 2)
+    check_spec(s, 0,
+               [Problem(path(), 0, greater_than_one, "not greater than 1")])
+
+
+def test_one_of_explains_nothing_if_any_branch_conforms():
+    int_spec = is_instance(int)
+    str_spec = is_instance(str)
+    s = one_of(int_spec, str_spec)
+
+    check_spec(s, 1)
+    check_spec(s, "one")
+    check_spec(s, 1.5,
+               [Problem(path(), 1.5, int_spec, "expected an int but got a float"),
+                Problem(path(), 1.5, str_spec, "expected a str but got a float")])
+
+
+def test_problem_paths_are_always_tuples():
+    linked = child_path(child_path(path('a'), 'b'), 0)
+    for _ in range(LINKED_PATH_THRESHOLD):
+        linked = child_path(linked, 'c')
+
+    assert isinstance(linked, LinkedPath)
+    assert linked == path('a', 'b', 0, *['c'] * LINKED_PATH_THRESHOLD)
+    assert len(linked) == LINKED_PATH_THRESHOLD + 3
+    assert linked + path('d') == path('a', 'b', 0, *['c'] * LINKED_PATH_THRESHOLD, 'd')
+
+    problem = Problem(linked, 1, any_(), "reason")
+    assert type(problem.path) is tuple
+    assert type(problem._replace(path=child_path(linked, 'd')).path) is tuple
+
+
+def test_deeply_nested_problems_have_tuple_paths():
+    depth = LINKED_PATH_THRESHOLD * 2
+    s = int
+    x = "one"
+    for _ in range(depth):
+        s = coll_of(s)
+        x = [x, [1]]
+
+    problems = explain_data(s, x).problems
+
+    assert [type(p.path) for p in problems] == [tuple] * len(problems)
+    assert problems[0].path == (0,) * depth
+
+
+def test_iter_problems_yields_the_same_problems_as_explain():
+    s = dict_spec({'a': coll_of(one_of(is_none(), all_of(int, gt(0)))),
+                   'b': {'c': coerce(int, int)},
+                   'd': {'e': int}})
+
+    for x in [{'a': [None, -1, 2, "three"], 'b': {'c': "four"}, 'd': {'e': "five"}},
+              {'a': [], 'b': {'c': "1"}, 'd': {'e': 1}},
+              {'a': 1, 'b': None, 'd': "not a dict"}]:
+        assert list(iter_problems(s, x)) == list(explain_data(s, x).problems if explain_data(s, x) else [])
+
+
+def test_iter_problems_stops_early():
+    checked = []
+
+    def check(x):
+        checked.append(x)
+        return isinstance(x, int)
+
+    s = coll_of(coll_of(check))
+
+    first = next(iter_problems(s, [[1, "two", 3], [4, "five"]]))
+
+    assert first.path == path(0, 1)
+    assert checked == [1, "two"]
+
+
+class CountingDescription(SimpleSpec):
+    def __init__(self):
+        super().__init__("counted", lambda x: True)
+        self.describe_calls = 0
+
+    def describe(self) -> str:
+        self.describe_calls += 1
+        return super().describe()
+
+
+def test_descriptions_of_composite_specs_are_cached():
+    child = CountingDescription()
+    s = dict_spec({'a': coll_of(one_of(child, all_of(child, is_in({1, 2}))))})
+
+    description = describe(s)
+    assert describe(s) == description
+    assert child.describe_calls == 2
+
+    invalidate_descriptions()
+
+    assert describe(s) == description
+    assert child.describe_calls == 4
+
+
+def test_reasons_are_rendered_when_problems_are_found():
+    rendered = []
+
+    def explain_failure(x, e):
+        rendered.append(x)
+        return "could not coerce {} because {}".format(x, e)
+
+    def coercer(x):
+        raise ValueError("nope")
+
+    s = coerce(coercer, int, explain_coercion_failure=explain_failure)
+
+    x = ["one"]
+    problems = explain_data(s, x).problems
+    assert rendered == [["one"]]
+
+    x.append("two")
+    assert problems == (Problem(path(), x, s, "could not coerce ['one'] because nope"),)
+    assert type(problems[0].reason) is str
\ No newline at end of file
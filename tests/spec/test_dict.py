@@ -1,8 +1,10 @@
 from uuid import UUID
 
+import pytest
+
 import spec.coercions as sc
-from spec.core import equal_to, in_range, dict_spec, dict_example
-from spec.impl.core import Problem, path
+from spec.core import equal_to, in_range, dict_spec, dict_example, conform_lazy, coerce, INVALID
+from spec.impl.core import Problem, path, SpecError
 from tests.spec.support import check_spec
 
 
@@ -42,4 +44,61 @@ def test_dict_spec_returns_conformed_values():
     expected_conformed_value = UUID('80b71e04-9862-462b-ac0c-0c34dc272c7b')
     original_value = str(expected_conformed_value)
 
-    check_spec(s, {'k': original_value}, expected_conform={'k': expected_conformed_value})
\ No newline at end of file
+    check_spec(s, {'k': original_value}, expected_conform={'k': expected_conformed_value})
+
+
+def test_conform_lazy_conforms_values_when_they_are_read():
+    coerced = []
+
+    def parse(x):
+        coerced.append(x)
+        return int(x)
+
+    s = dict_spec({'a': coerce(parse, int), 'b': coerce(parse, int), 'c': coerce(parse, int)})
+
+    view = conform_lazy(s, {'a': "1", 'b': "2", 'c': "not an int", 'd': "not in spec"})
+
+    assert coerced == []
+    assert view['a'] == 1
+    assert view['a'] == 1
+    assert view.get('b') == 2
+    assert coerced == ["1", "2"]
+
+    assert list(view) == ['a', 'b', 'c']
+    assert len(view) == 3
+    assert 'c' in view
+    assert 'd' not in view
+    with pytest.raises(KeyError):
+        view['d']
+
+    with pytest.raises(SpecError) as e:
+        view['c']
+    assert [p.path for p in e.value.explanation.problems] == [path('c')]
+
+
+def test_conform_lazy_can_be_forced():
+    s = dict_spec({'a': sc.Int, 'b': sc.Int})
+
+    view = conform_lazy(s, {'a': "1", 'b': "2"})
+    assert view['a'] == 1
+    assert view.force() == {'a': 1, 'b': 2}
+
+    with pytest.raises(SpecError) as e:
+        conform_lazy(s, {'a': "one", 'b': "two"}).force()
+    assert [p.path for p in e.value.explanation.problems] == [path('a'), path('b')]
+
+
+def test_conform_lazy_reports_missing_keys_when_they_are_read():
+    view = conform_lazy(dict_spec({'a': int, 'b': int}), {'a': 1})
+
+    assert view['a'] == 1
+    with pytest.raises(SpecError) as e:
+        view['b']
+    assert e.value.explanation.problems == ("Missing b",)
+
+
+def test_conform_lazy_rejects_values_that_are_not_dict_like():
+    assert conform_lazy(dict_spec({'a': int}), 1) is INVALID
+
+    with pytest.raises(TypeError):
+        conform_lazy(int, {'a': 1})
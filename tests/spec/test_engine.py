@@ -0,0 +1,171 @@
+import pytest
+
+import spec.coercions as sc
+from collections import namedtuple
+
+from spec.core import iterative_conform, iterative_explain_data, conform, explain_data, coll_of, dict_spec, \
+    one_of, all_of, is_none, gt, decorated, coerce, optimize, sample, isinvalid, deduplicated, map_of, set_of, \
+    tuple_of, object_spec, matches, limited, limits
+from spec.impl.iterables import CollOf
+
+
+def check_same_as_recursive(s, *values):
+    for v in values:
+        assert iterative_conform(s, v) == conform(s, v), v
+        assert iterative_explain_data(s, v) == explain_data(s, v), v
+
+
+def nested_lists(depth: int, leaf: object):
+    x = leaf
+    for _ in range(depth):
+        x = [x]
+    return x
+
+
+def innermost(x):
+    while isinstance(x, list):
+        x = x[0]
+    return x
+
+
+def nested_coll_of(depth: int, leaf):
+    s = leaf
+    for _ in range(depth):
+        s = coll_of(s)
+    return s
+
+
+def test_results_are_the_same_as_recursive_conform_and_explain():
+    s = dict_spec({'a': coll_of(one_of(is_none(), all_of(sc.Int, gt(0)))),
+                   'b': {'c': decorated(coerce(str, str), "a string")},
+                   'd': coll_of(int, sample=sample(first=1)),
+                   'e': optimize(all_of(int, all_of(gt(1), gt(2))))})
+
+    check_same_as_recursive(s,
+                            {'a': [None, "1", 2], 'b': {'c': 1}, 'd': [1, "x"], 'e': 3},
+                            {'a': [None, "-1", "x"], 'b': {'c': 1}, 'd': ["x"], 'e': 2},
+                            {'a': "not a list", 'b': None},
+                            42)
+
+
+Point = namedtuple('Point', ['x', 'y'])
+
+
+def test_hand_written_conform_and_explain_match_the_steps():
+    s = dict_spec({'map': map_of(str, sc.Int),
+                   'coerced_keys': map_of(coerce(str.upper, str), int),
+                   'set': set_of(one_of(int, str, adaptive=True)),
+                   'unhashable': set_of(coerce(list, list)),
+                   'tuples': coll_of(tuple_of(int, sc.Int)),
+                   'point': object_spec({'x': sc.Int, 'y': all_of(int, gt(0))}),
+                   'strings': optimize(all_of(str, matches('a+'), gt('a'))),
+                   'limited': limited(coll_of(int), limits(max_length=2))})
+
+    check_same_as_recursive(s,
+                            {'map': {'a': "1"},
+                             'coerced_keys': {'a': 1},
+                             'set': {1, "one"},
+                             'unhashable': set(),
+                             'tuples': [(1, "2")],
+                             'point': Point("1", 2),
+                             'strings': "aa",
+                             'limited': [1, 2]},
+                            {'map': {1: "one"},
+                             'coerced_keys': {1: "one"},
+                             'set': {1.5},
+                             'unhashable': {(1,)},
+                             'tuples': [(1,), ("one", 2)],
+                             'point': Point(1, -1),
+                             'strings': "b",
+                             'limited': [1, 2, 3]},
+                            {'map': [], 'set': [], 'tuples': (), 'point': None, 'limited': "x"})
+
+
+class CollOfWithoutSteps(CollOf):
+    def conform(self, xs):
+        return super().conform(xs)
+
+
+def test_specs_without_steps_are_treated_as_leaves():
+    s = coll_of(CollOfWithoutSteps(coll_of(int)))
+
+    check_same_as_recursive(s, [[[1]], [[2]]], [[["one"]]], [None])
+
+
+def test_deeply_nested_values_do_not_exceed_recursion_limit():
+    depth = 10000
+    s = nested_coll_of(depth, int)
+
+    valid = nested_lists(depth, 1)
+    invalid = nested_lists(depth, "one")
+
+    with pytest.raises(RecursionError):
+        conform(s, valid)
+
+    # comparing the lists directly would exceed the recursion limit
+    assert innermost(iterative_conform(s, valid)) == 1
+    assert isinvalid(iterative_conform(s, invalid))
+
+    problems = iterative_explain_data(s, invalid).problems
+    assert len(problems) == 1
+    assert problems[0].path == (0,) * depth
+
+
+def counting(s, calls):
+    def check(x):
+        calls.append(x)
+        return not isinvalid(conform(s, x))
+
+    return check
+
+
+def linked_list_spec():
+    s = dict_spec({'value': int})
+    # noinspection PyProtectedMember
+    s._key_to_spec['next'] = one_of(is_none(), s)
+    return s
+
+
+def test_deduplicated_specs_validate_shared_values_once():
+    calls = []
+    s = deduplicated(coll_of(dict_spec({'k': counting(int, calls)})))
+
+    shared = {'k': 1}
+    conformed = conform(s, [shared] * 100)
+
+    assert conformed == [{'k': 1}] * 100
+    assert len(calls) == 1
+    # the conformed result is shared too
+    assert all(c is conformed[0] for c in conformed)
+
+
+def test_deduplicated_specs_explain_shared_values_at_every_path():
+    item = dict_spec({'k': int})
+    s = deduplicated(coll_of(item))
+
+    shared = {'k': "one"}
+
+    assert explain_data(s, [shared, {'k': 2}, shared]) == explain_data(coll_of(item), [shared, {'k': 2}, shared])
+
+
+def test_deduplicated_specs_explain_shared_values_with_missing_keys():
+    s = coll_of(dict_spec({'k': int}))
+    shared = {}
+
+    assert explain_data(deduplicated(s), [shared, shared]) == explain_data(s, [shared, shared])
+
+
+def test_deduplicated_specs_report_cycles():
+    s = deduplicated(linked_list_spec())
+
+    assert conform(s, {'value': 1, 'next': {'value': 2, 'next': None}}) == \
+           {'value': 1, 'next': {'value': 2, 'next': None}}
+
+    cyclic = {'value': 1, 'next': {'value': 2}}
+    cyclic['next']['next'] = cyclic
+
+    assert isinvalid(conform(s, cyclic))
+
+    problems = explain_data(s, cyclic).problems
+    assert any(problem.path == ('next', 'next') and problem.reason == "contains itself" and problem.value is cyclic
+               for problem in problems)
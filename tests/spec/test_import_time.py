@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cumulative time to import spec.core, including typing, as a multiple of the time to import typing, so the budget
+# holds on slow machines too. Generous enough to ignore noise, but not a heavyweight import creeping in.
+IMPORT_BUDGET_TYPING_MULTIPLE = 3
+
+# Only needed by some of the functions in spec.core, so imported when they're called
+LAZILY_IMPORTED_MODULES = ('pprint', 'inspect', 'pyrsistent', 'threading', 'spec.impl.aggregation',
+                           'spec.impl.engine', 'spec.impl.limits', 'spec.impl.objects', 'spec.impl.optimize',
+                           'spec.impl.select', 'spec.impl.specset', 'spec.impl.strings')
+
+
+def run_python(*args: str, env: dict = None) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + list(args),
+                          cwd=ROOT,
+                          env=env,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          universal_newlines=True,
+                          check=True)
+
+
+def cumulative_import_times(module: str, pycache: str) -> dict:
+    """
+    Microseconds taken by each module imported by importing module, as reported by python -X importtime, or an empty
+    dict if this python doesn't support -X importtime.
+
+    Bytecode is written to and read from pycache, so that compiling spec's source isn't counted, as it isn't once
+    spec is installed.
+    """
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    run_python("-c", "import {}".format(module), env=env)
+
+    timings = {}
+    for line in run_python("-X", "importtime", "-c", "import {}".format(module), env=env).stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_import_spec_core_is_within_budget():
+    with tempfile.TemporaryDirectory() as pycache:
+        runs = [cumulative_import_times("spec.core", pycache) for _ in range(3)]
+    if not all(runs):
+        pytest.skip("python -X importtime is only supported in python 3.7+")
+
+    multiples = [run["spec.core"] / run["typing"] for run in runs]
+    assert min(multiples) < IMPORT_BUDGET_TYPING_MULTIPLE, \
+        "import spec.core took {:.1f}x as long as import typing. Budget is {}x".format(
+            min(multiples), IMPORT_BUDGET_TYPING_MULTIPLE)
+
+
+def test_import_spec_core_does_not_load_modules_only_needed_by_some_functions():
+    loaded = run_python("-c",
+                        "import sys, spec.core; "
+                        "print(' '.join(m for m in {!r} if m in sys.modules))".format(LAZILY_IMPORTED_MODULES))
+
+    assert loaded.stdout.strip() == ""
@@ -0,0 +1,153 @@
+import pytest
+
+import spec.coercions as sc
+from spec.core import limits, limited, set_default_limits, conform, explain_data, coll_of, dict_spec, isinvalid, \
+    describe, assert_spec, specize, map_of, iter_problems, iterative_conform, iterative_explain_data
+from spec.impl.core import Problem, path, SpecError
+
+
+class HugeSized:
+    """
+    Claims to be enormous, and fails if anything tries to iterate over it
+    """
+
+    def __len__(self):
+        return 10 ** 9
+
+    def __iter__(self):
+        raise AssertionError("should not be iterated")
+
+
+@pytest.fixture
+def default_limits():
+    previous = set_default_limits(None)
+    yield
+    set_default_limits(previous)
+
+
+def nested_lists(depth: int, leaf: object = 1):
+    x = leaf
+    for _ in range(depth):
+        x = [x]
+    return x
+
+
+def nested_coll_of(depth: int, leaf):
+    s = leaf
+    for _ in range(depth):
+        s = coll_of(s)
+    return s
+
+
+def innermost(x):
+    while isinstance(x, list):
+        x = x[0]
+    return x
+
+
+def test_max_length():
+    s = limited(coll_of(sc.Int), limits(max_length=2))
+
+    assert conform(s, ["1", "2"]) == [1, 2]
+    assert isinvalid(conform(s, ["1", "2", "3"]))
+    assert explain_data(s, {'k': [1]}) is not None
+
+    huge = HugeSized()
+    assert isinvalid(conform(s, huge))
+    assert explain_data(s, huge).problems == (Problem(path(), huge, s,
+                                                      "length 1000000000 is greater than maximum of 2"),)
+
+
+def test_max_size():
+    s = limited(dict_spec({'k': str}), limits(max_size=3))
+
+    assert conform(s, {'k': "abc"}) == {'k': "abc"}
+    assert explain_data(s, {'k': "abcd"}).problems == (Problem(path('k'), "abcd", s,
+                                                               "length 4 is greater than maximum of 3"),)
+    assert isinvalid(conform(s, {'k': b"abcd"}))
+
+
+def test_keys_are_checked_when_they_are_read():
+    s = limited(map_of(lambda k: True, int), limits(max_size=3))
+
+    assert explain_data(s, {"abc": 1, "long key": 1}).problems == (Problem(path("long key"), "long key", s,
+                                                                           "length 8 is greater than maximum of 3"),)
+
+
+def test_parts_of_values_which_are_not_read_are_not_checked():
+    s = limited(dict_spec({'k': str}), limits(max_size=3, max_length=2, max_depth=1))
+
+    assert conform(s, {'k': "abc", 'unread': ["abcd", [[1]], 2]}) == {'k': "abc"}
+
+
+def test_max_depth():
+    s = limited(coll_of(coll_of(coll_of(int))), limits(max_depth=2))
+
+    assert conform(limited(coll_of(coll_of(int)), limits(max_depth=2)), nested_lists(2)) == nested_lists(2)
+
+    problems = explain_data(s, nested_lists(3)).problems
+    assert problems == (Problem(path(0, 0), [1], s, "nested more than 2 deep"),)
+
+
+def test_max_depth_rejects_very_deep_values_without_recursing():
+    s = limited(coll_of(int), limits(max_depth=10))
+
+    assert isinvalid(conform(s, nested_lists(100000)))
+
+
+def test_iterative_conform_of_deep_values_does_not_recurse(default_limits):
+    depth = 5000
+    s = nested_coll_of(depth, int)
+
+    set_default_limits(limits(max_length=10))
+
+    assert innermost(iterative_conform(s, nested_lists(depth))) == 1
+    assert isinvalid(iterative_conform(s, nested_lists(depth, leaf=[0] * 11)))
+    assert iterative_explain_data(s, nested_lists(depth, leaf="one")).problems[0].path == (0,) * depth
+
+
+def test_max_nodes():
+    s = limited(coll_of(coll_of(int)), limits(max_nodes=5))
+
+    # outer list, two inner lists and two ints
+    assert conform(s, [[1], [2]]) == [[1], [2]]
+    assert isinvalid(conform(s, [[1], [2, 3]]))
+    assert explain_data(s, [[1], [2, 3]]).problems[0].reason == "more than 5 values"
+
+
+def test_timeout():
+    def slow(x):
+        for _ in range(10000):
+            pass
+        return True
+
+    s = limited(coll_of(slow), limits(timeout=0.01))
+
+    assert isinvalid(conform(s, list(range(1000))))
+    assert explain_data(s, list(range(1000))).problems[0].reason == "took longer than 0.01s to validate"
+
+    assert conform(s, [1]) == [1]
+
+
+def test_limited_specs_are_described_and_explained_like_their_delegates():
+    s = limited(coll_of(int), limits(max_length=10))
+
+    assert describe(s) == describe(coll_of(int))
+    assert explain_data(s, ["one"]) == explain_data(coll_of(int), ["one"])
+    assert list(iter_problems(s, ["one", 2, "three"])) == list(iter_problems(coll_of(int), ["one", 2, "three"]))
+    assert list(iter_problems(s, list(range(11))))[0].reason == "length 11 is greater than maximum of 10"
+
+
+def test_default_limits_apply_to_every_call(default_limits):
+    s = specize(coll_of(int))
+
+    set_default_limits(limits(max_length=2))
+
+    assert isinvalid(conform(s, [1, 2, 3]))
+    assert explain_data(s, [1, 2, 3]).problems[0].reason == "length 3 is greater than maximum of 2"
+    with pytest.raises(SpecError):
+        assert_spec(s, [1, 2, 3])
+
+    set_default_limits(None)
+
+    assert conform(s, [1, 2, 3]) == [1, 2, 3]
@@ -0,0 +1,184 @@
+from collections import namedtuple
+
+import pytest
+
+from spec.core import object_spec, coll_of, coerce, equal_to, conform, INVALID, select, path, WILDCARD, reconform, \
+    is_instance, explain_data
+from spec.impl.core import Problem
+from spec.impl.objects import ObjectSpec
+from tests.spec.support import check_spec
+
+
+class Address:
+    def __init__(self, city, postcode):
+        self.city = city
+        self.postcode = postcode
+
+
+class Person:
+    def __init__(self, name, age, address):
+        self.name = name
+        self.age = age
+        self.address = address
+
+
+def test_validates_attributes():
+    s = object_spec({'name': str, 'age': int})
+
+    check_spec(s, Person("Ann", 30, None))
+
+    bad_age = Person("Ann", "thirty", None)
+    check_spec(s, bad_age,
+               [Problem(path('age'), "thirty", s._attr_to_spec['age'], "expected an int but got a str")])
+
+
+def test_missing_attributes():
+    s = object_spec({'name': str, 'height': int})
+
+    x = Person("Ann", 30, None)
+    check_spec(s, x, [Problem(path(), x, s, "missing attribute height")])
+
+
+def test_nested_and_dotted_attributes():
+    s = object_spec({'address': {'city': str}, 'address.postcode': equal_to("N1")})
+
+    check_spec(s, Person("Ann", 30, Address("London", "N1")))
+    assert conform(s, Person("Ann", 30, Address(1, "N1"))) is INVALID
+    assert conform(s, Person("Ann", 30, Address("London", "E1"))) is INVALID
+
+
+def test_conforms_to_x_unless_values_change():
+    s = object_spec({'name': str, 'age': coerce(int, int)})
+
+    unchanged = Person("Ann", 30, None)
+    assert conform(s, unchanged) is unchanged
+
+    changed = Person("Ann", "30", None)
+    conformed = conform(s, changed)
+    assert conformed is not changed
+    assert (conformed.name, conformed.age) == ("Ann", 30)
+    assert changed.age == "30"
+
+
+def test_immutable_objects_can_be_conformed():
+    Point = namedtuple('Point', ['x', 'y'])
+
+    s = object_spec({'x': int, 'y': int})
+
+    p = Point(1, 2)
+    assert conform(s, p) is p
+    assert conform(s, Point(1, "2")) is INVALID
+
+
+def test_conformed_namedtuples_are_copied_with_replace():
+    Point = namedtuple('Point', ['x', 'y'])
+
+    s = object_spec({'x': int, 'y': coerce(int, int)})
+
+    assert conform(s, Point(1, "2")) == Point(1, 2)
+
+
+def test_conformed_dataclasses_are_copied_with_replace():
+    dataclasses = pytest.importorskip("dataclasses")
+
+    @dataclasses.dataclass(frozen=True)
+    class Quantity:
+        n: int
+        doubled: int = dataclasses.field(init=False)
+
+        def __post_init__(self):
+            object.__setattr__(self, 'doubled', self.n * 2)
+
+    s = object_spec({'n': coerce(int, int)})
+
+    conformed = conform(s, Quantity("21"))
+    assert (conformed.n, conformed.doubled) == (21, 42)
+
+
+def test_dotted_attributes_are_conformed_into_copies_of_nested_objects():
+    s = object_spec({'address.postcode': coerce(str.upper, str)})
+
+    address = Address("London", "n1")
+    ann = Person("Ann", 30, address)
+    conformed = conform(s, ann)
+
+    assert conformed.address.postcode == "N1"
+    assert conformed.address is not address
+    assert address.postcode == "n1"
+    assert not hasattr(conformed, 'address.postcode')
+
+
+def test_objects_which_cannot_be_copied_are_invalid():
+    class Uncopyable(Person):
+        def __copy__(self):
+            raise TypeError("can't copy")
+
+    s = object_spec({'age': coerce(int, int)})
+
+    x = Uncopyable("Ann", "30", None)
+    check_spec(s, x, [Problem(path(), x, s, "could not copy with conformed age: can't copy")])
+    assert conform(s, Uncopyable("Ann", 30, None)) is not INVALID
+
+
+def test_objects_with_read_only_attributes_which_conform_to_new_values_are_invalid():
+    class P:
+        def __init__(self, n):
+            self._n = n
+
+        @property
+        def n(self):
+            return self._n
+
+    s = object_spec({'n': coerce(int, is_instance(int))})
+
+    x = P("12")
+    assert conform(s, x) is INVALID
+    [problem] = explain_data(s, x).problems
+    assert problem.path == path() and problem.reason.startswith("could not copy with conformed n: ")
+
+    previous = conform(s, P(12))
+    conformed, explanation = reconform(s, x, previous, [path('n')])
+    assert conformed is INVALID
+    assert explanation.problems == (problem,)
+
+
+def test_reconform_objects():
+    s = object_spec({'name': str, 'age': coerce(int, int), 'address.city': str})
+
+    x = Person("Ann", "30", Address("London", "N1"))
+    previous = conform(s, x)
+
+    x.name = "Bob"
+    conformed, explanation = reconform(s, x, previous, [path('name')])
+    assert explanation is None
+    assert (conformed.name, conformed.age) == ("Bob", 30)
+
+    x.address.city = 1
+    conformed, explanation = reconform(s, x, previous, [path('address', 'city')])
+    assert conformed is INVALID
+    assert explanation.problems[0].path == path('address.city')
+
+
+def test_select_from_object_specs():
+    s = coll_of(object_spec({'name': str, 'age': int}))
+
+    pruned = select(s, [path(WILDCARD, 'name')])
+
+    ann = Person("Ann", "thirty", None)
+    assert conform(pruned, [ann]) == [ann]
+    assert conform(pruned, [Person(1, 30, None)]) is INVALID
+    assert conform(s, [Person("Ann", "thirty", None)]) is INVALID
+
+
+def test_select_keeps_the_type_of_object_specs():
+    class SubclassOfObjectSpec(ObjectSpec):
+        pass
+
+    # noinspection PyProtectedMember
+    s = SubclassOfObjectSpec(object_spec({'name': str, 'age': int, 'address.city': str})._attr_to_spec)
+
+    pruned = select(s, [path('address', 'city')])
+
+    assert type(pruned) is SubclassOfObjectSpec
+    assert conform(pruned, Person(1, "thirty", Address("London", "N1"))) is not INVALID
+    assert conform(pruned, Person("Ann", 30, Address(1, "N1"))) is INVALID
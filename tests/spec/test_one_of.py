@@ -0,0 +1,68 @@
+from spec.core import one_of, is_none, is_instance, conform, explain_data, specize, coerce, isinvalid, \
+    all_of, any_
+from spec.impl.specs import AdaptiveOneOf
+
+
+def counting(name, s, calls):
+    def check(x):
+        calls.append(name)
+        return not isinvalid(conform(s, x))
+
+    return specize(check)
+
+
+def test_adaptive_one_of_tries_most_frequent_matches_first():
+    calls = []
+    s = AdaptiveOneOf([counting("none", is_none(), calls), counting("int", int, calls)], reorder_every=10)
+
+    for i in range(20):
+        assert conform(s, i) == i
+    del calls[:]
+
+    assert conform(s, 1) == 1
+    # the earlier declared branch still has to be checked, because it can't be ruled out by its type
+    assert calls == ["int", "none"]
+    assert [stat.trial_position for stat in s.statistics()] == [1, 0]
+    assert [stat.hits for stat in s.statistics()] == [0, 21]
+
+
+def test_adaptive_one_of_skips_earlier_branches_ruled_out_by_type():
+    calls = []
+    s = AdaptiveOneOf([all_of(is_none(), counting("none", any_(), calls)), is_instance(int)], reorder_every=1)
+
+    for i in range(5):
+        conform(s, i)
+    del calls[:]
+
+    assert [stat.trial_position for stat in s.statistics()] == [1, 0]
+    assert conform(s, 1) == 1
+    assert calls == []
+
+    assert conform(s, None) is None
+    assert isinvalid(conform(s, "one"))
+
+
+def test_adaptive_one_of_prefers_earlier_declared_branches_where_they_overlap():
+    as_string = coerce(str, str)
+    s = AdaptiveOneOf([is_instance(int), as_string], reorder_every=1)
+
+    for i in range(5):
+        assert conform(s, "string") == "string"
+
+    assert [stat.trial_position for stat in s.statistics()] == [1, 0]
+
+    # both branches conform ints, but the first declared branch wins
+    assert conform(s, 1) == 1
+    assert [stat.hits for stat in s.statistics()] == [1, 5]
+
+
+def test_adaptive_one_of_explains_like_one_of():
+    branches = [is_none(), is_instance(int)]
+    s = one_of(*branches, adaptive=True)
+    plain = one_of(*branches)
+
+    for i in range(2000):
+        conform(s, i)
+
+    assert explain_data(s, None) is None
+    assert explain_data(s, "one") == explain_data(plain, "one")
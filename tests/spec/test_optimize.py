@@ -0,0 +1,127 @@
+import spec.coercions as sc
+from spec.core import optimize, all_of, one_of, is_instance, gt, lt, gte, lte, in_range, any_, decorated, coerce, \
+    describe, conform, explain_data, specize, dict_spec, coll_of, is_none, equal_to, is_in
+from spec.impl.optimize import OptimizedAllOf, BoundsCheck
+
+
+def check_equivalent(s, *values):
+    optimized = optimize(s)
+
+    assert describe(optimized) == describe(s)
+    for v in values:
+        assert conform(optimized, v) == conform(s, v), v
+        assert explain_data(optimized, v) == explain_data(s, v), v
+
+    return optimized
+
+
+def counting_predicate(calls):
+    def expensive(x):
+        calls.append(x)
+        return True
+
+    return expensive
+
+
+def test_nested_all_of_is_flattened():
+    s = all_of(all_of(int, gt(0)), all_of(lt(10), even_or_odd()))
+
+    optimized = check_equivalent(s, 1, 0, 10, "one")
+
+    assert isinstance(optimized, OptimizedAllOf)
+    # noinspection PyProtectedMember
+    assert not [m for m in optimized._specs if isinstance(m, OptimizedAllOf)]
+
+
+def even_or_odd():
+    return one_of(lambda x: x % 2 == 0, lambda x: x % 2 == 1)
+
+
+def test_type_checks_are_made_before_expensive_predicates():
+    calls = []
+    s = all_of(counting_predicate(calls), is_instance(int))
+
+    optimized = check_equivalent(s, 1, "one")
+    del calls[:]
+
+    conform(optimized, "one")
+    assert calls == []
+
+
+def test_coercions_are_not_reordered():
+    s = all_of(is_instance(str), sc.Int, gt(0))
+
+    check_equivalent(s, "1", "0", 1, "one")
+
+
+def test_checks_which_might_raise_are_not_moved_ahead_of_predicates():
+    check_equivalent(all_of(lambda x: isinstance(x, int), gt(0)), 1, 0, "a")
+    check_equivalent(all_of(lambda x: isinstance(x, str), is_in(['a', 'b'])), 'a', 'c', ['x'])
+
+
+def test_bounds_are_only_merged_if_nothing_between_them_might_raise():
+    s = all_of(gt(0), lambda x: isinstance(x, int), lt(10))
+
+    optimized = check_equivalent(s, 1, 0, 10)
+
+    # noinspection PyProtectedMember
+    assert not [m for m in optimized._conform_order if isinstance(m, BoundsCheck)]
+
+
+def test_bounds_are_merged():
+    s = all_of(int, gt(0), lte(10), gte(2), lt(20), in_range(1, 9))
+
+    optimized = check_equivalent(s, 0, 1, 2, 8, 9, 10, 11, "one")
+
+    # noinspection PyProtectedMember
+    bounds = [m for m in optimized._conform_order if isinstance(m, BoundsCheck)]
+    assert len(bounds) == 1
+    assert (bounds[0].lower, bounds[0].lower_inclusive, bounds[0].upper, bounds[0].upper_inclusive) == \
+           (2, True, 9, False)
+
+
+def test_duplicate_type_checks_are_removed():
+    s = all_of(int, gt(0), is_instance(int))
+
+    optimized = check_equivalent(s, 1, 0, "one")
+
+    # noinspection PyProtectedMember
+    assert len(optimized._conform_order) == 2
+
+
+def test_any_is_removed_from_all_of():
+    check_equivalent(all_of(any_(), int), 1, "one")
+    check_equivalent(all_of(any_(), any_()), 1, "one")
+
+
+def test_one_of_branches_after_any_are_removed():
+    calls = []
+    s = one_of(is_none(), any_(), counting_predicate(calls))
+
+    check_equivalent(s, None, 1, "one")
+    assert calls == []
+
+
+def test_nested_one_of_is_flattened():
+    check_equivalent(one_of(one_of(is_none(), int), str), None, 1, "one", 1.5)
+
+
+def test_undescribed_decorations_are_removed():
+    s = specize(int)
+
+    assert optimize(decorated(decorated(s))) is s
+
+    described = optimize(decorated(decorated(s, "inner"), "outer"))
+    assert describe(described) == "outer"
+    # noinspection PyProtectedMember
+    assert described._delegate is s
+
+
+def test_specs_inside_dicts_and_collections_are_optimized():
+    s = dict_spec({'k': coll_of(all_of(all_of(int, gt(0)), lt(5))),
+                   'j': coerce(int, one_of(one_of(equal_to(1), equal_to(2))))})
+
+    check_equivalent(s,
+                     {'k': [1, 2], 'j': "1"},
+                     {'k': [1, 5], 'j': "1"},
+                     {'k': [1, 2], 'j': "3"})
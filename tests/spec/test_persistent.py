@@ -0,0 +1,55 @@
+from pyrsistent import pmap, pvector, PMap, PVector
+
+import spec.coercions as sc
+from spec.core import conform, reconform, dict_spec, coll_of, isinvalid
+from spec.impl.core import path
+
+
+def test_persistent_dict_spec_conforms_to_pmap():
+    s = dict_spec({'k': sc.Int, 'j': {'l': sc.Int}}, persistent=True)
+
+    conformed = conform(s, {'k': "1", 'j': {'l': "2"}})
+
+    assert conformed == pmap({'k': 1, 'j': pmap({'l': 2})})
+    assert isinstance(conformed, PMap)
+    assert isinstance(conformed['j'], PMap)
+
+    assert isinvalid(conform(s, {'k': "one", 'j': {'l': "2"}}))
+
+
+def test_persistent_coll_of_conforms_to_pvector():
+    s = coll_of(sc.Int, persistent=True)
+
+    conformed = conform(s, ("1", "2"))
+
+    assert conformed == pvector([1, 2])
+    assert isinstance(conformed, PVector)
+
+
+def test_conforming_persistent_output_again_returns_the_same_object():
+    s = dict_spec({'k': coll_of(sc.Int, persistent=True), 'j': {'l': int}}, persistent=True)
+
+    conformed = conform(s, {'k': ["1", "2"], 'j': {'l': 3}})
+
+    assert conform(s, conformed) is conformed
+
+
+def test_persistent_outputs_are_not_shared_when_values_are_coerced():
+    s = coll_of(sc.Int, persistent=True)
+
+    x = pvector(["1"])
+
+    assert conform(s, x) == pvector([1])
+
+
+def test_reconform_shares_unchanged_subtrees():
+    s = dict_spec({'a': {'x': int}, 'b': coll_of(int, persistent=True)}, persistent=True)
+
+    previous = conform(s, {'a': {'x': 1}, 'b': [1, 2, 3]})
+    conformed, explanation = reconform(s, {'a': {'x': 1}, 'b': [1, 5, 3]}, previous, [path('b', 1)])
+
+    assert explanation is None
+    assert conformed == pmap({'a': pmap({'x': 1}), 'b': pvector([1, 5, 3])})
+    assert isinstance(conformed['b'], PVector)
+    assert conformed['a'] is previous['a']
+    assert previous['b'] == pvector([1, 2, 3])
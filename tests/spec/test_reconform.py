@@ -0,0 +1,122 @@
+import spec.coercions as sc
+from spec.core import conform, reconform, dict_spec, coll_of, map_of, specize, isinvalid
+from spec.impl.core import Problem, path, Explanation, changes_from_paths
+
+
+def counting(s):
+    s = specize(s)
+    calls = []
+
+    def check(x):
+        calls.append(x)
+        return s.conform(x) == x
+
+    return specize(check), calls
+
+
+def test_changes_from_paths():
+    assert changes_from_paths([path('a', 'b'), path('a', 'c'), path('d')]) == {'a': {'b': None, 'c': None},
+                                                                               'd': None}
+    assert changes_from_paths([path('a', 'b'), path('a')]) == {'a': None}
+    assert changes_from_paths([path('a'), path('a', 'b')]) == {'a': None}
+    assert changes_from_paths([path('a'), path()]) is None
+
+
+def test_only_changed_paths_are_revalidated():
+    leaf, calls = counting(int)
+    s = dict_spec({'a': {'x': leaf}, 'b': {'y': leaf}})
+
+    document = {'a': {'x': 1}, 'b': {'y': 2}}
+    previous = conform(s, document)
+    del calls[:]
+
+    document['b']['y'] = 3
+    conformed, explanation = reconform(s, document, previous, [path('b', 'y')])
+
+    assert conformed == {'a': {'x': 1}, 'b': {'y': 3}}
+    assert explanation is None
+    assert calls == [3]
+    assert conformed['a'] is previous['a']
+
+
+def test_changed_values_are_conformed():
+    s = dict_spec({'k': sc.Int, 'j': sc.Int})
+
+    previous = conform(s, {'k': "1", 'j': "2"})
+    conformed, explanation = reconform(s, {'k': "1", 'j': "3"}, previous, [path('j')])
+
+    assert conformed == {'k': 1, 'j': 3}
+    assert explanation is None
+
+
+def test_problems_in_changed_paths_are_reported():
+    item_spec = specize(int)
+    s = dict_spec({'k': coll_of(item_spec)})
+
+    document = {'k': [1, 2, 3]}
+    previous = conform(s, document)
+
+    document['k'][1] = "two"
+    conformed, explanation = reconform(s, document, previous, [path('k', 1)])
+
+    assert conformed == conform(s, document)
+    assert explanation == Explanation.with_problems(
+        Problem(path('k', 1), "two", item_spec, "expected an int but got a str"))
+
+
+def test_collections_which_change_length_are_revalidated():
+    leaf, calls = counting(int)
+    s = coll_of(leaf)
+
+    document = [1, 2]
+    previous = conform(s, document)
+    del calls[:]
+
+    document.append(3)
+    conformed, explanation = reconform(s, document, previous, [path(2)])
+
+    assert conformed == [1, 2, 3]
+    assert calls == [1, 2, 3]
+
+
+def test_tuples_stay_tuples():
+    s = coll_of(int)
+
+    previous = conform(s, (1, 2))
+    conformed, explanation = reconform(s, (1, 5), previous, [path(1)])
+
+    assert conformed == (1, 5)
+
+
+def test_changing_the_root_revalidates_everything():
+    leaf, calls = counting(int)
+    s = dict_spec({'a': leaf, 'b': leaf})
+
+    previous = conform(s, {'a': 1, 'b': 2})
+    del calls[:]
+
+    conformed, explanation = reconform(s, {'a': 3, 'b': 4}, previous, [path()])
+
+    assert conformed == {'a': 3, 'b': 4}
+    assert sorted(calls) == [3, 4]
+
+
+def test_only_changed_values_of_map_ofs_are_revalidated():
+    leaf, calls = counting(int)
+    s = map_of(str, leaf)
+
+    document = {'a': 1, 'b': 2}
+    previous = conform(s, document)
+    del calls[:]
+
+    document['b'] = 3
+    conformed, explanation = reconform(s, document, previous, [path('b')])
+    assert conformed == {'a': 1, 'b': 3}
+    assert explanation is None
+    assert calls == [3]
+
+    del document['a']
+    document['c'] = "three"
+    conformed, explanation = reconform(s, document, conformed, [path('a'), path('c')])
+    assert isinvalid(conformed)
+    assert explanation == Explanation.with_problems(Problem(path('c'), "three", leaf, "not check"))
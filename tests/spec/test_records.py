@@ -1,9 +1,13 @@
+import pickle
+
 import pytest
-from typing import List, Optional, TypeVar, Generic, Any, ClassVar
+from typing import List, Optional, TypeVar, Generic, Any, ClassVar, Dict, Tuple, Set, FrozenSet
 
-from spec.core import assert_spec
+from spec.core import assert_spec, iterative_conform, iterative_explain_data, INVALID, select, conform, path, \
+    WILDCARD, reconform
 from spec.impl.core import SpecError
 from spec.impl.records.core import spec_from, Record
+from spec.impl.records.typevars import UnboundTypeVarDictSpec
 
 
 def check_spec_error(s, value, expected_error_text):
@@ -69,6 +73,17 @@ def test_forward_references():
     check_spec_error(s, {'k': "not a NeedsForwardReference"}, "not a NeedsForwardReference")
 
 
+def test_deeply_nested_forward_references():
+    s = spec_from(HasForwardReference)
+
+    x = None
+    for _ in range(5000):
+        x = {'k': x}
+
+    assert iterative_conform(s, x) is not INVALID
+    assert iterative_explain_data(s, x) is None
+
+
 class HasListsOfForwardReference(Record):
     k: List['HasListsOfForwardReference']
 
@@ -143,6 +158,22 @@ def test_non_generic_class_with_typevar_annotations():
     check_spec_error(s, {'a': int_T, 'b': str_T}, str_T)
 
 
+def test_typevar_specs_are_generated_once_per_type():
+    generated = []
+
+    def spec_generator(t):
+        generated.append(t)
+        return spec_from(t)
+
+    s = UnboundTypeVarDictSpec({'a': T, 'b': T}, spec_generator)
+
+    for i in range(10):
+        assert assert_spec(s, {'a': i, 'b': i}) == {'a': i, 'b': i}
+    check_spec_error(s, {'a': "str", 'b': 1}, "expected a str but got an int")
+
+    assert generated == [int, str]
+
+
 class HasAny(Record):
     a: Any
 
@@ -232,3 +263,183 @@ def test_classvar_should_never_appear():
     #     'overload',
     #     'Text',
     #     'TYPE_CHECKING',
+
+
+class Line(Record):
+    sku: str
+    price: int
+
+
+class Order(Record):
+    id: int
+    lines: List[Line]
+    parent: Optional['Order']
+
+
+def test_select_from_record_specs():
+    s = select(spec_from(Order), [path('id'), path('lines', WILDCARD, 'sku'), path('parent', 'id')])
+
+    assert conform(s, {'id': 1, 'lines': [{'sku': "a"}], 'parent': {'id': 2}}) == \
+           {'id': 1, 'lines': [{'sku': "a"}], 'parent': {'id': 2}}
+    assert conform(s, {'id': 1, 'lines': [{'sku': "a"}], 'parent': None}) == \
+           {'id': 1, 'lines': [{'sku': "a"}], 'parent': None}
+    assert conform(s, {'id': 1, 'lines': [{'sku': 1}], 'parent': None}) is INVALID
+    assert conform(s, {'id': 1, 'lines': [], 'parent': {'id': "two"}}) is INVALID
+
+
+def test_select_from_record_specs_with_typevars():
+    s = spec_from(UnboundGeneric)
+
+    assert conform(select(s, [path('t'), path('v')]), {'t': 1, 'v': "V type", 'another_v': 2}) == \
+           {'t': 1, 'v': "V type"}
+    assert conform(select(s, [path('v'), path('another_v')]), {'t': 1, 'v': "V type", 'another_v': 2}) is INVALID
+
+
+class Point(Record):
+    __slots__ = ()
+    x: int
+    y: int
+
+
+class Shape(Record):
+    __slots__ = ()
+    name: str
+    points: List[Point]
+    parent: Optional['Shape']
+
+
+def test_conform_into_instances():
+    s = spec_from(Shape, instances=True)
+
+    shape = assert_spec(s, {'name': "line", 'points': [{'x': 0, 'y': 0}, {'x': 1, 'y': 2}], 'parent': None})
+
+    assert isinstance(shape, Shape)
+    assert not hasattr(shape, '__dict__')
+    assert shape.name == "line"
+    assert shape.points == [Point.from_dict({'x': 0, 'y': 0}), Point.from_dict({'x': 1, 'y': 2})]
+    assert isinstance(shape.points[0], Point)
+    assert shape.parent is None
+    assert repr(shape.points[1]) == "Point(x=1, y=2)"
+
+    child = assert_spec(s, {'name': "child", 'points': [], 'parent': {'name': "parent", 'points': [], 'parent': None}})
+    assert child.parent.name == "parent"
+
+    check_spec_error(s, {'name': "line", 'points': [{'x': "zero", 'y': 0}], 'parent': None}, "zero")
+    assert conform(s, {'name': "line", 'points': []}) is INVALID
+
+
+def test_conform_into_instances_with_typevars():
+    s = spec_from(UnboundGeneric, instances=True)
+
+    instance = assert_spec(s, {'t': 123, 'v': "V type", 'another_v': "V type"})
+    assert (instance.t, instance.v, instance.another_v) == (123, "V type", "V type")
+
+    check_spec_error(s, {'t': 123, 'v': 1, 'another_v': "V type"}, "V type")
+
+
+def test_from_dict():
+    p = Point.from_dict({'x': 1, 'y': 2, 'z': 3})
+
+    assert isinstance(p, Point)
+    assert (p.x, p.y) == (1, 2)
+    assert type(p) is Point.slotted()
+    assert p != Point.from_dict({'x': 1, 'y': 3})
+
+
+def test_slotted_instances_can_be_pickled():
+    shape = Shape.from_dict({'name': "line", 'points': [Point.from_dict({'x': 1, 'y': 2})], 'parent': None})
+
+    unpickled = pickle.loads(pickle.dumps(shape))
+
+    assert unpickled == shape
+    assert type(unpickled) is Shape.slotted()
+    assert type(unpickled.points[0]) is Point.slotted()
+
+
+def test_select_from_instance_specs_keeps_every_field():
+    s = select(spec_from(Shape, instances=True), [path('name')])
+
+    shape = conform(s, {'name': "line", 'points': "not validated", 'parent': None})
+
+    assert shape == Shape.from_dict({'name': "line", 'points': "not validated", 'parent': None})
+    assert repr(shape) == "Shape(name='line', points='not validated', parent=None)"
+    assert conform(s, {'name': 1, 'points': [], 'parent': None}) is INVALID
+
+
+def test_reconform_instances():
+    s = spec_from(Shape, instances=True)
+    x = {'name': "line", 'points': [{'x': 0, 'y': 0}], 'parent': None}
+    previous = conform(s, x)
+
+    x['points'][0]['y'] = 1
+    shape, explanation = reconform(s, x, previous, [path('points', 0, 'y')])
+    assert explanation is None
+    assert shape == Shape.from_dict({'name': "line", 'points': [Point.from_dict({'x': 0, 'y': 1})], 'parent': None})
+    assert type(shape) is Shape.slotted()
+
+    x['name'] = 1
+    shape, explanation = reconform(s, x, previous, [path('name')])
+    assert shape is INVALID
+    assert explanation.problems[0].path == path('name')
+
+
+def test_validate_record_instances_by_attribute():
+    s = spec_from(Shape, attributes=True)
+
+    line = Shape.from_dict({'name': "line",
+                            'points': [Point.from_dict({'x': 0, 'y': 0})],
+                            'parent': Shape.from_dict({'name': "parent", 'points': [], 'parent': None})})
+    assert assert_spec(s, line) == line
+
+    bad = Shape.from_dict({'name': "bad", 'points': [Point.from_dict({'x': "zero", 'y': 0})], 'parent': None})
+    check_spec_error(s, bad, "zero")
+
+
+def test_validate_record_instances_with_typevars_by_attribute():
+    s = spec_from(UnboundGeneric, attributes=True)
+
+    class Instance:
+        def __init__(self, t, v, another_v):
+            self.t, self.v, self.another_v = t, v, another_v
+
+    valid = Instance(123, "V type", "V type")
+    assert assert_spec(s, valid) is valid
+    check_spec_error(s, Instance(123, 1, "V type"), "expected a")
+    assert conform(s, object()) is INVALID
+
+
+class HasCollections(Record):
+    counts: Dict[str, int]
+    pair: Tuple[int, str]
+    numbers: Tuple[int, ...]
+    empty: Tuple[()]
+    tags: Set[str]
+    frozen: FrozenSet[int]
+    lines: Dict[str, List[Line]]
+    anything: Dict
+
+
+def test_collections():
+    s = spec_from(HasCollections)
+
+    valid = {'counts': {'a': 1},
+             'pair': [1, "one"],
+             'numbers': (1, 2, 3),
+             'empty': (),
+             'tags': {"a", "b"},
+             'frozen': frozenset({1}),
+             'lines': {'first': [{'sku': "a", 'price': 1}]},
+             'anything': {1: "one"}}
+
+    d = assert_spec(s, valid)
+
+    assert d == dict(valid, pair=(1, "one"))
+
+    check_spec_error(s, dict(valid, counts={'a': "not an int"}), "not an int")
+    check_spec_error(s, dict(valid, counts={1: 1}), "expected a str but got an int")
+    check_spec_error(s, dict(valid, pair=(1, 2)), "expected a str but got an int")
+    check_spec_error(s, dict(valid, numbers=(1, "two")), "two")
+    check_spec_error(s, dict(valid, empty=(1,)), "expected 0 items but got 1")
+    check_spec_error(s, dict(valid, tags={"a", 1}), "expected a str but got an int")
+    check_spec_error(s, dict(valid, frozen=[1]), "expected a set but got a list")
+    check_spec_error(s, dict(valid, lines={'first': [{'sku': "a", 'price': "free"}]}), "free")
@@ -0,0 +1,140 @@
+import pytest
+
+import spec.coercions as sc
+from spec.core import coll_of, sample, set_default_sample, conform, explain_data, dict_spec, isinvalid, specize, \
+    set_of, coerce, iter_problems, iterative_explain_data
+from spec.impl.core import Problem, path, Explanation
+from spec.impl.sampling import SamplingReport
+
+
+@pytest.fixture
+def default_sample():
+    previous = set_default_sample(None)
+    yield
+    set_default_sample(previous)
+
+
+def test_sample_checks_first_n_and_random_k():
+    s = sample(first=3, random=2, seed=1)
+
+    indices = s.indices(100)
+
+    assert indices[:3] == [0, 1, 2]
+    assert len(indices) == 5
+    assert indices == sorted(indices)
+    assert indices == sample(first=3, random=2, seed=1).indices(100)
+    assert s.report() == SamplingReport(items_seen=100, items_checked=5)
+
+
+def test_each_collection_gets_its_own_choice():
+    s = sample(random=2, seed=1)
+
+    assert len({tuple(s.indices(100)) for _ in range(10)}) > 1
+
+
+def test_sample_checks_a_fraction():
+    s = sample(fraction=0.1)
+
+    assert len(s.indices(1000)) == 100
+    assert s.indices(5) == []
+    assert sample(fraction=1).indices(3) == [0, 1, 2]
+
+
+def test_sample_checks_everything_if_collection_is_small():
+    assert sample(first=10, random=10).indices(15) == list(range(15))
+
+
+def test_sample_validation():
+    with pytest.raises(ValueError):
+        sample()
+    with pytest.raises(ValueError):
+        sample(fraction=0.5, random=10)
+    with pytest.raises(ValueError):
+        sample(fraction=2)
+
+
+def test_coll_of_only_validates_sampled_items():
+    s = coll_of(sc.Int, sample=sample(first=2))
+
+    assert conform(s, ["1", "2", "not validated"]) == [1, 2, "not validated"]
+    assert conform(s, ("1", "2", "not validated")) == (1, 2, "not validated")
+    assert isinvalid(conform(s, ["1", "two", "3"]))
+
+
+def test_sampled_items_are_explained():
+    item_spec = specize(int)
+    s = coll_of(item_spec, sample=sample(first=1, random=1, seed=3))
+
+    xs = ["a", "b", "c", "d"]
+    checked = sample(first=1, random=1, seed=3).indices(len(xs))
+
+    assert explain_data(s, xs).problems == tuple(Problem(path(i), xs[i], item_spec, "expected an int but got a str")
+                                                 for i in checked)
+
+
+def test_explain_checks_the_items_conform_checked():
+    item_spec = specize(int)
+    s = sample(random=1, seed=3)
+    spec = coll_of(item_spec, sample=s)
+    xs = ["a", 1, 2, 3]
+
+    problem = Problem(path(0), "a", item_spec, "expected an int but got a str")
+    results = set()
+    for _ in range(20):
+        valid = not isinvalid(conform(spec, xs))
+        results.add(valid)
+        assert explain_data(spec, xs) == (None if valid else Explanation.with_problems(problem))
+
+    assert results == {True, False}
+    assert s.report() == SamplingReport(items_seen=80, items_checked=20)
+
+
+def test_explaining_sets_does_not_count_them_again(default_sample):
+    s = sample(first=3)
+    set_default_sample(s)
+    xs = {1, 2, 3}
+
+    assert conform(set_of(int), xs) == xs
+    assert explain_data(set_of(int), xs) is None
+    assert list(iter_problems(set_of(int), xs)) == []
+    assert iterative_explain_data(set_of(int), xs) is None
+    assert s.report() == SamplingReport(items_seen=3, items_checked=3)
+
+    unhashable = set_of(coerce(list, list))
+    assert isinvalid(conform(unhashable, {(1,)}))
+    assert explain_data(unhashable, {(1,)}).problems[0].reason == "items conform to values which can't be put in a set"
+    assert s.report() == SamplingReport(items_seen=4, items_checked=4)
+
+
+def test_default_sample_applies_to_dicts_and_collections(default_sample):
+    s = dict_spec({'a': int, 'b': int, 'c': coll_of(int)})
+
+    set_default_sample(sample(first=1))
+
+    assert conform(s, {'a': 1, 'b': "not validated", 'c': [1, "not validated"]}) == \
+           {'a': 1, 'b': "not validated", 'c': [1, "not validated"]}
+    assert isinvalid(conform(s, {'a': "one", 'b': 2, 'c': [1]}))
+    assert isinvalid(conform(s, {'a': 1, 'b': 2}))
+
+    set_default_sample(None)
+
+    assert isinvalid(conform(s, {'a': 1, 'b': "validated", 'c': [1]}))
+
+
+def test_counts_are_kept_across_threads():
+    from threading import Thread
+
+    s = sample(first=1, random=1)
+    spec = coll_of(int, sample=s)
+
+    def validate():
+        for _ in range(1000):
+            conform(spec, [1, 2, 3])
+
+    threads = [Thread(target=validate) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert s.report() == SamplingReport(items_seen=12000, items_checked=8000)
@@ -0,0 +1,102 @@
+from spec.core import select, dict_spec, coll_of, map_of, tuple_of, one_of, all_of, decorated, coerce, optimize, \
+    path, WILDCARD, conform, explain_data, INVALID
+from spec.impl.core import Problem
+
+from tests.spec.support import check_spec
+
+
+def document_spec():
+    return dict_spec({'id': int,
+                      'name': str,
+                      'items': coll_of(dict_spec({'sku': str, 'price': int, 'tags': coll_of(str)})),
+                      'meta': dict_spec({'created': str, 'source': str})})
+
+
+def test_only_selected_keys_are_validated():
+    s = select(document_spec(), [path('id'), path('meta', 'source')])
+
+    check_spec(s,
+               {'id': 1, 'name': None, 'items': "not a list", 'meta': {'created': 2, 'source': "import"}},
+               expected_conform={'id': 1, 'meta': {'source': "import"}})
+    check_spec(s,
+               {'id': 1, 'meta': {'source': 3}},
+               [Problem(path('meta', 'source'), 3, s._key_to_spec['meta']._key_to_spec['source'],
+                        "expected a str but got an int")])
+
+
+def test_selected_keys_must_still_be_present():
+    s = select(document_spec(), [path('id')])
+
+    assert explain_data(s, {}) is not None
+
+
+def test_wildcards_select_part_of_every_item():
+    s = select(document_spec(), [path('items', WILDCARD, 'sku')])
+
+    assert conform(s, {'items': [{'sku': "a", 'price': "free"}, {'sku': "b"}]}) == {'items': [{'sku': "a"},
+                                                                                              {'sku': "b"}]}
+    assert conform(s, {'items': [{'sku': "a"}, {'sku': 2}]}) is INVALID
+
+
+def test_indices_select_part_of_every_item():
+    s = select(document_spec(), [path('items', 0, 'price'), path('items', WILDCARD, 'sku')])
+
+    assert conform(s, {'items': [{'sku': "a", 'price': 1}]}) == {'items': [{'sku': "a", 'price': 1}]}
+    assert conform(s, {'items': [{'sku': "a", 'price': 1}, {'sku': "b"}]}) is INVALID
+
+
+def test_a_path_to_a_value_selects_all_of_it():
+    s = select(document_spec(), [path('items'), path('items', WILDCARD, 'sku')])
+
+    assert conform(s, {'items': [{'sku': "a"}]}) is INVALID
+    assert conform(select(document_spec(), [path()]), {'id': 1}) is INVALID
+
+
+def test_prunes_inside_one_of_all_of_and_wrappers():
+    s = dict_spec({'a': int, 'b': int})
+    wrapped = decorated(one_of(all_of(s, decorated(s)), str), "a or b")
+
+    pruned = select(wrapped, [path('a')])
+
+    assert conform(pruned, {'a': 1, 'b': "not an int"}) == {'a': 1}
+    assert conform(pruned, "neither") == "neither"
+    assert conform(pruned, {'a': "one"}) is INVALID
+    assert pruned.describe() == "a or b"
+
+
+def test_keeps_members_of_all_of_whole_when_later_members_might_read_anything():
+    s = all_of(dict_spec({'a': int, 'b': int}), lambda d: d['a'] < d['b'])
+
+    pruned = select(s, [path('a')])
+
+    assert conform(pruned, {'a': 1, 'b': 2}) == {'a': 1, 'b': 2}
+    assert conform(pruned, {'a': 2, 'b': 1}) is INVALID
+    assert conform(select(all_of(s, coerce(dict, dict_spec({'a': int}))), [path('a')]), {'a': 1, 'b': 2}) == {'a': 1}
+
+
+def test_prunes_optimized_specs():
+    s = optimize(all_of(dict_spec({'a': int, 'b': int}), dict_spec({'a': int, 'c': int})))
+
+    assert conform(select(s, [path('a')]), {'a': 1}) == {'a': 1}
+
+
+def test_leaves_the_original_spec_unchanged():
+    s = document_spec()
+    description = s.describe()
+
+    pruned = select(s, [path('id')])
+
+    assert pruned.describe() != description
+    assert s.describe() == description
+    assert conform(s, {'id': 1}) is INVALID
+
+
+def test_prunes_map_values_and_tuple_items():
+    s = dict_spec({'by_name': map_of(str, dict_spec({'id': int, 'name': str})), 'pair': tuple_of(int, int)})
+
+    pruned = select(s, [path('by_name', WILDCARD, 'id'), path('pair', 0)])
+
+    assert conform(pruned, {'by_name': {'a': {'id': 1, 'name': None}}, 'pair': (1, None)}) == \
+           {'by_name': {'a': {'id': 1}}, 'pair': (1, None)}
+    assert conform(pruned, {'by_name': {'a': {'id': "one"}}, 'pair': (1, None)}) is INVALID
+    assert conform(pruned, {'by_name': {1: {'id': 1}}, 'pair': (1, None)}) is INVALID
@@ -0,0 +1,79 @@
+from collections.abc import Mapping
+
+from spec.core import spec_set, dict_example, dict_spec, is_in, is_instance, all_of, coerce, equal_to, specize, \
+    decorated, set_default_sample, sample
+
+
+def counting(s, calls):
+    s = specize(s)
+
+    def check(x):
+        calls.append(s)
+        return True
+
+    return all_of(s, check)
+
+
+def test_finds_matching_dict_specs_by_key_values():
+    rules = [dict_example({'type': "order", 'region': region}) for region in range(100)] + \
+            [dict_spec({'type': is_in({"refund", "return"}), 'amount': int}),
+             dict_spec({'amount': int})]
+    specs = spec_set(*rules)
+
+    assert specs.matching({'type': "order", 'region': 42}) == [rules[42]]
+    assert specs.matching({'type': "refund", 'amount': 1}) == [rules[100], rules[101]]
+    assert specs.matching({'type': "other", 'amount': 1}) == [rules[101]]
+    assert specs.matching({'amount': "one"}) == []
+    assert specs.matching("not a dict") == []
+
+    assert specs.first_match({'type': "return", 'amount': 1}) is rules[100]
+    assert specs.first_match({}) is None
+
+    assert len(specs) == 102
+    assert list(specs) == rules
+
+
+def test_only_candidate_specs_are_conformed():
+    calls = []
+    rules = [all_of(dict_example({'type': "event", 'id': i}), counting(Mapping, calls)) for i in range(100)]
+    specs = spec_set(*rules)
+
+    assert specs.matching({'type': "event", 'id': 7}) == [rules[7]]
+    assert len(calls) == 1
+
+
+def test_finds_matching_types():
+    class Base:
+        pass
+
+    class Derived(Base):
+        pass
+
+    rules = [is_instance(int), is_instance(Base), is_instance(Derived), is_instance(Mapping),
+             decorated(is_instance(str), "a string")]
+    specs = spec_set(*rules)
+
+    assert specs.matching(1) == [rules[0]]
+    assert specs.matching(Derived()) == [rules[1], rules[2]]
+    assert specs.matching({}) == [rules[3]]
+    assert specs.matching("s") == [rules[4]]
+
+
+def test_values_that_cannot_be_looked_up_are_conformed_to_every_candidate():
+    rules = [dict_spec({'k': equal_to([1])}), dict_spec({'k': equal_to(1)}), coerce(str, equal_to("1"))]
+    specs = spec_set(*rules)
+
+    assert specs.matching({'k': [1]}) == [rules[0]]
+    assert specs.matching(1) == [rules[2]]
+
+
+def test_sampled_dict_specs_are_all_conformed():
+    rules = [dict_example({'a': 1, 'b': 2})]
+    specs = spec_set(*rules)
+
+    previous = set_default_sample(sample(first=1))
+    try:
+        # with only the first key sampled, 'b' isn't checked
+        assert specs.matching({'a': 1, 'b': 3}) == rules
+    finally:
+        set_default_sample(previous)
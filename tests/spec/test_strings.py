@@ -0,0 +1,95 @@
+import re
+
+from spec.core import matches, str_len, starts_with, ends_with, all_of, conform, explain_data, isinvalid, optimize, \
+    describe, is_instance
+from spec.impl.core import Problem, path
+from spec.impl.strings import StringAllOf, compile_pattern
+from tests.spec.support import check_spec
+
+
+def test_matches():
+    s = matches(r"[a-z]+\d")
+
+    check_spec(s, "abc1")
+    check_spec(s, "abc", [Problem(path(), "abc", s, r"'abc' does not match '[a-z]+\\d'")])
+    # the whole string has to match
+    check_spec(s, "abc1 and more", [Problem(path(), "abc1 and more", s,
+                                            r"'abc1 and more' does not match '[a-z]+\\d'")])
+    check_spec(s, 1, [Problem(path(), 1, s, "expected a str but got an int")])
+
+    assert describe(s) == r"a string matching '[a-z]+\\d'"
+    assert conform(matches("abc", re.IGNORECASE), "ABC") == "ABC"
+
+
+def test_matches_uses_re_flags():
+    s = matches(r"\w+", re.ASCII)
+
+    assert conform(s, "hello") == "hello"
+    assert isinvalid(conform(s, "h\u00e9llo"))
+    assert conform(matches(r"\w+"), "h\u00e9llo") == "h\u00e9llo"
+
+
+def test_patterns_are_compiled_once():
+    assert compile_pattern(r"\d+") is compile_pattern(r"\d+")
+    assert matches(r"\d+").compiled is matches(r"\d+").compiled
+
+
+def test_str_len():
+    s = str_len(1, 3)
+
+    check_spec(s, "a")
+    check_spec(s, "abc")
+    check_spec(s, "", [Problem(path(), "", s, "'' is not a string between 1 and 3 long")])
+    check_spec(s, "abcd", [Problem(path(), "abcd", s, "'abcd' is not a string between 1 and 3 long")])
+
+    check_spec(str_len(2), "ab")
+    assert isinvalid(conform(str_len(2), "a"))
+
+
+def test_starts_with_and_ends_with():
+    check_spec(starts_with("ab"), "abc")
+    check_spec(ends_with("bc"), "abc")
+    assert isinvalid(conform(starts_with("ab"), "cab"))
+    assert isinvalid(conform(ends_with("ab"), "abc"))
+    assert isinvalid(conform(ends_with("ab"), ["ab"]))
+
+
+def test_string_specs_in_all_of_are_checked_together():
+    specs = [str_len(3, 10), starts_with("id-"), matches(r"[a-z-]+\d+"), matches(r".*[13579]"), ends_with("7")]
+    s = all_of(*specs)
+
+    assert isinstance(s, StringAllOf)
+
+    for x in ["id-abc7", "id-a17", "id-7"]:
+        assert conform(s, x) == x
+
+    for x in ["id-abc8", "id-abc", "xx-abc7", "id-abcdefgh7", "id-", 7]:
+        assert isinvalid(conform(s, x)), x
+        problems = explain_data(s, x).problems
+        # explained by the first failing spec, as with any all_of
+        assert len(problems) == 1
+        assert problems[0].spec in specs
+
+
+def test_patterns_which_cannot_be_combined_are_checked_separately():
+    s = all_of(matches(r"(a)\1b"), matches(r"(?i)A+B"), matches("[ab]+"))
+
+    assert conform(s, "aab") == "aab"
+    assert isinvalid(conform(s, "abb"))
+
+
+def test_verbose_patterns_with_comments_are_combined():
+    s = all_of(matches(r"a+  # letters", re.X), matches(r"a{2}", re.X))
+
+    assert conform(s, "aa") == "aa"
+    assert isinvalid(conform(s, "aaa"))
+    assert isinvalid(conform(s, "a"))
+
+
+def test_optimize_checks_string_specs_together():
+    s = all_of(is_instance(str), str_len(1, 5), starts_with("a"), ends_with("z"))
+    optimized = optimize(s)
+
+    for x in ["az", "abz", "abcdefz", "z", 1]:
+        assert conform(optimized, x) == conform(s, x)
+        assert explain_data(optimized, x) == explain_data(s, x)